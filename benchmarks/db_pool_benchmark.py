@@ -0,0 +1,73 @@
+"""
+Benchmark: per-event database cost before/after connection pooling.
+
+Replays the sequence of PlayerStatsDB calls that one building/crafting log
+line triggers in log_parser.process_activity against two copies of
+data/player_stats.db:
+  * legacy  - fresh sqlite3.connect() per call, default rollback journal
+  * pooled  - persistent per-thread connections with WAL + tuned pragmas
+
+Usage: python benchmarks/db_pool_benchmark.py [events] [players]
+"""
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The global config and database are built on import: keep them out of the repo's data/
+os.environ.setdefault('BOT_DATA_DIR', tempfile.mkdtemp(prefix='palbot_bench_'))
+
+from utils.database import PlayerStatsDB
+
+SOURCE_DB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "player_stats.db")
+
+
+class LegacyPlayerStatsDB(PlayerStatsDB):
+    """Pre-pool behaviour: a brand new connection for every call"""
+
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+
+def replay_events(database: PlayerStatsDB, events: int, players: int) -> float:
+    """Run the process_activity call sequence, return events/sec"""
+    start = time.perf_counter()
+    for i in range(events):
+        steam_id = f"steam_bench{i % players}"
+        database._upsert_player(steam_id, f"Bench{i % players}")
+        database._get_player_stats(steam_id)                   # old rank
+        database._add_activity(steam_id, 'building', 1)
+        database._get_player_stats(steam_id)                   # rank multiplier
+        database._add_palmarks(steam_id, 5, "Built Wooden Wall")
+        database._add_experience(steam_id, 10)
+        database._get_player_stats(steam_id)                   # rank check
+    return events / (time.perf_counter() - start)
+
+
+def main():
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    players = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for label, cls in (("legacy", LegacyPlayerStatsDB), ("pooled", PlayerStatsDB)):
+            path = os.path.join(tmp, f"{label}.db")
+            if os.path.exists(SOURCE_DB):
+                shutil.copyfile(SOURCE_DB, path)
+            database = cls(path)
+            results[label] = replay_events(database, events, players)
+            database.close()
+
+        print(f"\n{events} events across {players} players")
+        for label, rate in results.items():
+            print(f"  {label:<7} {rate:>10,.0f} events/sec")
+        print(f"  speedup {results['pooled'] / results['legacy']:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+"""
+Local stand-in for a Palworld dedicated server, for load and integration
+testing without the game.
+
+Speaks
+  * Source RCON   - auth, ShowPlayers / Info / Save / Broadcast, PalDefender
+                    give / give_exp / givepal / givepal_j / tell; long output
+                    is split into 4096-byte packets and the empty
+                    RESPONSE_VALUE sentinel is mirrored like Source servers do
+  * REST API      - GET  /v1/api/info, /v1/api/players, /v1/api/metrics
+                    POST /v1/api/announce, /v1/api/save, /v1/api/shutdown
+                    (Basic auth admin:<password>)
+
+Behaviour is scriptable at runtime through FakePalworldServer.configure()
+or a timed script: base latency + jitter (per route overrides), error rate
+(RCON "error" replies / HTTP 500), drop rate (connection closed), stall
+rate (no reply at all), and a player population with optional churn.
+
+Usage (standalone):
+    python benchmarks/fake_palworld.py --players 32 --latency 0.02 --error-rate 0.01
+
+then point the bot's rcon_host/rcon_port/rcon_password and
+rest_api_endpoint/rest_api_key at the printed addresses.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import random
+import struct
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+SERVERDATA_AUTH = 3
+SERVERDATA_AUTH_RESPONSE = 2
+SERVERDATA_EXECCOMMAND = 2
+SERVERDATA_RESPONSE_VALUE = 0
+FRAGMENT = 4096
+
+
+def rcon_packet(request_id: int, packet_type: int, body: bytes) -> bytes:
+    return struct.pack('<iii', len(body) + 10, request_id, packet_type) + body + b'\x00\x00'
+
+
+class FakePlayer:
+    __slots__ = ('name', 'player_id', 'user_id', 'level', 'ip', 'ping', 'x', 'y', 'buildings')
+
+    def __init__(self, index: int):
+        self.name = f"Tester{index:04d}"
+        self.player_id = f"{random.getrandbits(32):08X}"
+        self.user_id = f"steam_7656119{index:010d}"
+        self.level = random.randint(1, 55)
+        self.ip = f"10.0.{index // 250}.{index % 250 + 1}"
+        self.ping = round(random.uniform(20, 120), 1)
+        self.x = round(random.uniform(-300000, 300000), 1)
+        self.y = round(random.uniform(-300000, 300000), 1)
+        self.buildings = random.randint(0, 400)
+
+    def as_rest(self) -> Dict:
+        return {
+            "name": self.name, "accountName": self.name.lower(), "playerId": self.player_id,
+            "userId": self.user_id, "ip": self.ip, "ping": self.ping,
+            "location_x": self.x, "location_y": self.y, "level": self.level,
+            "building_count": self.buildings
+        }
+
+
+class FakePalworldServer:
+    """
+    asyncio RCON + REST server with injectable latency and faults.
+    Every request is counted in `counters`; broadcasts and item grants are
+    kept in `announcements` / `grants` so tests can assert on them.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', rcon_port: int = 0, rest_port: int = 0,
+                 password: str = 'fakepass', players: int = 16, max_players: int = 32, **behaviour):
+        self.host = host
+        self.rcon_port = rcon_port
+        self.rest_port = rest_port
+        self.password = password
+        self.max_players = max_players
+
+        # Runtime knobs (see configure)
+        self.latency = 0.0
+        self.jitter = 0.0
+        self.route_latency: Dict[str, float] = {}
+        self.error_rate = 0.0
+        self.drop_rate = 0.0
+        self.stall_rate = 0.0
+        self.churn = 0.0
+        self.mirror_sentinel = True
+        self.configure(**behaviour)
+
+        self._next_index = 0
+        self.players: Dict[str, FakePlayer] = {}
+        self.set_population(players)
+
+        self.counters: Counter = Counter()
+        self.announcements: List[str] = []
+        self.grants: List[Tuple[str, str, str]] = []
+        self.started = time.time()
+        self.shutdown_requested: Optional[Dict] = None
+
+        self._rcon_server = None
+        self._rest_runner = None
+        self._tasks: List[asyncio.Task] = []
+        self._closing = asyncio.Event()
+
+    # --- Behaviour ---
+    def configure(self, latency: float = None, jitter: float = None, route_latency: Dict[str, float] = None,
+                  error_rate: float = None, drop_rate: float = None, stall_rate: float = None,
+                  churn: float = None, mirror_sentinel: bool = None):
+        """Change behaviour on the fly; omitted knobs keep their value"""
+        for key, value in (('latency', latency), ('jitter', jitter), ('error_rate', error_rate),
+                           ('drop_rate', drop_rate), ('stall_rate', stall_rate), ('churn', churn),
+                           ('mirror_sentinel', mirror_sentinel)):
+            if value is not None:
+                setattr(self, key, value)
+        if route_latency is not None:
+            self.route_latency = dict(route_latency)
+
+    def set_population(self, count: int):
+        """Grow or shrink the online player list to `count`"""
+        count = max(0, count)
+        while len(self.players) < count:
+            self._join()
+        while len(self.players) > count:
+            self._leave()
+
+    def _join(self):
+        player = FakePlayer(self._next_index)
+        self._next_index += 1
+        self.players[player.user_id] = player
+
+    def _leave(self):
+        if self.players:
+            del self.players[random.choice(list(self.players))]
+
+    async def _churn_loop(self):
+        # churn = joins+leaves per second, population drifts around its start size
+        target = len(self.players)
+        while True:
+            if self.churn <= 0:
+                await asyncio.sleep(0.5)
+                continue
+            await asyncio.sleep(random.expovariate(self.churn))
+            if len(self.players) > target or (len(self.players) == target and random.random() < 0.5):
+                self._leave()
+            else:
+                self._join()
+
+    async def run_script(self, steps: List[Tuple[float, Dict]]):
+        """Apply configure(**changes) at each offset (seconds from now)"""
+        start = time.monotonic()
+        for at, changes in sorted(steps, key=lambda step: step[0]):
+            await asyncio.sleep(max(0.0, start + at - time.monotonic()))
+            players = changes.pop('players', None)
+            if players is not None:
+                self.set_population(players)
+            self.configure(**changes)
+
+    async def _delay(self, route: str):
+        delay = self.route_latency.get(route, self.latency)
+        if self.jitter:
+            delay += random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _fault(self) -> Optional[str]:
+        """'stall', 'drop', 'error' or None, drawn per request"""
+        roll = random.random()
+        if roll < self.stall_rate:
+            return 'stall'
+        roll -= self.stall_rate
+        if roll < self.drop_rate:
+            return 'drop'
+        roll -= self.drop_rate
+        if roll < self.error_rate:
+            return 'error'
+        return None
+
+    # --- Lifecycle ---
+    async def start(self):
+        self._rcon_server = await asyncio.start_server(self._handle_rcon, self.host, self.rcon_port)
+        self.rcon_port = self._rcon_server.sockets[0].getsockname()[1]
+
+        app = web.Application(middlewares=[self._auth_middleware])
+        app.router.add_get('/v1/api/info', self._rest_info)
+        app.router.add_get('/v1/api/players', self._rest_players)
+        app.router.add_get('/v1/api/metrics', self._rest_metrics)
+        app.router.add_post('/v1/api/announce', self._rest_announce)
+        app.router.add_post('/v1/api/save', self._rest_save)
+        app.router.add_post('/v1/api/shutdown', self._rest_shutdown)
+        self._rest_runner = web.AppRunner(app, access_log=None)
+        await self._rest_runner.setup()
+        site = web.TCPSite(self._rest_runner, self.host, self.rest_port)
+        await site.start()
+        self.rest_port = site._server.sockets[0].getsockname()[1]
+
+        self._tasks.append(asyncio.create_task(self._churn_loop()))
+        return self
+
+    async def stop(self):
+        self._closing.set()
+        for task in self._tasks:
+            task.cancel()
+        if self._rcon_server:
+            self._rcon_server.close()
+            await self._rcon_server.wait_closed()
+        if self._rest_runner:
+            await self._rest_runner.cleanup()
+
+    @property
+    def rest_endpoint(self) -> str:
+        return f"http://{self.host}:{self.rest_port}"
+
+    def bot_config(self) -> Dict:
+        """Config keys that point the bot at this server"""
+        return {
+            'rcon_host': self.host, 'rcon_port': self.rcon_port, 'rcon_password': self.password,
+            'rest_api_endpoint': self.rest_endpoint, 'rest_api_key': self.password
+        }
+
+    # --- RCON ---
+    async def _handle_rcon(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.counters['rcon_connections'] += 1
+        authed = False
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                size = struct.unpack('<i', await reader.readexactly(4))[0]
+                data = await reader.readexactly(size)
+                request_id, packet_type = struct.unpack('<ii', data[:8])
+                body = data[8:-2].decode('utf-8', 'replace')
+
+                if packet_type == SERVERDATA_AUTH:
+                    authed = body == self.password
+                    self.counters['rcon_auth_ok' if authed else 'rcon_auth_failed'] += 1
+                    writer.write(rcon_packet(request_id, SERVERDATA_RESPONSE_VALUE, b'')
+                                 + rcon_packet(request_id if authed else -1, SERVERDATA_AUTH_RESPONSE, b''))
+                    await writer.drain()
+                    continue
+                if not authed:
+                    break
+                if packet_type == SERVERDATA_RESPONSE_VALUE:
+                    # Sentinel: answered strictly after everything sent before it
+                    if self.mirror_sentinel:
+                        reply = rcon_packet(request_id, SERVERDATA_RESPONSE_VALUE, b'')
+                        reply += rcon_packet(request_id, SERVERDATA_RESPONSE_VALUE, b'\x00\x01\x00\x00')
+                        task = asyncio.create_task(self._rcon_reply_after(list(tasks), write_lock, writer, reply))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                    continue
+
+                self.counters['rcon_commands'] += 1
+                fault = self._fault()
+                if fault == 'drop':
+                    self.counters['rcon_dropped'] += 1
+                    break
+                if fault == 'stall':
+                    self.counters['rcon_stalled'] += 1
+                    continue
+                task = asyncio.create_task(self._rcon_execute(request_id, body, fault == 'error', write_lock, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _rcon_reply_after(self, tasks: List[asyncio.Task], write_lock, writer, data: bytes):
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        async with write_lock:
+            writer.write(data)
+            await writer.drain()
+
+    async def _rcon_execute(self, request_id: int, command: str, error: bool, write_lock, writer):
+        verb = command.split(' ', 1)[0]
+        await self._delay(verb.lower())
+        text = "Error: internal server error" if error else self._rcon_output(command)
+        if error:
+            self.counters['rcon_errors'] += 1
+        data = text.encode('utf-8')
+        out = b''.join(rcon_packet(request_id, SERVERDATA_RESPONSE_VALUE, data[i:i + FRAGMENT])
+                       for i in range(0, max(len(data), 1), FRAGMENT))
+        async with write_lock:
+            writer.write(out)
+            await writer.drain()
+
+    def _rcon_output(self, command: str) -> str:
+        parts = command.split(' ')
+        verb = parts[0].lower()
+        self.counters[f'rcon:{verb}'] += 1
+        if verb == 'showplayers':
+            lines = ['name,playeruid,steamid']
+            lines += [f"{p.name},{int(p.player_id, 16)},{p.user_id.replace('steam_', '')}" for p in self.players.values()]
+            return '\n'.join(lines)
+        if verb == 'info':
+            return "Welcome to Pal Server[v0.3.0] Fake Palworld"
+        if verb == 'save':
+            return "Complete Save"
+        if verb == 'broadcast':
+            self.announcements.append(command[len(parts[0]) + 1:])
+            return "Broadcasted: " + command[len(parts[0]) + 1:]
+        if verb in ('give', 'give_exp', 'givepal', 'givepal_j'):
+            if len(parts) < 3:
+                return "Invalid arguments"
+            target = parts[1]
+            if target not in self.players and f"steam_{target}" not in self.players:
+                return f"Player {target} not found"
+            self.grants.append((verb, target, ' '.join(parts[2:])))
+            return f"Successfully gave {' '.join(parts[2:])} to {target}"
+        if verb in ('tell', 'pg'):
+            return "Message sent"
+        return "Unknown command"
+
+    # --- REST ---
+    @web.middleware
+    async def _auth_middleware(self, request: web.Request, handler):
+        self.counters['rest_requests'] += 1
+        expected = 'Basic ' + base64.b64encode(f"admin:{self.password}".encode()).decode()
+        if request.headers.get('Authorization') != expected:
+            self.counters['rest_unauthorized'] += 1
+            return web.Response(status=401, text="Unauthorized")
+
+        route = request.path.rsplit('/', 1)[-1]
+        self.counters[f'rest:{route}'] += 1
+        fault = self._fault()
+        if fault == 'stall':
+            self.counters['rest_stalled'] += 1
+            await self._closing.wait()
+        await self._delay(route)
+        if fault == 'drop':
+            self.counters['rest_dropped'] += 1
+            request.transport.close()
+            return web.Response(status=500)
+        if fault == 'error':
+            self.counters['rest_errors'] += 1
+            return web.Response(status=500, text="Internal Server Error")
+        return await handler(request)
+
+    async def _rest_info(self, request):
+        return web.json_response({
+            "version": "v0.3.0", "servername": "Fake Palworld",
+            "description": "Local test server", "worldguid": "0" * 32
+        })
+
+    async def _rest_players(self, request):
+        return web.json_response({"players": [p.as_rest() for p in self.players.values()]})
+
+    async def _rest_metrics(self, request):
+        return web.json_response({
+            "serverfps": 60, "currentplayernum": len(self.players), "serverframetime": 16.6,
+            "maxplayernum": self.max_players, "uptime": int(time.time() - self.started), "days": 1
+        })
+
+    async def _rest_announce(self, request):
+        data = await request.json()
+        if not data.get('message'):
+            return web.Response(status=400, text="message is required")
+        self.announcements.append(data['message'])
+        return web.Response(status=200)
+
+    async def _rest_save(self, request):
+        return web.Response(status=200)
+
+    async def _rest_shutdown(self, request):
+        self.shutdown_requested = await request.json()
+        return web.Response(status=200)
+
+
+async def _main(args):
+    server = await FakePalworldServer(
+        host=args.host, rcon_port=args.rcon_port, rest_port=args.rest_port, password=args.password,
+        players=args.players, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        drop_rate=args.drop_rate, stall_rate=args.stall_rate, churn=args.churn
+    ).start()
+    print(f"🎮 Fake Palworld server running ({len(server.players)} players)")
+    print(f"   RCON  {server.host}:{server.rcon_port}")
+    print(f"   REST  {server.rest_endpoint}")
+    print("   Bot config:")
+    print(json.dumps(server.bot_config(), indent=4))
+    try:
+        while True:
+            await asyncio.sleep(30)
+            print(f"📊 {dict(server.counters)}")
+    finally:
+        await server.stop()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Fake Palworld RCON + REST server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--rcon-port', type=int, default=25575)
+    parser.add_argument('--rest-port', type=int, default=8212)
+    parser.add_argument('--password', default='fakepass')
+    parser.add_argument('--players', type=int, default=16)
+    parser.add_argument('--latency', type=float, default=0.0, help="base response delay (s)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="extra uniform random delay (s)")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--drop-rate', type=float, default=0.0)
+    parser.add_argument('--stall-rate', type=float, default=0.0)
+    parser.add_argument('--churn', type=float, default=0.0, help="player joins+leaves per second")
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,166 @@
+"""
+Benchmark: materialized leaderboards (utils/leaderboards.py) vs ORDER BY.
+
+Fills a temporary database with synthetic players, then reports
+  * startup   - time to build every board from SQL (the only full read)
+  * updates   - cost per score change at growing board sizes; stays roughly
+                flat as n grows 100x (bisect + shift inside one chunk)
+  * reads     - top-K from memory for growing K vs the old ORDER BY query
+  * check     - after a mix of writes through the real PlayerStatsDB paths
+                (write-behind rewards, activity, transfers, purchases, gifts
+                to everyone), every board still matches SQL; exits 1 if not
+
+Usage: python benchmarks/leaderboard_benchmark.py [players]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The global config and database are built on import: keep them out of the repo's data/
+os.environ.setdefault('BOT_DATA_DIR', tempfile.mkdtemp(prefix='palbot_bench_'))
+
+from utils.database import PlayerStatsDB
+from utils.leaderboards import RankedScores
+
+SQL_ORDER = {
+    'palmarks': "SELECT steam_id, palmarks FROM players ORDER BY palmarks DESC, steam_id LIMIT ?",
+    'playtime': "SELECT steam_id, total_playtime FROM players ORDER BY total_playtime DESC, steam_id LIMIT ?",
+    'building': '''SELECT p.steam_id, a.structures_built FROM players p JOIN activity_stats a ON p.steam_id = a.steam_id
+                   ORDER BY a.structures_built DESC, p.steam_id LIMIT ?''',
+    'crafting': '''SELECT p.steam_id, a.items_crafted FROM players p JOIN activity_stats a ON p.steam_id = a.steam_id
+                   ORDER BY a.items_crafted DESC, p.steam_id LIMIT ?''',
+    'daily': "SELECT steam_id, palmarks_earned FROM daily_stats WHERE date = ? ORDER BY palmarks_earned DESC, steam_id LIMIT ?",
+}
+
+
+def populate(database: PlayerStatsDB, players: int):
+    rng = random.Random(7)
+    today = datetime.now().date().isoformat()
+    conn = database.get_connection()
+    cursor = conn.cursor()
+    ids = [f"steam_{i:06d}" for i in range(players)]
+    cursor.executemany(
+        "INSERT INTO players (steam_id, player_name, palmarks, total_playtime) VALUES (?, ?, ?, ?)",
+        [(sid, f"Player{i}", rng.randint(0, 50000), rng.randint(0, 10 ** 6)) for i, sid in enumerate(ids)]
+    )
+    cursor.executemany(
+        "INSERT INTO activity_stats (steam_id, structures_built, items_crafted) VALUES (?, ?, ?)",
+        [(sid, rng.randint(0, 5000), rng.randint(0, 5000)) for sid in ids]
+    )
+    cursor.executemany(
+        "INSERT INTO daily_stats (steam_id, date, palmarks_earned) VALUES (?, ?, ?)",
+        [(sid, today, rng.randint(1, 2000)) for sid in ids[::10]]
+    )
+    conn.commit()
+    conn.close()
+    return ids
+
+
+def sql_top(database: PlayerStatsDB, category: str, k: int):
+    conn = database.get_connection()
+    cursor = conn.cursor()
+    params = (datetime.now().date().isoformat(), k) if category == 'daily' else (k,)
+    cursor.execute(SQL_ORDER[category], params)
+    rows = [(row[0], row[1]) for row in cursor.fetchall()]
+    conn.close()
+    return rows
+
+
+def bench_updates(sizes, ops: int = 20000):
+    print("\nUpdates (random +/- deltas on one board)")
+    rng = random.Random(1)
+    for n in sizes:
+        board = RankedScores()
+        board.load((f"p{i}", rng.randint(0, 50000)) for i in range(n))
+        targets = [(f"p{rng.randrange(n)}", rng.randint(-500, 500)) for _ in range(ops)]
+        start = time.perf_counter()
+        for steam_id, delta in targets:
+            board.adjust(steam_id, delta)
+        per_op = (time.perf_counter() - start) / ops * 1e6
+        print(f"  n={n:>7,}  {per_op:6.2f} µs/update")
+
+
+def bench_reads(database: PlayerStatsDB, ks, repeat: int = 200):
+    print("\nReads (PALDOGS board)")
+    board = database.leaderboards
+    for k in ks:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            board.top('palmarks', k)
+        memory_us = (time.perf_counter() - start) / repeat * 1e6
+        print(f"  top {k:>5,} from memory   {memory_us:9.1f} µs")
+    start = time.perf_counter()
+    for _ in range(20):
+        sql_top(database, 'palmarks', 10)
+    print(f"  top    10 ORDER BY        {(time.perf_counter() - start) / 20 * 1e6:9.1f} µs")
+    start = time.perf_counter()
+    for _ in range(20):
+        sql_top(database, 'building', 10)
+    print(f"  top    10 JOIN + ORDER BY {(time.perf_counter() - start) / 20 * 1e6:9.1f} µs")
+    start = time.perf_counter()
+    for _ in range(repeat):
+        database._get_leaderboard('building', 10)
+    print(f"  get_leaderboard('building', 10) {(time.perf_counter() - start) / repeat * 1e6:9.1f} µs (incl. name lookup)")
+
+
+def check_consistency(database: PlayerStatsDB, ids, ops: int = 5000) -> bool:
+    rng = random.Random(3)
+    for i in range(ops):
+        steam_id = rng.choice(ids)
+        roll = rng.random()
+        if roll < 0.4:
+            database.write_queue.add_palmarks(steam_id, rng.randint(1, 3000), "bench")
+        elif roll < 0.6:
+            database.write_queue.add_activity(steam_id, rng.choice(['building', 'crafting', 'chat']), rng.randint(1, 50))
+        elif roll < 0.7:
+            database._add_palmarks(steam_id, rng.randint(-200, 4000), "bench")
+        elif roll < 0.8:
+            database._transfer_paldogs(steam_id, rng.choice(ids), rng.randint(1, 500))
+        elif roll < 0.9:
+            database._create_delivery(steam_id, [('item', 'Wood', 1)], 'bench', "bench", cost=rng.randint(1, 300))
+        else:
+            with database.unit_of_work(steam_id) as uow:
+                uow.add_activity('building', 3)
+                uow.add_palmarks(25, "bench")
+        if i == ops // 2:
+            database._add_palmarks_to_all(100, "gift")
+    database._upsert_player("steam_newcomer", "Newcomer")
+    database.write_queue.flush()
+
+    ok = True
+    for category in SQL_ORDER:
+        memory = database.leaderboards.top(category, 50)
+        expected = sql_top(database, category, 50)
+        match = memory == expected
+        ok = ok and match
+        print(f"  {'PASS' if match else 'FAIL'}  {category:<9} top 50 matches SQL")
+    return ok
+
+
+def main():
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as tmp:
+        database = PlayerStatsDB(os.path.join(tmp, "leaderboards.db"))
+        ids = populate(database, players)
+
+        start = time.perf_counter()
+        database._load_leaderboards()
+        print(f"Startup: built {len(database.leaderboards.boards)} boards for {players:,} players "
+              f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        bench_updates([1000, 10000, players])
+        bench_reads(database, [10, 100, 1000])
+
+        print("\nConsistency after mixed writes")
+        ok = check_consistency(database, ids)
+        print(f"\nBoard stats: {database.leaderboards.stats()}")
+        database.close()
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
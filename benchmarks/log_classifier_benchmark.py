@@ -0,0 +1,135 @@
+"""
+Benchmark: PalDefender log line classification throughput.
+
+Generates a large synthetic PalDefender log (combat-heavy, like a busy
+server) and classifies every line with
+  * legacy     - the old approach: up to ten full regexes per line in
+                 parse_line, then four chat-relay regexes in MonitorRelay
+  * classifier - LogLineClassifier: one prefix parse + one dispatched pattern
+
+Both must agree on every line; the script exits 1 if they don't.
+
+Usage: python benchmarks/log_classifier_benchmark.py [lines]
+"""
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The global config and database are built on import: keep them out of the repo's data/
+os.environ.setdefault('BOT_DATA_DIR', tempfile.mkdtemp(prefix='palbot_bench_'))
+
+from utils.log_parser import LogLineClassifier
+
+LEGACY_PATTERNS = {
+    'login': re.compile(r"\[.*?\]\[info\] '(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\) has logged in.*"),
+    'logout': re.compile(r"\[.*?\]\[info\] '(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\) has logged out.*"),
+    'building': re.compile(r"\[.*?\]\[info\] '(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\) (?:has )?buil[td] an?\s*'(?P<item>.+?)'"),
+    'crafting': re.compile(r"\[.*?\]\[info\] '(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\) (?:has )?(?:started )?crafting (?:(?P<qty>\d+)x\s*)?'(?P<item>.+?)'"),
+    'tech': re.compile(r"\[.*?\]\[info\] '(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\) unlocking Technology: '(?P<item>.+?)'"),
+    'chat': re.compile(r"\[.*?\]\[info\] \[Chat::(?P<type>.*?)\].*?\['(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\)\](?:\[.*?\])*: (?P<msg>.+)"),
+    'combat': re.compile(r"\[.*?\]\[info\] '(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\) dealing damage \((?P<dmg>\d+)\) to '(?P<tar>.+?)'"),
+    'kill': re.compile(r"\[.*?\]\[info\] '(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\) killed '(?P<tar>.+?)'"),
+    'chest': re.compile(r"\[.*?\]\[info\] '(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\) (?:has )?(?:opened|opening|looted|looting) '(?P<item>.+?)' at (?P<coords>.+)"),
+    'oil_rig': re.compile(r"\[.*?\]\[info\] \[OilRig\] '(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\) has (?P<msg>.+)")
+}
+
+LEGACY_CHAT_PATTERNS = [
+    re.compile(r"\[Chat::Global\]\['(?P<author>.+?)'\s*\(UserId=.*?\)\].*?:\s*(?P<content>.*)"),
+    re.compile(r"\[Chat::(?:Global)\]\['(?P<author>[^']+)'.*\].*?:\s*(?P<content>.*)"),
+    re.compile(r"\[Chat::Global\]\s*\[?(?P<author>[^'\[]+?)[\s'\]]*\(UserId=.*?\)\].*?:\s*(?P<content>.*)"),
+    re.compile(r"\[.*?\]\[info\] \[Chat::Global\]\['(?P<author>.+?)' \(UserId=steam_\d+, IP=.+?\)\](?:\[.*?\])*:\s*(?P<content>.+)")
+]
+
+
+def legacy_classify(line):
+    """Old parse_line + MonitorRelay chat relay matching"""
+    activity_type, fields = None, None
+    for name, pattern in LEGACY_PATTERNS.items():
+        match = pattern.search(line)
+        if match:
+            activity_type, fields = name, match.groupdict()
+            break
+    relay = None
+    for pattern in LEGACY_CHAT_PATTERNS:
+        match = pattern.search(line)
+        if match:
+            relay = (match.group('author').strip("'[] "), match.group('content').strip())
+            break
+    return activity_type, fields, relay
+
+
+def new_classify(classifier, line):
+    activity_type, fields = classifier.classify(line)
+    return activity_type, fields, classifier.relay_fields(line, activity_type, fields)
+
+
+def synthetic_log(count: int, seed: int = 1):
+    """Rough mix of a busy server: mostly combat, some building/crafting/chat"""
+    rng = random.Random(seed)
+    names = ["Ash", "Misty O'Hara", "Brock", "[TAG] Gary", "Dawn", "May 2"]
+
+    def who():
+        i = rng.randrange(len(names))
+        return f"'{names[i]}' (UserId=steam_7656119{i:010d}, IP=10.0.0.{i})"
+
+    templates = [
+        (40, lambda: f"{who()} dealing damage ({rng.randint(1, 999)}) to 'SheepBall'"),
+        (10, lambda: f"{who()} killed 'Foxparks'"),
+        (10, lambda: f"{who()} has build a 'WoodenFoundation'"),
+        (8, lambda: f"{who()} started crafting {rng.randint(1, 20)}x 'PalSphere'"),
+        (3, lambda: f"{who()} crafting 'IronIngot'"),
+        (2, lambda: f"{who()} unlocking Technology: 'Workbench'"),
+        (8, lambda: f"[Chat::Global]['{names[rng.randrange(len(names))]}' (UserId=steam_1, IP=1.1.1.1)]: hello there"),
+        (2, lambda: f"[Chat::Guild]['Ash' (UserId=steam_1, IP=1.1.1.1)][Team]: gg"),
+        (2, lambda: f"{who()} has logged in"),
+        (2, lambda: f"{who()} has logged out"),
+        (2, lambda: f"{who()} opened 'SupplyChest' at 500 -400 100"),
+        (1, lambda: f"[OilRig] {who()} has killed the CombatiCopter (Lv60)"),
+        (10, lambda: "Server tick 33ms, 14 players, 1203 actors"),
+    ]
+    weights = [w for w, _ in templates]
+    makers = [m for _, m in templates]
+    lines = []
+    for i in range(count):
+        body = rng.choices(makers, weights)[0]()
+        if body.startswith("Server tick"):
+            lines.append(f"[2024-01-01 12:{i % 60:02d}:00][warning] {body}")
+        else:
+            lines.append(f"[2024-01-01 12:{i % 60:02d}:00][info] {body}")
+    return lines
+
+
+def run(label, fn, lines):
+    start = time.perf_counter()
+    results = [fn(line) for line in lines]
+    elapsed = time.perf_counter() - start
+    print(f"{label:<11} {len(lines) / elapsed:>12,.0f} lines/s  ({elapsed:.2f}s)")
+    return results, elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    lines = synthetic_log(count)
+    classifier = LogLineClassifier()
+
+    print(f"Classifying {count:,} synthetic PalDefender lines")
+    legacy, legacy_time = run("legacy", legacy_classify, lines)
+    new, new_time = run("classifier", lambda line: new_classify(classifier, line), lines)
+    print(f"speedup     {legacy_time / new_time:.1f}x")
+
+    mismatches = [(line, a, b) for line, a, b in zip(lines, legacy, new) if a != b]
+    for line, a, b in mismatches[:5]:
+        print(f"MISMATCH {line!r}\n  legacy:     {a}\n  classifier: {b}")
+    if mismatches:
+        print(f"[FAIL] {len(mismatches)} lines classified differently")
+        return 1
+    print("[OK] classifier output identical to legacy")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Benchmark: player name autocomplete, LIKE '%q%' vs the trigram NameIndex.
+
+Fills a temporary database with synthetic player names (some with accents
+and mixed case), then times every prefix of a few typed names, one
+keystroke at a time, the way Discord autocomplete calls us, through
+  * like   - the old SELECT ... WHERE player_name LIKE '%q%' LIMIT 25
+  * index  - db._get_player_names_autocomplete (utils/name_search.py)
+and checks that the index finds exactly the names a brute-force
+normalized substring match finds, ranks prefixes first, folds case and
+accents, resolves name lookups exact > case-insensitive > accent-folded,
+follows renames and puts online players first. Exits 1 if a check fails.
+
+Usage: python benchmarks/name_search_benchmark.py [players]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The global config and database are built on import: keep them out of the repo's data/
+os.environ.setdefault('BOT_DATA_DIR', tempfile.mkdtemp(prefix='palbot_bench_'))
+
+from utils.database import PlayerStatsDB
+from utils.name_search import normalize_name
+
+SYLLABLES = ["ka", "ri", "to", "mo", "zen", "pal", "dra", "go", "lu", "na", "shi", "vex", "or", "el", "tha", "qu"]
+DECOR = ["", "", "", "_", "x", "99", "TTV", "Ñ", "é", "ø"]
+TYPED = ["Palmaster", "drago", "Zenith", "Élise", "x", "Sir Qwyk"]
+
+failures = []
+
+
+def check(name: str, ok: bool, detail: str = ''):
+    print(f"{'PASS' if ok else 'FAIL'}  {name}{'  (' + detail + ')' if detail else ''}")
+    if not ok:
+        failures.append(name)
+
+
+def synthetic_name(rng: random.Random) -> str:
+    core = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3)))
+    core += ''.join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(1, 4)))
+    name = rng.choice(DECOR) + core + rng.choice(DECOR)
+    return name.capitalize() if rng.random() < 0.5 else name
+
+
+def populate(database: PlayerStatsDB, players: int):
+    rng = random.Random(11)
+    rows = [(f"steam_{i:06d}", synthetic_name(rng)) for i in range(players)]
+    rows += [("steam_palmaster", "PalMaster"), ("steam_elise", "Élise"), ("steam_elise_plain", "Elise"),
+             ("steam_elise_upper", "ELISE"), ("steam_zenith", "Zenith Drago"),
+             ("steam_wordprefix", "Sir Qwyk"), ("steam_substring", "Aqwyk")]
+    conn = database.get_connection()
+    conn.executemany("INSERT INTO players (steam_id, player_name) VALUES (?, ?)", rows)
+    conn.commit()
+    conn.close()
+    return rows
+
+
+def like_query(database: PlayerStatsDB, current: str):
+    conn = database.get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT player_name FROM players WHERE player_name LIKE ? LIMIT 25", (f"%{current}%",))
+    rows = [row[0] for row in cursor.fetchall()]
+    conn.close()
+    return rows
+
+
+def time_keystrokes(label: str, fn):
+    latencies = []
+    for word in TYPED:
+        for end in range(1, len(word) + 1):
+            start = time.perf_counter()
+            fn(word[:end])
+            latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"  {label:<6} {len(latencies)} keystrokes  p50 {p50:7.2f} ms  p99 {p99:7.2f} ms  max {latencies[-1]:7.2f} ms")
+    return latencies[-1]
+
+
+def main():
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as tmp:
+        database = PlayerStatsDB(os.path.join(tmp, "names.db"))
+        rows = populate(database, players)
+        start = time.perf_counter()
+        database._load_name_index()
+        print(f"Indexed {len(rows):,} names ({database.names.stats()['trigrams']:,} trigrams) "
+              f"in {(time.perf_counter() - start) * 1000:.0f} ms\n")
+
+        print("Autocomplete latency")
+        time_keystrokes("like", lambda q: like_query(database, q))
+        worst = time_keystrokes("index", database._get_player_names_autocomplete)
+        print()
+
+        check("index answers every keystroke far below Discord's 3 s deadline", worst < 300, f"worst {worst:.1f} ms")
+
+        rng = random.Random(5)
+        mismatches = 0
+        for _ in range(200):
+            _, name = rng.choice(rows)
+            norm = normalize_name(name)
+            i = rng.randrange(len(norm))
+            query = norm[i:i + rng.randint(3, 5)]
+            expected = {sid for sid, n in rows if query in normalize_name(n)}
+            found = {sid for sid, _ in database.names.search(query, limit=len(rows))}
+            # search() lists a name once even when several Steam IDs share it
+            expected_names = {normalize_name(database.names.names[sid]) for sid in expected}
+            found_names = {normalize_name(database.names.names[sid]) for sid in found}
+            mismatches += expected_names != found_names
+        check("trigram matches equal brute-force substring matches", mismatches == 0, f"{mismatches}/200 differ")
+
+        results = database._get_player_names_autocomplete("palm")
+        check("prefix matches rank first", bool(results) and normalize_name(results[0]).startswith("palm"), results[0] if results else '')
+        check("case and accents are folded", "Élise" in database._get_player_names_autocomplete("ELISE"))
+        check("word prefix ranks above substring", database._get_player_names_autocomplete("qwyk") == ["Sir Qwyk", "Aqwyk"])
+        lookup = lambda name: (database._get_player_stats_by_name(name) or {}).get('steam_id')
+        database._upsert_player("steam_elise_upper", "ELISE")
+        database._upsert_player("steam_elise", "Élise")  # Most recently seen of the three
+        check("lookup prefers the exact name", lookup("Elise") == "steam_elise_plain" and lookup("ELISE") == "steam_elise_upper"
+              and lookup("Élise") == "steam_elise")
+        check("lookup falls back to a case-insensitive match", lookup("eLiSe") == "steam_elise_upper")
+        check("lookup is accent-insensitive only when nothing else matches", lookup("Élisé") == "steam_elise"
+              and lookup("elisé") == "steam_elise")
+
+        database._upsert_player("steam_elise", "Elisabeth")
+        check("renames are reindexed", "Elisabeth" in database._get_player_names_autocomplete("elisab")
+              and "Élise" not in database._get_player_names_autocomplete("élise"))
+
+        substring = [sid for sid, _ in database.names.search("ka", limit=50)]
+        target = substring[-1]
+        database.cache.set_online(target, True)
+        boosted = [sid for sid, _ in database.names.search("ka", limit=50, online=database.cache.online_ids())]
+        check("online players rank first within a match type", boosted.index(target) < substring.index(target))
+        database.close()
+
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        return 1
+    print("\nAll name search checks passed")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Check: utils/scheduler.py timer service.
+
+  * cron      - next-fire computation for daily, stepped, weekday and
+                day-of-month expressions
+  * deadlines - one-shot jobs fire on time (not on a polling grid), in order
+  * idle      - no wakeups while there are no jobs
+  * cancel    - cancelled and replaced jobs don't fire
+  * recurring - 'every N' jobs keep firing from the stored schedule
+  * catch-up  - after a "restart" (fresh scheduler on the same database),
+                overdue jobs within grace run once, ones past grace are
+                skipped, recurring jobs resume in the future
+  * parked    - jobs whose handler isn't registered yet wait for it, even
+                when a registered job due after them runs first
+
+Uses a temporary database; exits 1 if any check fails.
+
+Usage: python benchmarks/scheduler_check.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# The global config and database are built on import: keep them out of the repo's data/
+os.environ.setdefault('BOT_DATA_DIR', tempfile.mkdtemp(prefix='palbot_bench_'))
+
+import utils.scheduler as scheduler_module
+from utils.database import PlayerStatsDB
+from utils.scheduler import CronSchedule, Scheduler, daily
+
+failures = []
+
+
+def check(name: str, ok: bool, detail: str = ''):
+    print(f"{'PASS' if ok else 'FAIL'}  {name}{'  (' + detail + ')' if detail else ''}")
+    if not ok:
+        failures.append(name)
+
+
+def check_cron():
+    base = datetime(2026, 3, 14, 10, 30, 15)  # A Saturday
+    cases = [
+        (daily('05:00'), datetime(2026, 3, 15, 5, 0)),
+        (daily('10:31'), datetime(2026, 3, 14, 10, 31)),
+        ('*/15 * * * *', datetime(2026, 3, 14, 10, 45)),
+        ('0 9 * * 1-5', datetime(2026, 3, 16, 9, 0)),     # Next weekday morning: Monday
+        ('0 0 1 * *', datetime(2026, 4, 1, 0, 0)),
+        ('30 12 29 2 *', datetime(2028, 2, 29, 12, 30)),  # Leap day
+        ('0 20 * * 0', datetime(2026, 3, 15, 20, 0)),     # Sunday as 0
+    ]
+    for expression, expected in cases:
+        got = CronSchedule(expression).next_after(base)
+        check(f"cron '{expression}'", got == expected, str(got))
+    check("daily() rejects bad times", daily('25:00') is None and daily('soon') is None)
+    try:
+        CronSchedule('61 * * * *')
+        check("cron rejects out-of-range fields", False)
+    except ValueError:
+        check("cron rejects out-of-range fields", True)
+
+
+async def check_runtime(db_path: str):
+    scheduler_module.db = PlayerStatsDB(db_path)
+    sched = Scheduler()
+    fired = []
+
+    async def record(job):
+        fired.append((job['id'], time.time() - job['run_at']))
+
+    sched.register('record', record)
+    await sched.start()
+
+    await asyncio.sleep(0.5)
+    check("idle: no wakeups without jobs", sched.counters['wakeups'] == 0)
+
+    now = time.time()
+    for i, offset in enumerate([0.6, 0.2, 0.4]):
+        await sched.schedule(f"once:{i}", 'record', now + offset)
+    await sched.schedule("cancelled", 'record', now + 0.3)
+    await sched.cancel("cancelled")
+    await sched.schedule("replaced", 'record', now + 0.3)
+    await sched.schedule("replaced", 'record', now + 0.5)
+    await asyncio.sleep(0.9)
+
+    order = [job_id for job_id, _ in fired]
+    check("deadlines: fired in deadline order", order == ['once:1', 'once:2', 'replaced', 'once:0'], ', '.join(order))
+    lateness = max(late for _, late in fired)
+    check("deadlines: on time", lateness < 0.05, f"worst {lateness * 1000:.1f}ms late")
+    check("cancel: cancelled job never fired", 'cancelled' not in order)
+    check("cancel: replaced job fired once", order.count('replaced') == 1)
+    check("one-shot jobs removed", not sched.jobs and not await scheduler_module.db.get_scheduled_jobs())
+
+    fired.clear()
+    await sched.schedule("tick", 'record', schedule='every 0.2')
+    await asyncio.sleep(0.9)
+    ticks = [job_id for job_id, _ in fired if job_id == 'tick']
+    check("recurring: 'every 0.2' fired ~4 times in 0.9s", 3 <= len(ticks) <= 5, f"{len(ticks)} runs")
+    await sched.cancel("tick")
+
+    # --- Downtime: persist jobs, "crash", reload in a fresh scheduler ---
+    now = time.time()
+    await sched.schedule("overdue:ok", 'record', now + 0.1, grace=60)
+    await sched.schedule("overdue:late", 'record', now + 0.1, grace=0.05)
+    await sched.schedule("overdue:always", 'record', now + 0.1)
+    await sched.schedule("daily", 'record', now + 0.1, schedule=daily('04:00'), grace=0.05)
+    await sched.stop()
+    await asyncio.sleep(0.5)  # Bot is down while the deadlines pass
+
+    fired.clear()
+    revived = Scheduler()
+    revived.register('record', record)
+    await revived.start()
+    await asyncio.sleep(0.2)
+    ran = {job_id for job_id, _ in fired}
+    check("catch-up: overdue job within grace ran", 'overdue:ok' in ran)
+    check("catch-up: job without grace ran", 'overdue:always' in ran)
+    check("catch-up: job past grace skipped", 'overdue:late' not in ran and revived.counters['missed'] >= 1)
+    job = revived.get('daily')
+    check("catch-up: recurring job resumed in the future", job is not None and job['run_at'] > time.time()
+          and datetime.fromtimestamp(job['run_at']).strftime('%H:%M') == '04:00')
+
+    # Jobs of a kind whose handler isn't registered yet wait for it
+    await revived.schedule("later", 'not_yet', time.time() + 0.05)
+    await asyncio.sleep(0.2)
+    check("unregistered kind waits", revived.get('later') is not None)
+    revived.register('not_yet', record)
+    await asyncio.sleep(0.1)
+    check("runs once its handler registers", revived.get('later') is None and 'later' in {j for j, _ in fired})
+
+    # An overdue unregistered job ahead of a registered one must not be dropped from the heap
+    now = time.time()
+    await revived.schedule("orphan", 'not_yet_either', now - 1)
+    await revived.schedule("ready", 'record', now - 0.5)
+    await asyncio.sleep(0.1)
+    check("parked job survives a due job behind it", 'ready' in {j for j, _ in fired} and revived.get('orphan') is not None)
+    revived.register('not_yet_either', record)
+    await asyncio.sleep(0.1)
+    check("parked job runs once its handler registers", revived.get('orphan') is None and 'orphan' in {j for j, _ in fired})
+    await revived.stop()
+
+    # Same after a restart: both jobs come from the database, only 'record' has a handler
+    fired.clear()
+    now = time.time()
+    offline = Scheduler()
+    await offline.schedule("orphan:2", 'not_loaded', now - 1)
+    await offline.schedule("ready:2", 'record', now - 0.5)
+    await offline.schedule("ready:3", 'record', now - 0.2)
+    restarted = Scheduler()
+    restarted.register('record', record)
+    await restarted.start()
+    await asyncio.sleep(0.1)
+    restarted.register('not_loaded', record)
+    await asyncio.sleep(0.1)
+    check("restart: parked job kept and run after its handler registers",
+          sorted(j for j, _ in fired) == ['orphan:2', 'ready:2', 'ready:3'] and restarted.get('orphan:2') is None,
+          ', '.join(j for j, _ in fired))
+    await restarted.stop()
+    scheduler_module.db.close()
+
+
+async def main():
+    check_cron()
+    with tempfile.TemporaryDirectory() as tmp:
+        await check_runtime(os.path.join(tmp, 'scheduler_check.db'))
+    if failures:
+        print(f"\n{len(failures)} check(s) failed")
+        return 1
+    print("\nAll scheduler checks passed")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -7,6 +7,9 @@ import os
 import random
 from utils.config_manager import config
 from utils.rcon_utility import rcon_util
+from utils.delivery_engine import delivery_engine
+from utils.rest_api import rest_api
+from utils.online_players import online_players
 from utils.database import db
 from cogs.chest_system import chest_system
 from cogs.kit_mgmt import kit_system
@@ -113,7 +116,7 @@ class ChestSelectionView(nextcord.ui.View):
                 color=0xFFD700 if tier=="legendary" else 0xA335EE if tier=="epic" else 0x0070DD
             )
             embed.add_field(name="Reward", value=f"**{reward.get('name', reward['id'])}**", inline=False)
-            embed.add_field(name="Status", value="✅ Delivered" if success else f"❌ {msg}", inline=False)
+            embed.add_field(name="Status", value=f"✅ {msg}" if success else f"❌ {msg}", inline=False)
             
             await interaction.followup.send(embed=embed, delete_after=10)
             
@@ -171,6 +174,8 @@ class ChestSelectionView(nextcord.ui.View):
         return embed
 
     async def get_online_steam_ids(self) -> list:
+        if rest_api.is_configured() and await online_players.refresh():
+            return list(online_players.by_user_id)
         if not rcon_util.is_configured(): return []
         resp = await rcon_util.rcon_command(rcon_util._get_server_info(), "ShowPlayers")
         if not resp: return []
@@ -181,24 +186,26 @@ class ChestSelectionView(nextcord.ui.View):
         return steam_ids
 
     async def deliver_reward(self, steam_id, reward):
-        if reward['type'] == 'item':
-            return await rcon_util.give_item(steam_id, reward['id'], reward['amount'])
-        elif reward['type'] == 'kit':
-            kit = kit_system.get_kit(reward['id'])
-            if not kit: return False, "Kit not found"
-            results = []
-            for k_item, k_amt in kit['items'].items():
-                s, _ = await rcon_util.give_item(steam_id, k_item, k_amt)
-                results.append(s)
-            return any(results), "Kit Delivered"
-        elif reward['type'] == 'pal':
-            return await rcon_util.give_pal_template(steam_id, reward['id'])
-        elif reward['type'] == 'currency' and reward['id'] == 'PALDOGS':
+        if reward['type'] == 'currency' and reward['id'] == 'PALDOGS':
             await db.add_palmarks(steam_id, reward['amount'], "Chest Reward")
             return True, "Added"
-        elif reward['type'] == 'exp':
-            return await rcon_util.give_exp(steam_id, reward['amount'])
-        return False, "Unknown"
+        
+        if reward['type'] == 'kit':
+            kit = kit_system.get_kit(reward['id'])
+            if not kit: return False, "Kit not found"
+            items = delivery_engine.kit_items(kit)
+        elif reward['type'] in ('item', 'pal', 'exp'):
+            items = [(reward['type'], reward['id'], reward.get('amount', 1))]
+        else:
+            return False, "Unknown"
+        
+        # Recorded order: anything that fails now is re-sent when the player is next online
+        order = await delivery_engine.deliver(steam_id, items, source='chest', description=f"Chest reward: {reward.get('name', reward['id'])}")
+        if order['pending']:
+            return True, "Queued: will be re-sent when you're next online"
+        if order['failed'] and not order['delivered']:
+            return False, order['failed'][0]['response']
+        return True, "Delivered"
 
 class ChestView(nextcord.ui.View):
     def __init__(self, bot):
@@ -2,11 +2,12 @@ import nextcord
 import json
 import os
 from datetime import datetime
-from nextcord.ext import commands, tasks
+from nextcord.ext import commands
 from utils.config_manager import config
 from utils.database import db
 from utils.rcon_utility import rcon_util
 from utils.rest_api import rest_api
+from utils.scheduler import scheduler
 
 EVENT_FILE = "data/events.json"
 
@@ -348,10 +349,10 @@ class EventWinnerView(nextcord.ui.View):
 class EventSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.check_event_timers.start()
-
-    def cog_unload(self):
-        self.check_event_timers.cancel()
+        # Countdown broadcasts are scheduler jobs at the exact milestone times
+        scheduler.register('event_countdown', self.run_event_countdown)
+        scheduler.register('timer_countdown', self.run_timer_countdown)
+        self.bot.loop.create_task(self.sync_countdowns())
 
     def is_admin(self, interaction: nextcord.Interaction):
         admin_id = config.get('admin_user_id', 0)
@@ -361,52 +362,82 @@ class EventSystem(commands.Cog):
             return True
         return False
 
-    @tasks.loop(seconds=60)
-    async def check_event_timers(self):
-        """Check events and manual timers to broadcast in-game messages"""
+    # Countdown broadcasts: seconds before the start -> wording
+    MILESTONES = {
+        1800: "30 minutes",
+        900: "15 minutes",
+        300: "5 minutes",
+        60: "1 minute",
+        0: "is STARTING NOW!"
+    }
+
+    async def _plan_countdown(self, prefix, kind, target, payload):
+        """One scheduler job per milestone still ahead; each fires on time or (after downtime) at most 60s late"""
+        await scheduler.cancel_prefix(f"{prefix}:")
         now = datetime.now().timestamp()
-        
-        milestones = {
-            1800: "30 minutes",
-            900: "15 minutes",
-            300: "5 minutes",
-            60: "1 minute",
-            0: "is STARTING NOW!"
-        }
+        for threshold in self.MILESTONES:
+            fire_at = target - threshold
+            if fire_at > now - 60:
+                await scheduler.schedule(f"{prefix}:{threshold}", kind, fire_at,
+                                         payload=dict(payload, threshold=threshold), grace=60)
+
+    async def plan_event(self, msg_id):
+        """(Re)schedule an event's countdown (cancels it when the event is gone or finished)"""
+        msg_id = str(msg_id)
+        info = event_data.get_event(msg_id)
+        if info and info["status"] == "active":
+            await self._plan_countdown(f"event:{msg_id}", 'event_countdown', info["time"], {'msg_id': msg_id})
+        else:
+            await scheduler.cancel_prefix(f"event:{msg_id}:")
 
-        # 1. Check Events
-        for msg_id, info in list(event_data.events.items()):
-            if info["status"] != "active":
-                continue
-                
-            time_until = info["time"] - now
-            for threshold, label in milestones.items():
-                if threshold <= time_until < threshold + 60:
-                    if info.get("last_broadcast") != threshold:
-                        msg = f"[EVENT] '{info['name']}' {'starts in ' + label if threshold > 0 else label}"
-                        await rcon_util.broadcast(msg)
-                        info["last_broadcast"] = threshold
-                        event_data.save_data()
-            
-            if time_until < -300: # 5 mins past
-                pass
+    async def plan_timer(self, t_id):
+        t_info = event_data.manual_timers.get(t_id)
+        if t_info:
+            await self._plan_countdown(f"timer:{t_id}", 'timer_countdown', t_info["time"], {'timer_id': t_id})
+        else:
+            await scheduler.cancel_prefix(f"timer:{t_id}:")
 
-        # 2. Check Manual Timers
-        for t_id, t_info in list(event_data.manual_timers.items()):
-            time_until = t_info["time"] - now
-            
-            if time_until < -60: # Delete old timers
-                del event_data.manual_timers[t_id]
-                event_data.save_data()
-                continue
+    async def sync_countdowns(self):
+        """Schedule countdowns for everything in events.json (idempotent) and drop expired manual timers"""
+        now = datetime.now().timestamp()
+        expired = [t_id for t_id, t_info in event_data.manual_timers.items() if t_info["time"] - now < -60]
+        for t_id in expired:
+            del event_data.manual_timers[t_id]
+        if expired:
+            event_data.save_data()
+        try:
+            for msg_id, info in list(event_data.events.items()):
+                if info["status"] == "active":
+                    await self.plan_event(msg_id)
+            for t_id in list(event_data.manual_timers):
+                await self.plan_timer(t_id)
+        except Exception as e:
+            print(f"Error scheduling event countdowns: {e}")
 
-            for threshold, label in milestones.items():
-                if threshold <= time_until < threshold + 60:
-                    if t_info.get("last_broadcast") != threshold:
-                        msg = f"[TIMER] {t_info['message']} {'in ' + label if threshold > 0 else label}"
-                        await rcon_util.broadcast(msg)
-                        t_info["last_broadcast"] = threshold
-                        event_data.save_data()
+    async def run_event_countdown(self, job):
+        """Broadcast one milestone of an event countdown"""
+        info = event_data.get_event(job['payload']['msg_id'])
+        threshold = job['payload']['threshold']
+        if not info or info["status"] != "active" or info.get("last_broadcast") == threshold:
+            return
+        label = self.MILESTONES[threshold]
+        await rcon_util.broadcast(f"[EVENT] '{info['name']}' {'starts in ' + label if threshold > 0 else label}")
+        info["last_broadcast"] = threshold
+        event_data.save_data()
+
+    async def run_timer_countdown(self, job):
+        """Broadcast one milestone of a manual timer; the last one removes the timer"""
+        t_id = job['payload']['timer_id']
+        t_info = event_data.manual_timers.get(t_id)
+        threshold = job['payload']['threshold']
+        if not t_info or t_info.get("last_broadcast") == threshold:
+            return
+        label = self.MILESTONES[threshold]
+        await rcon_util.broadcast(f"[TIMER] {t_info['message']} {'in ' + label if threshold > 0 else label}")
+        t_info["last_broadcast"] = threshold
+        if threshold == 0:
+            del event_data.manual_timers[t_id]
+        event_data.save_data()
 
     @nextcord.slash_command(name="timer", description="Quick in-game manual timers")
     async def timer_group(self, interaction: nextcord.Interaction):
@@ -425,6 +456,7 @@ class EventSystem(commands.Cog):
 
         target_time = int(datetime.now().timestamp() + (minutes * 60))
         t_id = event_data.add_manual_timer(message, target_time)
+        await self.plan_timer(t_id)
         
         await interaction.response.send_message(
             f"✅ **Timer Set!**\n"
@@ -472,6 +504,7 @@ class EventSystem(commands.Cog):
         if timer_id in event_data.manual_timers:
             del event_data.manual_timers[timer_id]
             event_data.save_data()
+            await self.plan_timer(timer_id)
             await interaction.response.send_message(f"✅ Timer `{timer_id}` cancelled.", ephemeral=True)
         else:
             await interaction.response.send_message("❌ Timer ID not found. Use `/timer list` to find IDs.", ephemeral=True)
@@ -546,6 +579,7 @@ class EventSystem(commands.Cog):
             
             # Save data
             event_data.create_event(msg.id, name, desc, timestamp, event_type, modal_interaction.user.id, prize)
+            await self.plan_event(msg.id)
             
             # Initial in-game announcement
             await rcon_util.broadcast(f"[EVENT] New Event Created: '{name}'! Use /event list in Discord to join!")
@@ -644,6 +678,8 @@ class EventSystem(commands.Cog):
 
             # 4. Update the DB with the new Message ID
             if event_data.update_event_msg_id(event_id, new_msg.id):
+                await self.plan_event(event_id)
+                await self.plan_event(new_msg.id)
                 # Update the view attached to the NEW message to use the NEW ID internally
                 await new_msg.edit(view=EventView(new_msg.id))
                 
@@ -672,7 +708,7 @@ class EventSystem(commands.Cog):
             return
             
         await interaction.response.defer(ephemeral=True)
-        success = await rcon_util.broadcast(f"[ADMIN] {message}")
+        success = await rcon_util.broadcast(f"[ADMIN] {message}", rcon_util.PRIORITY_ADMIN)
         if success:
             await interaction.followup.send(f"✅ Broadcast sent: `{message}`")
         else:
@@ -689,6 +725,7 @@ class EventSystem(commands.Cog):
             return
 
         if event_data.delete_event(event_id):
+            await self.plan_event(event_id)
             try:
                 msg = await interaction.channel.fetch_message(int(event_id))
                 await msg.delete()
@@ -763,6 +800,7 @@ class EventSystem(commands.Cog):
                 data["time"] = new_ts
                 data["last_broadcast"] = None # Reset broadcast tracker
                 event_data.save_data()
+                await self.plan_event(event_id)
                 
                 # Update original message
                 try:
@@ -8,7 +8,7 @@ import os
 import time
 from utils.database import db
 from utils.rcon_utility import rcon_util
-from utils.rest_api import rest_api
+from utils.online_players import online_players
 from utils.config_manager import config
 from cogs.rank_system import rank_system
 from cogs.pal_system import pal_system
@@ -799,16 +799,12 @@ class InventoryView(View):
             stats = await db.get_player_by_discord(interaction.user.id)
             if not stats: return
             
-            online_players = await rest_api.get_player_list()
+            is_online = await online_players.is_online(stats['steam_id'])
             
-            # Safety check: If server is offline/API fails, online_players will be None
-            if not online_players:
+            # Safety check: If server is offline/API fails, is_online will be None
+            if is_online is None:
                 await interaction.followup.send("⚠️ The server appears to be **OFFLINE**. Please try again when the server is online.", ephemeral=True)
                 return
-
-            is_online = any(str(p.get('userId', '')).replace('steam_', '') == stats['steam_id'].replace('steam_', '') or 
-                            str(p.get('playerId', '')).replace('steam_', '') == stats['steam_id'].replace('steam_', '') 
-                            for p in online_players.get('players', []))
             
             if not is_online:
                 await interaction.followup.send("⚠️ You must be **ONLINE** on the server to claim your reward.", ephemeral=True)
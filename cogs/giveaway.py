@@ -6,11 +6,14 @@ import random
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-from nextcord.ext import commands, tasks
+from nextcord.ext import commands
 from utils.config_manager import config
 from utils.database import db
 from utils.rcon_utility import rcon_util
+from utils.delivery_engine import delivery_engine
 from utils.rest_api import rest_api
+from utils.online_players import online_players
+from utils.scheduler import scheduler
 from cogs.kit_system import kit_system
 from cogs.pal_system import pal_system
 
@@ -245,30 +248,26 @@ class GiveawayClaimView(nextcord.ui.View):
         # 3. Check if player is online
         is_online = False
         if rest_api.is_configured():
-            player_list = await rest_api.get_player_list()
-            if player_list and 'players' in player_list:
-                for p in player_list['players']:
-                    # Use both account name and potential playerId/userId fields
-                    if p.get('userId') == steam_id or p.get('playerId') == steam_id or p.get('name') == player_name:
-                        is_online = True
-                        break
+            # Use both account name and potential playerId/userId fields
+            is_online = await online_players.is_online(steam_id, player_name)
+            if is_online is None:
+                await interaction.followup.send("⚠️ The server is unreachable right now. Please try again shortly!", ephemeral=True)
+                return
         
         if not is_online:
             await interaction.followup.send("⚠️ You must be **ONLINE** on the server to claim your reward. Please log in and try again!", ephemeral=True)
             return
 
-        # 4. Give Reward
+        # 4. Give Reward (kits/pals go through the delivery ledger, failures are re-sent when next online)
         success = False
+        queued = False
+        items = None
         if prize_type.lower() == "kit":
             kit = kit_system.get_kit(prize_name)
             if kit:
-                results = []
-                for item_id, amt in kit['items'].items():
-                    res_bool, res_msg = await rcon_util.give_item(steam_id, item_id, amt)
-                    results.append(res_bool)
-                success = any(results)
+                items = delivery_engine.kit_items(kit)
         elif prize_type.lower() == "pal":
-            success, resp = await rcon_util.give_pal_template(steam_id, prize_name)
+            items = [('pal', prize_name, 1)]
         elif prize_type.lower() == "paldogs":
             try:
                 amount = int(prize_name)
@@ -278,9 +277,17 @@ class GiveawayClaimView(nextcord.ui.View):
                 logging.error(f"Error giving paldogs giveaway prize: {e}")
                 success = False
 
+        if items:
+            order = await delivery_engine.deliver(steam_id, items, source='giveaway', description=f"Giveaway prize: {prize_name}")
+            queued = bool(order['pending'])
+            success = bool(order['delivered']) or queued
+
         if success:
             giveaway_data.mark_claimed(gid, interaction.user.id)
-            await interaction.followup.send(f"✅ Successfully claimed your **{prize_name}**! Check your inventory/Palbox in-game.", ephemeral=True)
+            if queued:
+                await interaction.followup.send(f"⏳ Claimed your **{prize_name}**, but some of it couldn't be sent yet. It's saved and will be re-sent automatically next time you're online.", ephemeral=True)
+            else:
+                await interaction.followup.send(f"✅ Successfully claimed your **{prize_name}**! Check your inventory/Palbox in-game.", ephemeral=True)
             # Try to update the message to remove button
             try:
                 await interaction.edit_original_message(content="✅ **Reward Claimed!** Enjoy your prize!", view=None)
@@ -292,10 +299,30 @@ class GiveawayClaimView(nextcord.ui.View):
 class Giveaway(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.check_giveaways.start()
+        # Each giveaway ends through a scheduler job at its exact end time
+        scheduler.register('giveaway_end', self.run_giveaway_end)
+        self.bot.loop.create_task(self.sync_giveaway_jobs())
+
+    async def plan_giveaway(self, msg_id):
+        """(Re)schedule the end of a giveaway; no job once it has ended or was deleted"""
+        data = giveaway_data.get_giveaway(msg_id)
+        if not data or data["is_ended"]:
+            await scheduler.cancel(f"giveaway:{msg_id}")
+            return
+        # No grace: a giveaway that ended while the bot was down is still drawn
+        await scheduler.schedule(f"giveaway:{msg_id}", 'giveaway_end', datetime.fromisoformat(data["end_time"]),
+                                 payload={'msg_id': str(msg_id)})
 
-    def cog_unload(self):
-        self.check_giveaways.cancel()
+    async def sync_giveaway_jobs(self):
+        """Make sure every active giveaway has its job (also picks up giveaways created before the scheduler)"""
+        for msg_id in list(giveaway_data.get_active_giveaways()):
+            try:
+                await self.plan_giveaway(msg_id)
+            except Exception as e:
+                logging.error(f"Error scheduling giveaway {msg_id}: {e}")
+
+    async def run_giveaway_end(self, job):
+        await self.end_giveaway(job['payload']['msg_id'])
 
     def is_admin(self, interaction: nextcord.Interaction):
         admin_id = config.get('admin_user_id', 0)
@@ -360,6 +387,7 @@ class Giveaway(commands.Cog):
         msg = await interaction.channel.send(embed=embed, view=GiveawayJoinView())
         
         giveaway_data.create_giveaway(msg.id, interaction.channel.id, prize_type, prize_name, end_time, winners_count, min_participants)
+        await self.plan_giveaway(msg.id)
 
     @create_giveaway.on_autocomplete("prize_name")
     async def prize_name_autocomplete(self, interaction: nextcord.Interaction, current: str):
@@ -380,19 +408,6 @@ class Giveaway(commands.Cog):
             choices = []
         await interaction.response.send_autocomplete(choices[:25])
 
-    @tasks.loop(seconds=30)
-    async def check_giveaways(self):
-        active = giveaway_data.get_active_giveaways()
-        now = datetime.now()
-
-        for msg_id, data in active.items():
-            try:
-                end_time = datetime.fromisoformat(data["end_time"])
-                if now >= end_time:
-                    await self.end_giveaway(msg_id)
-            except Exception as e:
-                logging.error(f"Error checking giveaway {msg_id}: {e}")
-
     async def end_giveaway(self, msg_id):
         data = giveaway_data.get_giveaway(msg_id)
         if not data or data["is_ended"]:
@@ -582,6 +597,7 @@ class Giveaway(commands.Cog):
                 pass
 
         if giveaway_data.delete_giveaway(message_id):
+            await self.plan_giveaway(message_id)
             await interaction.response.send_message(f"✅ Giveaway `{message_id}` has been deleted from the database.", ephemeral=True)
         else:
             await interaction.response.send_message(f"❌ Failed to delete giveaway `{message_id}`.", ephemeral=True)
@@ -613,6 +629,8 @@ class Giveaway(commands.Cog):
         
         # Update database with new ID
         giveaway_data.update_message_id(message_id, new_msg.id)
+        await self.plan_giveaway(message_id)
+        await self.plan_giveaway(new_msg.id)
         
         await interaction.response.send_message(f"✅ Giveaway re-posted! New Message ID: `{new_msg.id}`", ephemeral=True)
         
@@ -2,6 +2,7 @@ import nextcord
 from nextcord.ext import commands
 from utils.config_manager import config
 from utils.rcon_utility import rcon_util
+from utils.delivery_engine import delivery_engine
 from utils.database import db
 from cogs.kit_system import kit_system
 
@@ -137,18 +138,15 @@ class KitManagement(commands.Cog):
             await interaction.followup.send(f"❌ Player '{player_name}' not found.")
             return
         
-        results = []
-        success_count = 0
-        for item_id, amt in kit['items'].items():
-            res_bool, res_msg = await rcon_util.give_item(stats['steam_id'], item_id, amt)
-            if res_bool:
-                results.append(f"✅ {amt}x {item_id}")
-                success_count += 1
-            else:
-                errorMessage = res_msg if res_msg else "Timeout/Mod Error"
-                results.append(f"❌ {amt}x {item_id} ({errorMessage})")
+        order = await delivery_engine.deliver(
+            stats['steam_id'], delivery_engine.kit_items(kit), source='admin',
+            description=f"Admin kit: {kit_name}", priority=rcon_util.PRIORITY_ADMIN
+        )
+        results = [f"✅ {line['amount']}x {line['item_id']}" for line in order['delivered']]
+        results += [f"⏳ {line['amount']}x {line['item_id']} ({line['response'] or 'Timeout/Mod Error'}, will retry)" for line in order['pending']]
+        results += [f"❌ {line['amount']}x {line['item_id']} ({line['response'] or 'Timeout/Mod Error'})" for line in order['failed']]
                 
-        embed = nextcord.Embed(title=f"🎁 Kit '{kit_name}' Sent", description="\n".join(results), color=0x00FF00 if success_count == len(kit['items']) else 0xFFA500)
+        embed = nextcord.Embed(title=f"🎁 Kit '{kit_name}' Sent", description="\n".join(results), color=0x00FF00 if len(order['delivered']) == len(kit['items']) else 0xFFA500)
         await interaction.followup.send(embed=embed)
 
     @give_kit.on_autocomplete("kit_name")
@@ -1,28 +1,66 @@
 import nextcord
 import asyncio
+import hashlib
+import json
+import time
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 from utils.database import db
 from utils.config_manager import config
 from utils.rest_api import rest_api
+from utils.online_players import online_players
 from utils.server_utils import get_server_state, ServerState
+from utils.event_bus import event_bus, ServerStateChanged
 from cogs.rank_system import rank_system
 
 class LiveStatsDisplay:
-    """Manages live statistics display in Discord channel"""
+    """
+    Manages live statistics display in Discord channel.
+
+    Each update reads everything the dashboard shows in one batched query
+    set, renders the embed and hashes it; the message is only edited when
+    the content actually changed. The message object is kept between
+    updates, so no fetch_message round trip is needed. Besides the
+    live_stats_interval timer, server state changes and players joining or
+    leaving trigger an update (at most one per live_stats_min_gap seconds).
+    """
+    
+    STATE_INFO = {
+        ServerState.OFFLINE: ("OFFLINE", 0xFF4B2B, "🔴", "31", "41"),
+        ServerState.STARTING: ("STARTING", 0xFFA500, "🟠", "33", "43"),
+        ServerState.ONLINE: ("ONLINE", 0x33FF33, "🟢", "32", "42"),
+        ServerState.STOPPING: ("STOPPING", 0xFF4B2B, "🔴", "31", "41")
+    }
     
     def __init__(self, bot):
         self.bot = bot
         self.stats_message_id = config.get('stats_message_id', None)
         self.stats_channel_id = config.get('stats_channel_id', None)
-        self.update_interval = 300  # 5 minutes (in seconds)
         self.running = False
+        self.message = None  # Cached Message / PartialMessage of the dashboard
+        self.last_hash = None
+        self.last_update = 0.0
+        self._wake: Optional[asyncio.Event] = None
+        self._update_lock = asyncio.Lock()
+        self.counters = {'renders': 0, 'edits': 0, 'skipped': 0, 'sends': 0, 'triggers': 0}
+        event_bus.subscribe(ServerStateChanged, self.on_server_state_changed)
+        online_players.subscribe(self.on_player_event)
+    
+    @property
+    def update_interval(self) -> float:
+        return float(config.get('live_stats_interval', 300))
+    
+    @property
+    def min_gap(self) -> float:
+        return float(config.get('live_stats_min_gap', 15))
     
     def set_channel(self, channel_id: int):
         """Set the stats channel"""
         self.stats_channel_id = channel_id
         # Load existing message ID from config
         self.stats_message_id = config.get('stats_message_id', None)
+        self.message = None
+        self.last_hash = None
     
     def create_progress_bar(self, current: int, maximum: int, length: int = 10) -> str:
         """Create a visual progress bar"""
@@ -31,33 +69,24 @@ class LiveStatsDisplay:
         filled = int((current / maximum) * length)
         return "█" * filled + "░" * (length - filled)
     
-    async def create_stats_embed(self) -> nextcord.Embed:
-        """Create an ultra-minimalist, high-end dashboard embed"""
-        # Fetch leaderboard data
-        leaderboard_raw = await db.get_leaderboard('palmarks', limit=10)
-        leaderboard = [p for p in leaderboard_raw if p.get('rank') != 'Champion'][:5]
-        
-        # Fetch current online players
+    async def collect_snapshot(self) -> Dict:
+        """Server state, online players and one batched database read"""
         current_players = []
-        player_count = 0
-        if rest_api.is_configured():
-            player_data = await rest_api.get_player_list()
-            if player_data:
-                current_players = player_data.get('players', [])
-                player_count = len(current_players)
-        
-        # Get server state
-        server_state = get_server_state()
-        state_info = {
-            ServerState.OFFLINE: ("OFFLINE", 0xFF4B2B, "🔴", "31", "41"),
-            ServerState.STARTING: ("STARTING", 0xFFA500, "🟠", "33", "43"),
-            ServerState.ONLINE: ("ONLINE", 0x33FF33, "🟢", "32", "42"),
-            ServerState.STOPPING: ("STOPPING", 0xFF4B2B, "🔴", "31", "41")
-        }
-        status_text, color, dot, fg, bg = state_info.get(server_state, ("UNKNOWN", 0x808080, "⚪", "37", "40"))
+        if rest_api.is_configured() and await online_players.refresh():
+            current_players = list(online_players.players)
+        online_ids = [p['userId'] for p in current_players if p.get('userId')]
+        snapshot = await db.get_dashboard_snapshot(online_ids, leaderboard_limit=10, activity_limit=3)
+        snapshot['state'] = get_server_state()
+        snapshot['players'] = current_players
+        return snapshot
+    
+    def render_embed(self, snapshot: Dict) -> nextcord.Embed:
+        """Create an ultra-minimalist, high-end dashboard embed"""
+        leaderboard = [p for p in snapshot['leaderboard'] if p.get('rank') != 'Champion'][:5]
+        current_players = snapshot['players']
+        player_count = len(current_players)
+        status_text, color, dot, fg, bg = self.STATE_INFO.get(snapshot['state'], ("UNKNOWN", 0x808080, "⚪", "37", "40"))
         
-        total_players = await db.get_total_players_count()
-
         # Build Title & Description
         embed = nextcord.Embed(title="Palworld • Server Dashboard", color=color, timestamp=datetime.now())
         
@@ -65,10 +94,9 @@ class LiveStatsDisplay:
         if player_count > 0:
             names = []
             for p in current_players:
-                n = p.get('name', 'Unknown')
-                stats = await db.get_player_stats_by_name(n)
-                tag = "⭐" if stats and stats.get('rank') == 'Champion' else ""
-                names.append(f"`{n}{tag}`")
+                rank = snapshot['online_ranks'].get(p.get('userId'))
+                tag = "⭐" if rank == 'Champion' else ""
+                names.append(f"`{p.get('name', 'Unknown')}{tag}`")
             embed.description = f"Currently active: {', '.join(names)}"
         else:
             embed.description = "The world is currently quiet. No players online."
@@ -79,7 +107,7 @@ class LiveStatsDisplay:
         embed.add_field(name=f"{dot} Status", value=status_box, inline=True)
         
         # Population Box
-        pop_box = f"```ansi\n\u001b[1;37m\u001b[40m {player_count} Online • {total_players} Registered \u001b[0m\n```"
+        pop_box = f"```ansi\n\u001b[1;37m\u001b[40m {player_count} Online • {snapshot['total_players']} Registered \u001b[0m\n```"
         embed.add_field(name="🌐 Population", value=pop_box, inline=True)
 
         # Leaderboard Section
@@ -87,45 +115,40 @@ class LiveStatsDisplay:
             lb_lines = []
             medals = ["🥇", "🥈", "🥉", "🏅", "🎖️"]
             for i, p in enumerate(leaderboard):
-                medal = medals[i]
                 rank_icon = self.get_rank_emoji(p.get('rank', 'Trainer'))
-                p_name = p['player_name']
-                pm = p.get('palmarks', 0)
-                
-                stats = await db.get_player_stats_by_name(p_name)
-                lvl = stats.get('level', 1) if stats else 1
-                
+                pm = p.get('palmarks') or 0
+                lvl = p.get('level') or 1
                 # Single-line clean format
-                lb_lines.append(f"{medal} {rank_icon} **{p_name}** • {pm:,} PD • Lv.{lvl}")
+                lb_lines.append(f"{medals[i]} {rank_icon} **{p['player_name']}** • {pm:,} PD • Lv.{lvl}")
             
             embed.add_field(name="= Top Players —", value="\n".join(lb_lines), inline=False)
 
         # 3. LATEST GLOBAL ACTIVITY (Integrated back into minimalist design)
-        try:
-            with db.lock:
-                conn = db.get_connection()
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT p.player_name, r.reward_type, r.description 
-                    FROM reward_history r
-                    JOIN players p ON r.steam_id = p.steam_id
-                    ORDER BY r.timestamp DESC LIMIT 3
-                ''')
-                activities = cursor.fetchall()
-                if activities:
-                    act_lines = []
-                    for act in activities:
-                        desc = act['description'].replace("Chest Open: ", "opened a ")
-                        act_lines.append(f"🕒 **{act['player_name']}** {desc}")
-                    embed.add_field(name="= Recent Activity —", value="\n".join(act_lines), inline=False)
-        except Exception:
-            pass
+        if snapshot['activity']:
+            act_lines = []
+            for act in snapshot['activity']:
+                desc = (act['description'] or '').replace("Chest Open: ", "opened a ")
+                act_lines.append(f"🕒 **{act['player_name']}** {desc}")
+            embed.add_field(name="= Recent Activity —", value="\n".join(act_lines), inline=False)
 
         # Footer Fields
-        embed.add_field(name="= Live updates every 5 minutes", value="• Powered by Paltastic", inline=False)
+        minutes = max(1, round(self.update_interval / 60))
+        embed.add_field(name=f"= Live updates on changes and every {minutes} minute{'s' if minutes != 1 else ''}",
+                        value="• Powered by Paltastic", inline=False)
         
         return embed
     
+    async def create_stats_embed(self) -> nextcord.Embed:
+        """Build the dashboard embed from a fresh snapshot"""
+        return self.render_embed(await self.collect_snapshot())
+    
+    @staticmethod
+    def embed_hash(embed: nextcord.Embed) -> str:
+        """Content hash of an embed, ignoring its timestamp"""
+        data = embed.to_dict()
+        data.pop('timestamp', None)
+        return hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()
+    
     def get_rank_emoji(self, rank: str) -> str:
         """Get emoji for rank"""
         rank_emojis = {
@@ -138,44 +161,78 @@ class LiveStatsDisplay:
         }
         return rank_emojis.get(rank, '🎓')
     
-    async def update_stats_message(self):
-        """Update the stats message"""
+    async def _get_channel(self):
+        channel = self.bot.get_channel(self.stats_channel_id)
+        if not channel:
+            try:
+                channel = await self.bot.fetch_channel(self.stats_channel_id)
+            except Exception:
+                print(f"⚠️ Stats channel {self.stats_channel_id} not found in cache or via API")
+                return None
+        return channel
+    
+    async def _send_new(self, channel, embed: nextcord.Embed):
+        self.message = await channel.send(embed=embed)
+        self.stats_message_id = self.message.id
+        self.counters['sends'] += 1
+        config.set('stats_message_id', self.message.id)
+    
+    async def update_stats_message(self, force: bool = False):
+        """Update the stats message (skipped when the content is unchanged, unless forced)"""
         if not self.stats_channel_id:
             print("⚠️ Stats channel not configured")
             return
         
-        try:
-            channel = self.bot.get_channel(self.stats_channel_id)
-            if not channel:
-                try:
-                    channel = await self.bot.fetch_channel(self.stats_channel_id)
-                except Exception:
-                    print(f"⚠️ Stats channel {self.stats_channel_id} not found in cache or via API")
+        async with self._update_lock:
+            try:
+                self.last_update = time.monotonic()
+                embed = await self.create_stats_embed()
+                self.counters['renders'] += 1
+                digest = self.embed_hash(embed)
+                if not force and self.message is not None and digest == self.last_hash:
+                    self.counters['skipped'] += 1
                     return
-            
-            embed = await self.create_stats_embed()
-            
-            # If message exists, edit it; otherwise create new
-            if self.stats_message_id:
+                
+                if self.message is None:
+                    channel = await self._get_channel()
+                    if not channel:
+                        return
+                    if not self.stats_message_id:
+                        await self._send_new(channel, embed)
+                        self.last_hash = digest
+                        print(f"✅ Created stats message with ID: {self.stats_message_id}")
+                        return
+                    # Edit by ID without fetching the message first
+                    self.message = channel.get_partial_message(self.stats_message_id)
+                
                 try:
-                    message = await channel.fetch_message(self.stats_message_id)
-                    await message.edit(embed=embed)
+                    self.message = await self.message.edit(embed=embed) or self.message
+                    self.counters['edits'] += 1
                     print(f"✅ Updated stats message at {datetime.now().strftime('%H:%M:%S')}")
                 except nextcord.NotFound:
                     # Message was deleted, create new one
-                    message = await channel.send(embed=embed)
-                    self.stats_message_id = message.id
-                    config.set('stats_message_id', message.id)
+                    self.message = None
+                    channel = await self._get_channel()
+                    if not channel:
+                        return
+                    await self._send_new(channel, embed)
                     print(f"✅ Created new stats message (old one was deleted)")
-            else:
-                # Create new message
-                message = await channel.send(embed=embed)
-                self.stats_message_id = message.id
-                config.set('stats_message_id', message.id)
-                print(f"✅ Created stats message with ID: {self.stats_message_id}")
-        
-        except Exception as e:
-            print(f"❌ Error updating stats message: {e}")
+                self.last_hash = digest
+            
+            except Exception as e:
+                print(f"❌ Error updating stats message: {e}")
+    
+    def request_update(self):
+        """Ask the update loop for an update (coalesced, rate-limited by live_stats_min_gap)"""
+        self.counters['triggers'] += 1
+        if self._wake:
+            self._wake.set()
+    
+    async def on_server_state_changed(self, event: ServerStateChanged):
+        self.request_update()
+    
+    async def on_player_event(self, kind: str, player: Dict):
+        self.request_update()
     
     async def start_auto_update(self):
         """Start automatic stats updates"""
@@ -184,12 +241,21 @@ class LiveStatsDisplay:
             return
         
         self.running = True
-        print(f"🔄 Starting stats auto-update (every {self.update_interval}s)")
+        self._wake = asyncio.Event()
+        print(f"🔄 Starting stats auto-update (every {self.update_interval:g}s and on changes)")
         
         while self.running:
             try:
                 await self.update_stats_message()
-                await asyncio.sleep(self.update_interval)
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.update_interval)
+                except asyncio.TimeoutError:
+                    pass
+                # Bursts of triggers (several joins, a state change) collapse into one update
+                wait = self.min_gap - (time.monotonic() - self.last_update)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._wake.clear()
             except Exception as e:
                 print(f"❌ Error in stats auto-update loop: {e}")
                 await asyncio.sleep(60)  # Wait a minute before retrying
@@ -197,11 +263,20 @@ class LiveStatsDisplay:
     def stop_auto_update(self):
         """Stop automatic stats updates"""
         self.running = False
+        if self._wake:
+            self._wake.set()
         print("🛑 Stopped stats auto-update")
     
     async def force_update(self):
         """Force an immediate stats update"""
-        await self.update_stats_message()
+        await self.update_stats_message(force=True)
+    
+    def stats(self) -> Dict:
+        return {
+            'message_id': self.stats_message_id,
+            'cached_message': self.message is not None,
+            **self.counters
+        }
 
 
 # Helper function to format time
@@ -6,15 +6,23 @@ import datetime
 import time
 import os
 import psutil
-import re
-import aiohttp
 import logging
 from collections import deque
+from typing import Optional, Tuple
 from utils.config_manager import config
 from utils.rest_api import rest_api
-from utils.server_utils import is_server_running, start_server, stop_server, restart_server, server_lock
+from utils.http_client import http_client
+from utils.server_utils import start_server, stop_server, restart_server, server_lock, get_server_process_stats
 from utils.database import db
+from utils.file_watcher import LogFollower
+from utils.log_pipeline import LogEventPipeline
+from utils.message_aggregator import message_aggregator
 from utils.rcon_utility import rcon_util
+from utils.delivery_engine import delivery_engine
+from utils.online_players import online_players
+from utils.server_lifecycle import server_lifecycle
+from utils.scheduler import scheduler, daily
+from utils.event_bus import event_bus, ConfigChanged
 from cogs.rank_system import rank_system
 from cogs.kit_mgmt import kit_system
 from cogs.pal_system import pal_system
@@ -35,22 +43,17 @@ class MonitorRelay(commands.Cog):
         self.recent_relays_order = deque()
         self.MAX_RELAY_HISTORY = 100
         
-        self.last_api_error_time = 0
-        self.file_positions = {}
         self.line_buffer = "" # Buffer for partial lines
+        self.buffer_offset = 0 # Byte offset of line_buffer[0] in the current log file
+        self.current_log_file = None
+        self.backfill_lock = asyncio.Lock()
+        self.log_pipeline = None
         self.roll_lock = asyncio.Lock() # Prevent concurrent in-game RCON rolls
         self.global_roll_count = 0
         self.global_cooldown_until = 0
         
-        # Pre-compile regex patterns for performance
-        self.chat_patterns = [
-            re.compile(r"\[Chat::Global\]\['(?P<author>.+?)'\s*\(UserId=.*?\)\].*?:\s*(?P<content>.*)"),
-            re.compile(r"\[Chat::(?:Global)\]\['(?P<author>[^']+)'.*\].*?:\s*(?P<content>.*)"),
-            re.compile(r"\[Chat::Global\]\s*\[?(?P<author>[^'\[]+?)[\s'\]]*\(UserId=.*?\)\].*?:\s*(?P<content>.*)"),
-            re.compile(r"\[.*?\]\[info\] \[Chat::Global\]\['(?P<author>.+?)' \(UserId=steam_\d+, IP=.+?\)\](?:\[.*?\])*:\s*(?P<content>.+)")
-        ]
-        
         # Initialize tasks
+        self.register_jobs()
         self.bot.loop.create_task(self.start_tasks())
 
     async def start_tasks(self):
@@ -59,11 +62,11 @@ class MonitorRelay(commands.Cog):
         # Register shared variables with bot for access from other cogs if needed
         self.bot.next_restart_time = self.next_restart_time
         
+        # Daily shutdown/startup and interval restarts are scheduler jobs, not polling loops
+        await self.plan_schedules()
+        
         task_mappings = {
             'monitor_ram': self.monitor_system_ram,
-            'auto_restart': self.auto_restart,
-            'scheduled_shutdown': self.scheduled_shutdown,
-            'scheduled_startup': self.scheduled_startup,
             'reset_attempts': self.reset_attempts_task,
             'tail_logs': self.tail_palguard_logs,
             'monitor_players': self.monitor_players
@@ -85,14 +88,19 @@ class MonitorRelay(commands.Cog):
                 ram_channel_id = config.get('ram_usage_channel_id', 0)
                 ram_channel = self.bot.get_channel(ram_channel_id)
                 if ram_channel:
-                    await ram_channel.send(f"💻 **System RAM Usage:** {used_memory:.2f} GB / {total_memory:.2f} GB ({memory_percent}% used)")
+                    report = f"💻 **System RAM Usage:** {used_memory:.2f} GB / {total_memory:.2f} GB ({memory_percent}% used)"
+                    process_stats = await get_server_process_stats()
+                    if process_stats:
+                        report += (f"\n🎮 **Palworld Server:** {process_stats['rss_mb'] / 1024:.2f} GB RSS, "
+                                   f"{process_stats['cpu_percent']}% CPU (PID {process_stats['pid']})")
+                    await ram_channel.send(report)
             except Exception as e:
                 logging.error(f"Error in monitor_ram: {e}")
             await asyncio.sleep(600)
 
     async def monitor_players(self):
-        last_players = {}
-        first_run = True
+        # Join/leave detection lives in the shared snapshot; we just keep it fresh
+        online_players.subscribe(self.on_player_change)
         
         while True:
             try:
@@ -100,49 +108,34 @@ class MonitorRelay(commands.Cog):
                     await asyncio.sleep(60)
                     continue
                 
-                import time
-                if time.time() - self.last_api_error_time < 60:
-                     await asyncio.sleep(10)
-                     continue
-                
-                if not await is_server_running():
-                    if last_players:
+                if not await server_lifecycle.is_running():
+                    if online_players.primed:
                         print("📡 Server offline: Clearing player monitoring state.")
-                        last_players = {}
-                    first_run = True
-                    await asyncio.sleep(15)
+                        online_players.reset()
+                    # Resume as soon as the lifecycle service sees the server come up
+                    await server_lifecycle.wait_for_change(60)
                     continue
 
-                player_data = await rest_api.get_player_list()
-                if player_data is not None:
-                    players = player_data.get('players', [])
-                    current_players = {p.get('userId'): p.get('name', 'Unknown') for p in players if p.get('userId')}
-                    
-                    if not first_run:
-                        # Joined
-                        for uid, name in current_players.items():
-                            if uid not in last_players:
-                                print(f"📥 Player detected: {name} ({uid}) joined.")
-                                await self.send_player_event(name, "joined")
-                        
-                        # Left
-                        for uid, name in last_players.items():
-                            if uid not in current_players:
-                                print(f"📤 Player detected: {name} ({uid}) left.")
-                                await self.send_player_event(name, "left")
+                if await online_players.refresh():
+                    current_players = {p.get('userId'): p.get('name', 'Unknown') for p in online_players.players}
                     
                     # Ensure all online players are in DB
                     for uid, name in current_players.items():
                         await db.upsert_player(uid, name)
                     
-                    last_players = current_players
-                    first_run = False
+                    # Re-send any items owed to players who are online now
+                    delivery_engine.players_online(current_players)
             except Exception as e:
                 if "Timeout" not in str(e) and "Connection" not in str(e):
                     logging.error(f"Error in monitor_players: {e}")
-                self.last_api_error_time = time.time()
             
-            await asyncio.sleep(20)
+            # 20s normally; backs off with the circuit breaker while the API is unreachable
+            await asyncio.sleep(rest_api.poll_interval('/v1/api/players', 20))
+
+    async def on_player_change(self, kind, player):
+        name = player.get('name', 'Unknown')
+        print(f"{'📥' if kind == 'joined' else '📤'} Player detected: {name} ({player.get('userId')}) {kind}.")
+        await self.send_player_event(name, kind)
 
     async def send_player_event(self, name, event_type):
         channel_id = config.get('player_monitor_channel_id', 0)
@@ -155,7 +148,8 @@ class MonitorRelay(commands.Cog):
                 color=color,
                 timestamp=nextcord.utils.utcnow()
             )
-            await channel.send(embed=embed)
+            # Joins/leaves after a restart arrive together: up to 10 embeds per message
+            message_aggregator.post(('channel', channel.id), self._channel_sender(channel), embed=embed)
 
 
     async def reset_attempts_task(self):
@@ -164,139 +158,104 @@ class MonitorRelay(commands.Cog):
             self.attempts["start"].clear()
             self.attempts["stop"].clear()
 
-    async def auto_restart(self):
-        while True:
-            try:
-                # 1. Immediate check if enabled
-                if not config.get('auto_restart_enabled', True) or not self.restart_enabled:
-                    self.next_restart_time = None
-                    self.bot.next_restart_time = None
-                    await asyncio.sleep(30)
-                    continue
-
-                interval = config.get('restart_interval', 10800)
-                if interval < 600:
-                    logging.warning(f"⚠️ Restart interval ({interval}s) is too short. Defaulting to 10800s (3h).")
-                    interval = 10800
-
-                announcements_str = config.get('restart_announcements', '30,10,5,1')
-                try:
-                    announce_times = sorted([int(m.strip()) * 60 for m in announcements_str.split(',') if m.strip().isdigit()], reverse=True)
-                except:
-                    announce_times = [1800, 600, 300, 60]
-
-                countdown_duration = max(announce_times) if announce_times else 0
-                now = datetime.datetime.now()
-                midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
-                seconds_since_midnight = (now - midnight).total_seconds()
-                
-                intervals_passed = int(seconds_since_midnight // interval)
-                next_interval_seconds = (intervals_passed + 1) * interval
-                target_time = midnight + datetime.timedelta(seconds=next_interval_seconds)
-                
-                if (target_time - now).total_seconds() < -30: 
-                    next_interval_seconds += interval
-                    target_time = midnight + datetime.timedelta(seconds=next_interval_seconds)
-                
-                time_until_target = (target_time - now).total_seconds()
-                initial_sleep = max(0, time_until_target - countdown_duration)
-                
-                self.next_restart_time = target_time
-                self.bot.next_restart_time = target_time
-                
-                logging.info(f"🚥 Auto-Restart Scheduled for: {target_time} (in {time_until_target:.1f}s)")
-                
-                # Sleep in increments so we can react to toggle changes faster
-                while initial_sleep > 0:
-                    if not config.get('auto_restart_enabled', True): break
-                    sleep_chunk = min(initial_sleep, 60)
-                    await asyncio.sleep(sleep_chunk)
-                    initial_sleep -= sleep_chunk
-
-                # Re-check before starting countdown
-                if not config.get('auto_restart_enabled', True) or not self.restart_enabled or not await is_server_running():
-                    await asyncio.sleep(10)
-                    continue
+    # --- Scheduled server jobs (run by utils/scheduler.py, re-planned when the settings change) ---
+    RESTART_JOB = 'server:restart'
+    SCHEDULE_KEYS = ('shutdown_time', 'startup_time', 'restart_interval', 'restart_announcements', 'auto_restart_enabled')
+
+    def register_jobs(self):
+        scheduler.register('server_shutdown', self.run_scheduled_shutdown)
+        scheduler.register('server_startup', self.run_scheduled_startup)
+        scheduler.register('auto_restart', self.run_auto_restart)
+        scheduler.register('restart_warning', self.run_restart_warning)
+        event_bus.subscribe(ConfigChanged, self.on_config_changed)
+
+    async def on_config_changed(self, event: ConfigChanged):
+        if event.key in self.SCHEDULE_KEYS:
+            await self.plan_schedules()
+
+    async def plan_schedules(self):
+        """(Re)create the daily shutdown/startup jobs and the next auto-restart from the current settings"""
+        for job_id, kind, key, default in (('server:shutdown', 'server_shutdown', 'shutdown_time', '05:00'),
+                                           ('server:startup', 'server_startup', 'startup_time', '10:00')):
+            cron = daily(str(config.get(key, default) or ''))
+            if cron:
+                # Fires within the configured minute or not at all (no shutdown hours late after downtime)
+                await scheduler.schedule(job_id, kind, schedule=cron, grace=60)
+            else:
+                await scheduler.cancel(job_id)
+        await self.plan_auto_restart()
+
+    def restart_announcements(self):
+        announcements_str = config.get('restart_announcements', '30,10,5,1')
+        try:
+            return sorted([int(m.strip()) * 60 for m in announcements_str.split(',') if m.strip().isdigit()], reverse=True)
+        except:
+            return [1800, 600, 300, 60]
+
+    async def plan_auto_restart(self):
+        """Schedule the next interval restart and its countdown broadcasts"""
+        await scheduler.cancel_prefix(self.RESTART_JOB)
+        if not config.get('auto_restart_enabled', True) or not self.restart_enabled:
+            self.next_restart_time = None
+            self.bot.next_restart_time = None
+            return
 
-                # Smart Countdown Loop
-                now = datetime.datetime.now()
-                remaining_seconds = (target_time - now).total_seconds()
-                
-                if remaining_seconds > 0:
-                    valid_announcements = [t for t in announce_times if t < remaining_seconds]
-                    
-                    if valid_announcements:
-                        first_wait = remaining_seconds - valid_announcements[0]
-                        if first_wait > 0:
-                            await asyncio.sleep(first_wait)
-                            
-                        for i, wait_sec in enumerate(valid_announcements):
-                            # Mid-countdown check
-                            if not config.get('auto_restart_enabled', True): 
-                                logging.info("🛑 Auto-Restart aborted mid-countdown (Disabled by user).")
-                                break
-
-                            mins = wait_sec // 60
-                            msg = f"⚠️ SERVER RESTART IN {mins} MINUTE{'S' if mins != 1 else ''} FOR MAINTENANCE"
-                            if wait_sec < 60: msg = f"⚠️ SERVER RESTART IN {wait_sec} SECONDS"
-                            
-                            if rest_api.is_configured(): 
-                                await rest_api.broadcast_message(msg)
-                            
-                            if i < len(valid_announcements) - 1:
-                                await asyncio.sleep(wait_sec - valid_announcements[i+1])
-                            else:
-                                await asyncio.sleep(valid_announcements[-1])
-                        
-                        if not config.get('auto_restart_enabled', True):
-                            continue # Skip the actual restart
-                    else:
-                        await asyncio.sleep(remaining_seconds)
-                
-                # Final check
-                if config.get('auto_restart_enabled', True) and self.restart_enabled:
-                    async with server_lock:
-                        await restart_server(self.bot, graceful=True)
-                else:
-                    logging.info("🛑 Auto-Restart aborted last-second (Disabled by user).")
-            except Exception as e:
-                logging.error(f"Error in auto_restart: {e}")
-                await asyncio.sleep(60)
+        interval = config.get('restart_interval', 10800)
+        if interval < 600:
+            logging.warning(f"⚠️ Restart interval ({interval}s) is too short. Defaulting to 10800s (3h).")
+            interval = 10800
+
+        # Restarts happen on multiples of the interval since midnight
+        now = datetime.datetime.now()
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        intervals_passed = int((now - midnight).total_seconds() // interval)
+        target_time = midnight + datetime.timedelta(seconds=(intervals_passed + 1) * interval)
+
+        await scheduler.schedule(self.RESTART_JOB, 'auto_restart', target_time, grace=300)
+        for wait_sec in self.restart_announcements():
+            warn_at = target_time - datetime.timedelta(seconds=wait_sec)
+            if warn_at > now:
+                await scheduler.schedule(f"{self.RESTART_JOB}:warn:{wait_sec}", 'restart_warning', warn_at,
+                                         payload={'seconds': wait_sec}, grace=30)
+
+        self.next_restart_time = target_time
+        self.bot.next_restart_time = target_time
+        logging.info(f"🚥 Auto-Restart Scheduled for: {target_time} (in {(target_time - now).total_seconds():.1f}s)")
+
+    async def run_restart_warning(self, job):
+        if not config.get('auto_restart_enabled', True) or not self.restart_enabled:
+            return
+        if not await server_lifecycle.is_running():
+            return
+        wait_sec = job['payload']['seconds']
+        mins = wait_sec // 60
+        msg = f"⚠️ SERVER RESTART IN {mins} MINUTE{'S' if mins != 1 else ''} FOR MAINTENANCE"
+        if wait_sec < 60: msg = f"⚠️ SERVER RESTART IN {wait_sec} SECONDS"
+        if rest_api.is_configured():
+            await rest_api.broadcast_message(msg)
+
+    async def run_auto_restart(self, job):
+        try:
+            if not config.get('auto_restart_enabled', True) or not self.restart_enabled:
+                logging.info("🛑 Auto-Restart aborted last-second (Disabled by user).")
+            elif await server_lifecycle.is_running(max_age=0):
+                async with server_lock:
+                    await restart_server(self.bot, graceful=True)
+        finally:
+            await self.plan_auto_restart()
+
+    async def run_scheduled_shutdown(self, job):
+        if await server_lifecycle.is_running(max_age=0):
+            if rest_api.is_configured():
+                await rest_api.broadcast_message("⚠️ DAILY SCHEDULED SHUTDOWN IN 10 SECONDS")
+                await asyncio.sleep(10)
+            async with server_lock:
+                await stop_server(self.bot, graceful=True)
 
-    async def scheduled_shutdown(self):
-        last_triggered_date = None
-        while True:
-            try:
-                now = datetime.datetime.now()
-                shutdown_str = config.get('shutdown_time', '05:00')
-                if ':' in shutdown_str:
-                    h, m = map(int, shutdown_str.split(':'))
-                    if now.hour == h and now.minute == m and last_triggered_date != now.date():
-                        if await is_server_running():
-                            if rest_api.is_configured():
-                                await rest_api.broadcast_message("⚠️ DAILY SCHEDULED SHUTDOWN IN 10 SECONDS")
-                                await asyncio.sleep(10)
-                            async with server_lock:
-                                await stop_server(self.bot, graceful=True)
-                        last_triggered_date = now.date()
-            except Exception as e: logging.error(f"Error in scheduled_shutdown: {e}")
-            await asyncio.sleep(10)
-
-    async def scheduled_startup(self):
-        last_triggered_date = None
-        while True:
-            try:
-                now = datetime.datetime.now()
-                startup_str = config.get('startup_time', '10:00')
-                if ':' in startup_str:
-                    h, m = map(int, startup_str.split(':'))
-                    if now.hour == h and now.minute == m and last_triggered_date != now.date():
-                        if not await is_server_running():
-                            async with server_lock:
-                                await start_server(self.bot)
-                        last_triggered_date = now.date()
-            except Exception as e: logging.error(f"Error in scheduled_startup: {e}")
-            await asyncio.sleep(10)
+    async def run_scheduled_startup(self, job):
+        if not await server_lifecycle.is_running(max_age=0):
+            async with server_lock:
+                await start_server(self.bot)
 
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -318,8 +277,191 @@ class MonitorRelay(commands.Cog):
                 broadcast_text = f"[Discord] {message.author.display_name}: {message.content}"
                 await rest_api.broadcast_message(broadcast_text)
 
+    REPLAY_CHUNK = 1024 * 1024  # bytes per bulk catch-up batch
+
+    def _checkpoint_offset(self, path: str, checkpoint: dict) -> int:
+        """Where to resume a file: the checkpoint if it still describes this file, else the start"""
+        if not checkpoint:
+            return 0
+        st = os.stat(path)
+        if checkpoint.get('inode') and checkpoint['inode'] != st.st_ino:
+            return 0  # Same name, different file (rotated/replaced)
+        if checkpoint['offset'] > st.st_size:
+            return 0  # Truncated
+        return checkpoint['offset']
+
+    async def replay_log_file(self, path: str, start: int = 0, include_sessions: bool = True):
+        """
+        Process a log file from byte offset `start` up to its last complete line in
+        bulk batches: rewards only, no Discord/in-game messages, chat relay or
+        commands. Checkpoints after every rewarded line. Returns (end offset, activities, PALDOGS).
+        """
+        from utils.log_parser import log_parser, LineDeduper
+        
+        pos = start
+        total_activities = total_paldogs = 0
+        with open(path, 'rb') as f:
+            inode = os.fstat(f.fileno()).st_ino
+            f.seek(pos)
+            while True:
+                data = f.read(self.REPLAY_CHUNK)
+                cut = data.rfind(b'\n')
+                if cut < 0:
+                    break  # EOF or a trailing partial line (left for the live tailer)
+                block = data[:cut + 1]
+                f.seek(pos + len(block))
+                
+                activities, checkpoints = [], []
+                size = os.fstat(f.fileno()).st_size
+                line_offset = pos
+                for raw in block.split(b'\n')[:-1]:
+                    offset = line_offset
+                    line_offset += len(raw) + 1
+                    line = raw.decode('utf-8', errors='replace')
+                    if not line.strip(): continue
+                    activity, _ = log_parser.classify_line(line, LineDeduper.make_key(path, offset, line))
+                    if activity and (include_sessions or activity['type'] not in ('login', 'logout')):
+                        activities.append(activity)
+                        checkpoints.append((path, inode, size, line_offset))
+                
+                pos += len(block)
+                if activities:
+                    # Each activity commits together with the offset just past its line
+                    total_paldogs += await log_parser.process_activities_bulk(activities, checkpoints)
+                    total_activities += len(activities)
+                if not checkpoints or checkpoints[-1][3] != pos:
+                    # Trailing lines without rewards
+                    await db.save_log_checkpoint(path, inode, size, pos)
+                await asyncio.sleep(0)  # Let live events through between batches
+        
+        return pos, total_activities, total_paldogs
+
+    async def resume_from_checkpoints(self, log_dir: str) -> Tuple[Optional[str], int]:
+        """
+        Startup: bulk-process everything written since the last checkpoint (the
+        checkpointed file and any newer ones). Returns (newest file, offset to
+        live-tail it from). With no checkpoints at all, start at EOF as before.
+        """
+        files = sorted(
+            [f for f in os.listdir(log_dir) if f.endswith('.log') or f.endswith('.txt')],
+            key=lambda x: os.path.getmtime(os.path.join(log_dir, x))
+        )
+        if not files:
+            return None, 0
+        
+        checkpoints = await db.get_log_checkpoints()
+        paths = [os.path.join(log_dir, f) for f in files]  # Oldest first
+        known = [i for i, path in enumerate(paths) if path in checkpoints]
+        if not known:
+            return paths[-1], os.path.getsize(paths[-1])
+        
+        end = 0
+        for path in paths[known[-1]:]:
+            start = self._checkpoint_offset(path, checkpoints.get(path))
+            end, count, paldogs = await self.replay_log_file(path, start)
+            if count:
+                logging.info(f"⏩ Caught up {count} activities ({paldogs} PALDOGS) from {os.path.basename(path)}")
+        return paths[-1], end
+
+    async def switch_log_file(self, follower: LogFollower, log_dir: str, latest_file: str):
+        """Start following latest_file from its checkpoint (startup catch-up or rotation)"""
+        async with self.backfill_lock:
+            if self.current_log_file is None:
+                # Startup: resume from the saved checkpoints instead of skipping to EOF
+                latest_file, start = await self.resume_from_checkpoints(log_dir)
+            else:
+                # Rotation: finish the old file, then read the new one from its checkpoint (or the start)
+                if self.log_pipeline:
+                    await self.log_pipeline.join()
+                if os.path.exists(self.current_log_file):
+                    await self.replay_log_file(self.current_log_file, self.buffer_offset)
+                checkpoints = await db.get_log_checkpoints()
+                start = self._checkpoint_offset(latest_file, checkpoints.get(latest_file))
+        
+        self.current_log_file = latest_file
+        follower.follow(latest_file, start)
+        self.buffer_offset = start
+        self.line_buffer = ""
+        logging.info(f"📁 Now tailing new log file: {os.path.basename(latest_file)}")
+        from utils.log_parser import log_parser
+        dedupe = log_parser.processed_lines.stats()
+        logging.info(f"🧹 Line dedupe: {dedupe['entries']}/{dedupe['max_entries']} entries, "
+                     f"~{dedupe['approx_bytes'] / 1048576:.1f}/{dedupe['max_bytes'] / 1048576:.1f} MB, {dedupe['duplicates']} duplicates skipped, "
+                     f"{dedupe['evictions']} evicted, FP rate {dedupe['false_positive_rate']:.1e}")
+        if self.log_pipeline:
+            logging.info(f"🚰 Log pipeline: {self.log_pipeline.stats()}")
+
+    def _channel_sender(self, channel):
+        """send() for the message aggregator: one merged batch -> one channel message"""
+        async def send(content=None, embeds=None, group=None):
+            await channel.send(content=content, embeds=embeds)
+        return send
+
+    async def _resolve_channel(self, channel_id):
+        if not channel_id:
+            return None
+        return self.bot.get_channel(channel_id) or await self.bot.fetch_channel(channel_id)
+
+    async def deliver_log_notification(self, kind: str, payload):
+        """Notifier stage of the log pipeline: activity messages, in-game broadcasts and chat relay"""
+        chat_channel_id = config.get('chat_channel_id', 0)
+        
+        # Send in-game broadcast for special events
+        if kind == 'broadcast':
+            if rest_api.is_configured():
+                await rest_api.broadcast_message(payload)
+            return
+        
+        # Send Discord notification for activity (merged with others posted in the same window)
+        if kind == 'discord':
+            monitor_channel = await self._resolve_channel(config.get('player_monitor_channel_id', chat_channel_id))
+            if monitor_channel:
+                message_aggregator.post(('channel', monitor_channel.id), self._channel_sender(monitor_channel), text=payload)
+            return
+        
+        chat_channel = await self._resolve_channel(chat_channel_id)
+        webhook_url = config.get('chat_webhook_url', '').strip()
+        
+        # Chat Relay (Game -> Discord)
+        author, content = payload
+        if not content: return
+        
+        # Loop prevention: Ignore messages that were sent from Discord to Game
+        if content.startswith("[Discord]"):
+            return
+
+        # Loop prevention: Ignore messages already relayed by comparing author and content hash
+        msg_hash = hash(content)
+        entry = (author, msg_hash)
+        
+        if entry not in self.recent_relays:
+            self.recent_relays.add(entry)
+            self.recent_relays_order.append(entry)
+            if len(self.recent_relays_order) > self.MAX_RELAY_HISTORY:
+                self.recent_relays.discard(self.recent_relays_order.popleft())
+            
+            logging.info(f"💬 Chat detected: {author}: {content}")
+            
+            # Consecutive lines from the same player go out as one webhook message
+            if webhook_url:
+                async def send_webhook(content=None, embeds=None, group=None):
+                    try:
+                        webhook = await http_client.webhook(webhook_url)
+                        await webhook.send(content=content, username=group)
+                    except Exception as e:
+                        logging.error(f"Chat Relay error: {e}")
+                        if chat_channel:
+                            fallback = "\n".join(f"**[Game] {group}**: {line}" for line in content.split("\n"))
+                            try: await chat_channel.send(fallback[:2000])
+                            except: pass
+                # Webhooks allow 5 requests / 2s
+                message_aggregator.post(('chat_webhook',), send_webhook, text=content, group=author, limit=5, per=2.0)
+            elif chat_channel:
+                message_aggregator.post(('channel', chat_channel.id), self._channel_sender(chat_channel),
+                                        text=f"**[Game] {author}**: {content}")
+
     async def tail_palguard_logs(self):
-        current_log_file = None
+        follower = None
         
         while True:
             try:
@@ -330,48 +472,38 @@ class MonitorRelay(commands.Cog):
                     await asyncio.sleep(10)
                     continue
                 
-                # Get the latest log file
-                files = sorted(
-                    [f for f in os.listdir(log_dir) if f.endswith('.log') or f.endswith('.txt')],
-                    key=lambda x: os.path.getmtime(os.path.join(log_dir, x)),
-                    reverse=True
-                )
+                # One watcher per log directory (inotify on Linux, stat polling elsewhere)
+                if follower is None or follower.directory != log_dir:
+                    if follower:
+                        follower.close()
+                    follower = LogFollower(log_dir, backend=config.get('log_watch_backend', 'auto'),
+                                           poll_interval=float(config.get('log_poll_interval', 1.0)))
+                    self.current_log_file = None
+                    logging.info(f"👀 Watching {log_dir} ({follower.watcher.name})")
                 
-                if not files:
-                    await asyncio.sleep(5)
-                    continue
-                    
-                latest_file = os.path.join(log_dir, files[0])
+                # Read what was appended to the current file first, so a rotated file is drained
+                data, reset = follower.read()
+                if reset:
+                    self.line_buffer = ""
                 
-                # If we switched files, initialize position to end of file
-                if latest_file != current_log_file:
-                    current_log_file = latest_file
-                    with open(current_log_file, 'rb') as f:
-                        f.seek(0, 2) # Go to end
-                        self.file_positions[current_log_file] = f.tell()
-                    logging.info(f"📁 Now tailing new log file: {os.path.basename(current_log_file)}")
-                    await asyncio.sleep(1)
+                if not data:
+                    if follower.rotated:
+                        # A file appeared/disappeared: is there a newer log to switch to?
+                        latest_file = follower.newest_file()
+                        if not latest_file:
+                            await asyncio.sleep(5)
+                            continue
+                        if latest_file != self.current_log_file:
+                            await self.switch_log_file(follower, log_dir, latest_file)
+                            continue
+                    # Sleep until the kernel (or the poller) reports a change
+                    await follower.wait(timeout=5)
                     continue
-
-                # Read new data from current file
-                chunk = ""
-                pos = self.file_positions.get(current_log_file, 0)
                 
-                with open(current_log_file, 'rb') as f:
-                    # Check if file was truncated
-                    f.seek(0, 2)
-                    size = f.tell()
-                    if size < pos:
-                        pos = 0
-                    
-                    if size > pos:
-                        f.seek(pos)
-                        chunk = f.read().decode('utf-8', errors='replace')
-                        self.file_positions[current_log_file] = f.tell()
-
-                if not chunk:
-                    await asyncio.sleep(1)
-                    continue
+                current_log_file = self.current_log_file
+                if not self.line_buffer:
+                    self.buffer_offset = follower.position - len(data)
+                chunk = data.decode('utf-8', errors='replace')
                 
                 # Use line buffer to handle partial lines
                 self.line_buffer += chunk
@@ -381,94 +513,102 @@ class MonitorRelay(commands.Cog):
                 parts = self.line_buffer.split('\n')
                 new_lines = parts[:-1] # All complete lines
                 self.line_buffer = parts[-1] # Remaining partial line
+                line_offset = self.buffer_offset
+                self.buffer_offset += sum(len(l.encode('utf-8')) + 1 for l in new_lines)
+                checkpoint = (current_log_file, follower.inode, follower.position, self.buffer_offset)
                 
                 if new_lines:
-                    from utils.log_parser import log_parser
-                    from utils.rest_api import rest_api
+                    # Hand off to the pipeline: parsing, rewards and Discord I/O run in their own stages
+                    if self.log_pipeline is None:
+                        self.log_pipeline = LogEventPipeline(self.deliver_log_notification, self.handle_ingame_command)
+                    self.log_pipeline.start()
                     
-                    chat_channel = self.bot.get_channel(chat_channel_id) or await self.bot.fetch_channel(chat_channel_id)
-                    monitor_channel_id = config.get('player_monitor_channel_id', chat_channel_id)
-                    monitor_channel = self.bot.get_channel(monitor_channel_id) or await self.bot.fetch_channel(monitor_channel_id)
-                    webhook_url = config.get('chat_webhook_url', '').strip()
-
                     for line in new_lines:
+                        offset = line_offset
+                        line_offset += len(line.encode('utf-8')) + 1
                         if not line.strip(): continue
-                        
-                        # 1. Process Game Activity via log_parser
-                        line_hash = str(hash(line))
-                        try:
-                            activity = log_parser.parse_line(line, line_hash)
-                            if activity:
-                                # Special Case: Chat Command Handling
-                                if activity['type'] == 'chat':
-                                    msg = activity['message'].strip()
-                                    if msg.startswith('/') or msg.startswith('!'):
-                                        asyncio.create_task(self.handle_ingame_command(activity['player_name'], activity['steam_id'], msg))
-                                
-                                reward, d_msg, g_msg = await log_parser.process_activity(activity)
-                                
-                                # Send Discord notification for activity
-                                if d_msg and monitor_channel:
-                                    try: await monitor_channel.send(d_msg)
-                                    except Exception as e: logging.error(f"Error sending activity to Discord: {e}")
-                                    
-                                # Send in-game broadcast for special events
-                                if g_msg and rest_api.is_configured():
-                                    await rest_api.broadcast_message(g_msg)
-                        except Exception as e:
-                            logging.error(f"Error in activity processing: {e}")
-
-                        # 2. Process Chat Relay (Game -> Discord)
-                        match = None
-                        for p in self.chat_patterns:
-                            match = p.search(line)
-                            if match: break
-                            
-                        if match:
-                            match_data = match.groupdict()
-                            author = match_data.get('author', 'Unknown').strip("'[] ")
-                            content = match_data.get('content', '').strip()
-                            
-                            if not content: continue
-                            
-                            # Loop prevention: Ignore messages that were sent from Discord to Game
-                            if content.startswith("[Discord]"):
-                                continue
-
-                            # Loop prevention: Ignore messages already relayed by comparing author and content hash
-                            msg_hash = hash(content)
-                            entry = (author, msg_hash)
-                            
-                            if entry not in self.recent_relays:
-                                self.recent_relays.add(entry)
-                                self.recent_relays_order.append(entry)
-                                if len(self.recent_relays_order) > self.MAX_RELAY_HISTORY:
-                                    self.recent_relays.discard(self.recent_relays_order.popleft())
-                                
-                                logging.info(f"💬 Chat detected: {author}: {content}")
-                                
-                                try:
-                                    if webhook_url:
-                                        session = getattr(self.bot, 'http_session', None)
-                                        if session and not session.closed:
-                                            webhook = nextcord.Webhook.from_url(webhook_url, session=session)
-                                            await webhook.send(content=content, username=author)
-                                        else:
-                                            async with aiohttp.ClientSession() as temp_session:
-                                                webhook = nextcord.Webhook.from_url(webhook_url, session=temp_session)
-                                                await webhook.send(content=content, username=author)
-                                    elif chat_channel:
-                                        await chat_channel.send(f"**[Game] {author}**: {content}")
-                                except Exception as e:
-                                    logging.error(f"Chat Relay error: {e}")
-                                    if chat_channel:
-                                        try: await chat_channel.send(f"**[Game] {author}**: {content}")
-                                        except: pass
+                        await self.log_pipeline.submit(current_log_file, offset, line, follower.inode, follower.position)
+                    
+                    await self.log_pipeline.checkpoint(*checkpoint)
             except Exception as e:
                 logging.error(f"Error in tail_logs: {e}")
                 import traceback
                 traceback.print_exc()
-            await asyncio.sleep(1)
+                await asyncio.sleep(1)
+
+    def is_admin(self, interaction: nextcord.Interaction):
+        admin_id = config.get('admin_user_id', 0)
+        if interaction.user.id == admin_id:
+            return True
+        if hasattr(interaction.user, 'guild_permissions') and interaction.user.guild_permissions.administrator:
+            return True
+        return False
+
+    @nextcord.slash_command(
+        name="backfill_logs",
+        description="Re-process old PalDefender logs for rewards missed while the bot was down",
+        default_member_permissions=nextcord.Permissions(administrator=True)
+    )
+    async def backfill_logs(
+        self,
+        interaction: nextcord.Interaction,
+        start_date: str = nextcord.SlashOption(description="First day (YYYY-MM-DD)"),
+        end_date: str = nextcord.SlashOption(description="Last day (YYYY-MM-DD), defaults to today", required=False)
+    ):
+        if not self.is_admin(interaction):
+            await interaction.response.send_message("❌ Permission denied.", ephemeral=True)
+            return
+        
+        try:
+            start = datetime.date.fromisoformat(start_date)
+            end = datetime.date.fromisoformat(end_date) if end_date else datetime.date.today()
+        except ValueError:
+            await interaction.response.send_message("❌ Dates must be YYYY-MM-DD.", ephemeral=True)
+            return
+        
+        log_dir = config.get('log_directory', '').strip()
+        if not log_dir or not os.path.exists(log_dir):
+            await interaction.response.send_message("❌ Log directory is not configured.", ephemeral=True)
+            return
+        
+        if self.backfill_lock.locked():
+            await interaction.response.send_message("⏳ A backfill is already running.", ephemeral=True)
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        
+        async with self.backfill_lock:
+            # Files last written inside the range, oldest first; the live file belongs to the tailer
+            files = []
+            for name in os.listdir(log_dir):
+                path = os.path.join(log_dir, name)
+                if not (name.endswith('.log') or name.endswith('.txt')) or path == self.current_log_file:
+                    continue
+                mtime = os.path.getmtime(path)
+                if start <= datetime.date.fromtimestamp(mtime) <= end:
+                    files.append((mtime, path))
+            files.sort()
+            
+            # Checkpoints make this idempotent: only bytes never processed are replayed.
+            # Logins/logouts are skipped, their sessions would get today's timestamps.
+            checkpoints = await db.get_log_checkpoints()
+            total_files = total_activities = total_paldogs = 0
+            for _, path in files:
+                offset = self._checkpoint_offset(path, checkpoints.get(path))
+                if offset >= os.path.getsize(path):
+                    continue
+                _, count, paldogs = await self.replay_log_file(path, offset, include_sessions=False)
+                total_files += 1
+                total_activities += count
+                total_paldogs += paldogs
+            await db.flush_writes()
+        
+        logging.info(f"⏩ Backfill {start}..{end}: {total_activities} activities from {total_files} files")
+        await interaction.followup.send(
+            f"✅ Backfill {start} → {end}: processed **{total_files}** of {len(files)} log files, "
+            f"**{total_activities}** activities, **{total_paldogs:,}** PALDOGS awarded.",
+            ephemeral=True
+        )
 
     async def handle_ingame_command(self, player_name, steam_id, message):
         content = message.strip()
@@ -493,7 +633,7 @@ class MonitorRelay(commands.Cog):
         # Abolished !roll / !chest roll commands
 
     async def handle_profile_command(self, steam_id, player_name):
-        stats = await db.get_player_stats(steam_id)
+        stats = await db.get_player_state(steam_id)
         if not stats: return
         
         rank = stats.get('rank', 'Trainer')
@@ -512,7 +652,7 @@ class MonitorRelay(commands.Cog):
         logging.info(f"🕹️ Tell Profile result: {res}")
 
     async def handle_balance_command(self, steam_id, player_name):
-        stats = await db.get_player_stats(steam_id)
+        stats = await db.get_player_state(steam_id)
         if not stats: return
         pm = stats.get('palmarks', 0)
         exp = stats.get('experience', 0)
@@ -89,7 +89,7 @@ class PalguardCog(commands.Cog):
         # Find item ID by name if it's a name from autocomplete
         item_id = next((i["id"] for i in self.items if i["name"].lower() == item.lower()), item)
         
-        success = await rcon_util.give_item(steamid, item_id, amount)
+        success = await rcon_util.give_item(steamid, item_id, amount, rcon_util.PRIORITY_ADMIN)
         if success:
             await interaction.followup.send(f"✅ Successfully gave **{amount}x {item}** to player `{player}`.")
         else:
@@ -131,7 +131,7 @@ class PalguardCog(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         steamid = await self.get_steam_id(player)
-        success = await rcon_util.give_exp(steamid, amount)
+        success = await rcon_util.give_exp(steamid, amount, rcon_util.PRIORITY_ADMIN)
         
         if success:
             await interaction.followup.send(f"✅ Successfully gave **{amount} EXP** to player `{player}`.")
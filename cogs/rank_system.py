@@ -118,14 +118,8 @@ class RankSystem:
                     highest_rank = rank_name
         return highest_rank
     
-    async def check_and_update_rank(self, steam_id: str) -> Tuple[str, bool]:
-        """Check if player should rank up and update if needed"""
-        stats = await db.get_player_stats(steam_id)
-        if not stats: return 'Trainer', False
-        
-        current_rank = stats.get('rank', 'Trainer')
-        palmarks = stats.get('palmarks', 0)
-        
+    def resolve_rank(self, current_rank: str, palmarks: int) -> Tuple[str, bool]:
+        """Rank a player should hold for this balance -> (rank, ranked_up). Never downgrades."""
         # Fix: Ensure we don't downgrade or announce rank up if already at max or same rank
         new_rank = self.get_rank_from_palmarks(palmarks)
         
@@ -135,24 +129,31 @@ class RankSystem:
                 old_idx = self.rank_order.index(current_rank)
                 new_idx = self.rank_order.index(new_rank)
                 if new_idx > old_idx:
-                    await db.update_player_rank(steam_id, new_rank)
                     return new_rank, True
-                else:
-                    # Don't downgrade rank automatically if palmarks dropped (e.g. spent in shop)
-                    # Unless that's desired. Usually players keep their highest rank.
-                    return current_rank, False
+                # Don't downgrade rank automatically if palmarks dropped (e.g. spent in shop)
+                # Unless that's desired. Usually players keep their highest rank.
+                return current_rank, False
             except ValueError:
-                await db.update_player_rank(steam_id, new_rank)
                 return new_rank, True
         
         return current_rank, False
     
+    async def check_and_update_rank(self, steam_id: str) -> Tuple[str, bool]:
+        """Check if player should rank up and update if needed"""
+        stats = await db.get_player_state(steam_id)
+        if not stats: return 'Trainer', False
+        
+        new_rank, ranked_up = self.resolve_rank(stats.get('rank', 'Trainer'), stats.get('palmarks', 0))
+        if ranked_up:
+            await db.update_player_rank(steam_id, new_rank)
+        return new_rank, ranked_up
+    
     def get_level_exp(self, level: int) -> int:
         """Calculate EXP required for a specific level"""
         return level * level * 100
 
     async def get_progress_to_next_rank(self, steam_id: str) -> Optional[Dict]:
-        stats = await db.get_player_stats(steam_id)
+        stats = await db.get_player_state(steam_id)
         if not stats: return None
         
         current_level = stats.get('level', 1)
@@ -4,6 +4,7 @@ import datetime
 import logging
 from utils.config_manager import config
 from utils.rest_api import rest_api
+from utils.online_players import online_players
 from utils.server_utils import is_server_running
 from utils.rcon_utility import rcon_util
 from utils.database import db
@@ -52,7 +53,7 @@ class ServerManagement(commands.Cog):
             return
         
         await interaction.response.defer(ephemeral=True)
-        player_data = await rest_api.get_player_list()
+        player_data = await online_players.get_player_list()
         
         if player_data:
             player_list = player_data.get('players', [])
@@ -162,7 +163,7 @@ class ServerManagement(commands.Cog):
             await interaction.followup.send(f"❌ Player '{player_name}' not found.")
             return
         
-        success, resp = await rcon_util.give_item(stats['steam_id'], item_id, amount)
+        success, resp = await rcon_util.give_item(stats['steam_id'], item_id, amount, rcon_util.PRIORITY_ADMIN)
         if success:
             await interaction.followup.send(f"✅ Sent **{amount}x {item_id}** to **{player_name}**.\nResponse: `{resp}`")
         else:
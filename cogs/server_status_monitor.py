@@ -1,160 +1,64 @@
 import nextcord
-from nextcord.ext import commands, tasks
-import asyncio
-import logging
+from nextcord.ext import commands
 from utils.server_utils import (
     is_server_running, 
     verify_server_responsive, 
+    get_server_process_stats,
     get_server_state, 
-    set_server_state, 
     ServerState,
     register_state_callback,
     update_status_channel_name
 )
+from utils.event_bus import event_bus, ServerStateChanged
+from utils.server_lifecycle import server_lifecycle
 from utils.rest_api import rest_api
+from utils.online_players import online_players
 from utils.config_manager import config
 
 
 class ServerStatusMonitor(commands.Cog):
-    """Monitors server status and updates state based on process and REST API checks."""
+    """Announces server state changes detected by the lifecycle service."""
+    
+    # Embeds for transitions the lifecycle probe detected on its own
+    # (start_server / stop_server post their own)
+    NOTIFICATIONS = {
+        (ServerState.OFFLINE, ServerState.STARTING): ("**STARTING**\nServer process detected. Initializing world data...", 0xFF8800),
+        (ServerState.STARTING, ServerState.ONLINE): ("**ONLINE**\nPalworld Server is now fully operational!", 0x00FF00),
+        (ServerState.ONLINE, ServerState.OFFLINE): ("**OFFLINE**\nPalworld Server has stopped", 0xFF0000),
+    }
     
     def __init__(self, bot):
         self.bot = bot
-        self.last_known_state = ServerState.OFFLINE
         
         # Register the channel name update callback
         register_state_callback(update_status_channel_name)
+        event_bus.subscribe(ServerStateChanged, self.on_server_state_changed)
     
     @commands.Cog.listener()
     async def on_ready(self):
-        """Start the monitoring loop when bot is ready."""
-        if not self.status_monitor_loop.is_running():
-            self.status_monitor_loop.start()
-            logging.info("🔍 Server status monitoring started")
+        """Start the lifecycle service (one probe loop for the whole bot) when bot is ready."""
+        server_lifecycle.start(self.bot)
     
     def cog_unload(self):
-        """Stop the monitoring loop when cog is unloaded."""
-        self.status_monitor_loop.cancel()
+        """Stop listening for state changes when cog is unloaded."""
+        event_bus.unsubscribe(ServerStateChanged, self.on_server_state_changed)
     
-    @tasks.loop(seconds=15)  # Check every 15 seconds
-    async def status_monitor_loop(self):
-        """Continuously monitor server status and update state."""
-        try:
-            current_state = get_server_state()
-            process_running = await is_server_running()
-            
-            # State machine logic
-            if current_state == ServerState.OFFLINE:
-                # If process appears while we think it's offline, set to STARTING
-                if process_running:
-                    logging.info("🟡 Server process detected while state was OFFLINE, transitioning to STARTING")
-                    await set_server_state(ServerState.STARTING, self.bot)
-                    
-                    # Send STARTING notification embed
-                    status_channel_id = config.get('status_channel_id', 0)
-                    if status_channel_id:
-                        channel = self.bot.get_channel(status_channel_id)
-                        if channel:
-                            embed = nextcord.Embed(
-                                title="paltastic", 
-                                description="**STARTING**\nServer process detected. Initializing world data...", 
-                                color=0xFF8800
-                            )
-                            embed.set_footer(text="powered by Paltastic")
-                            try: await channel.send(embed=embed)
-                            except: pass
-            
-            elif current_state == ServerState.STARTING:
-                # Check if process is still running
-                if not process_running:
-                    logging.warning("🔴 Server process died during STARTING phase")
-                    await set_server_state(ServerState.OFFLINE, self.bot)
-                else:
-                    # Try to verify REST API responsiveness
-                    if rest_api.is_configured():
-                        if await verify_server_responsive():
-                            logging.info("🟢 Server is now fully ONLINE (REST API responsive)")
-                            await set_server_state(ServerState.ONLINE, self.bot)
-                            
-                            # Send notification
-                            status_channel_id = config.get('status_channel_id', 0)
-                            if status_channel_id:
-                                channel = self.bot.get_channel(status_channel_id)
-                                if channel:
-                                    embed = nextcord.Embed(
-                                        title="paltastic", 
-                                        description="**ONLINE**\nPalworld Server is now fully operational!", 
-                                        color=0x00FF00
-                                    )
-                                    embed.set_footer(text="powered by Paltastic")
-                                    try:
-                                        await channel.send(embed=embed)
-                                    except:
-                                        pass
-                    else:
-                        # No REST API configured, just mark as ONLINE if process is running
-                        logging.info("🟢 Server process running (REST API not configured)")
-                        await set_server_state(ServerState.ONLINE, self.bot)
-            
-            elif current_state == ServerState.ONLINE:
-                # Verify server is still running and responsive
-                if not process_running:
-                    logging.warning("🔴 Server process disappeared, transitioning to OFFLINE")
-                    await set_server_state(ServerState.OFFLINE, self.bot)
-                    
-                    # Send notification
-                    status_channel_id = config.get('status_channel_id', 0)
-                    if status_channel_id:
-                        channel = self.bot.get_channel(status_channel_id)
-                        if channel:
-                            embed = nextcord.Embed(
-                                title="paltastic", 
-                                description="**OFFLINE**\nPalworld Server has stopped", 
-                                color=0xFF0000
-                            )
-                            embed.set_footer(text="powered by Paltastic")
-                            try:
-                                await channel.send(embed=embed)
-                            except:
-                                pass
-                elif rest_api.is_configured():
-                    # Periodically verify REST API is still responsive
-                    if not await verify_server_responsive():
-                        logging.warning("⚠️ Server process running but REST API not responding")
-                        # Don't change state immediately, might be temporary
-            
-            elif current_state == ServerState.STOPPING:
-                # Check if process has stopped
-                if not process_running:
-                    logging.info("🔴 Server has fully stopped")
-                    await set_server_state(ServerState.OFFLINE, self.bot)
-        
-        except Exception as e:
-            logging.error(f"❌ Error in status monitor loop: {e}")
-    
-    @status_monitor_loop.before_loop
-    async def before_status_monitor(self):
-        """Wait for bot to be ready before starting the loop."""
-        await self.bot.wait_until_ready()
-        
-        # Initial state detection
-        logging.info("🔍 Performing initial server state detection...")
-        process_running = await is_server_running()
-        
-        if process_running:
-            if rest_api.is_configured():
-                if await verify_server_responsive():
-                    logging.info("🟢 Initial state: ONLINE (process + REST API responsive)")
-                    await set_server_state(ServerState.ONLINE, self.bot)
-                else:
-                    logging.info("🟡 Initial state: STARTING (process running, REST API not ready)")
-                    await set_server_state(ServerState.STARTING, self.bot)
-            else:
-                logging.info("🟢 Initial state: ONLINE (process running, no REST API)")
-                await set_server_state(ServerState.ONLINE, self.bot)
-        else:
-            logging.info("🔴 Initial state: OFFLINE")
-            await set_server_state(ServerState.OFFLINE, self.bot)
+    async def on_server_state_changed(self, event: ServerStateChanged):
+        if event.source != 'probe':
+            return
+        notification = self.NOTIFICATIONS.get((event.old_state, event.new_state))
+        status_channel_id = config.get('status_channel_id', 0)
+        if not notification or not status_channel_id:
+            return
+        channel = self.bot.get_channel(status_channel_id)
+        if channel:
+            description, color = notification
+            embed = nextcord.Embed(title="paltastic", description=description, color=color)
+            embed.set_footer(text="powered by Paltastic")
+            try:
+                await channel.send(embed=embed)
+            except:
+                pass
     
     @nextcord.slash_command(description="Check current server status")
     async def serverstatus(self, interaction: nextcord.Interaction):
@@ -183,20 +87,37 @@ class ServerStatusMonitor(commands.Cog):
         # Add detailed information
         embed.add_field(name="Process Running", value="✅ Yes" if process_running else "❌ No", inline=True)
         
+        process_stats = await get_server_process_stats() if process_running else None
+        if process_stats:
+            hours, rem = divmod(process_stats['uptime'], 3600)
+            embed.add_field(
+                name="Server Process",
+                value=f"PID `{process_stats['pid']}` • CPU {process_stats['cpu_percent']}% • "
+                      f"RAM {process_stats['rss_mb'] / 1024:.2f} GB • Up {hours}h {rem // 60}m",
+                inline=False
+            )
+        
         if rest_api.is_configured():
             api_responsive = await verify_server_responsive()
             embed.add_field(name="REST API", value="✅ Responsive" if api_responsive else "❌ Not Responding", inline=True)
+            
+            # Endpoints currently failing fast
+            tripped = {name: b for name, b in rest_api.circuit_status().items() if b['state'] != 'closed'}
+            if tripped:
+                lines = [f"`{name}` {b['state'].replace('_', '-')} (retry in {b['retry_in']:.0f}s, {b['last_error']})" for name, b in tripped.items()]
+                embed.add_field(name="⚡ Circuit Breakers", value="\n".join(lines)[:1024], inline=False)
+            else:
+                embed.add_field(name="Circuit Breakers", value="✅ All closed", inline=True)
         else:
             embed.add_field(name="REST API", value="⚠️ Not Configured", inline=True)
         
         # Get player count if API is available
         if rest_api.is_configured():
-            player_data = await rest_api.get_player_list()
-            if player_data:
-                player_count = len(player_data.get('players', []))
+            if await online_players.refresh():
+                player_count = online_players.count
                 embed.add_field(name="Players Online", value=f"👥 {player_count}", inline=True)
         
-        embed.set_footer(text="Status updates automatically every 15 seconds")
+        embed.set_footer(text="Status updates automatically on every state change")
         
         await interaction.followup.send(embed=embed, ephemeral=True)
 
@@ -4,7 +4,9 @@ from nextcord.ui import View, Button, Select
 from nextcord import Interaction
 from utils.database import db
 from cogs.kit_system import kit_system
+from utils.delivery_engine import delivery_engine
 from utils.rcon_utility import rcon_util
+from utils.online_players import online_players
 from cogs.rank_system import rank_system
 
 class ShopView(View):
@@ -172,19 +174,25 @@ class PurchaseConfirmView(View):
         await interaction.response.defer()
         
         # 1. Verification Checks
-        from utils.rest_api import rest_api
+        # Items are given over RCON: without it nothing could ever be delivered (or re-sent)
+        if not rcon_util.is_configured():
+            await interaction.edit_original_message(
+                content="❌ **Purchase Failed: Item delivery is not set up.**\n"
+                        "RCON is not configured on this server. You have not been charged, please contact an admin.",
+                view=None
+            )
+            return
         
         # Check if player is online (REQUIRED for RCON give)
-        online_players = await rest_api.get_player_list()
-        is_online = False
-        if online_players:
-            for p in online_players.get('players', []):
-                # Clean IDs for comparison
-                p_uid = str(p.get('userId', '')).replace('steam_', '')
-                target_uid = str(self.steam_id).replace('steam_', '')
-                if p_uid == target_uid:
-                    is_online = True
-                    break
+        is_online = await online_players.is_online(self.steam_id)
+        
+        if is_online is None:
+            await interaction.edit_original_message(
+                content="❌ **Purchase Failed: Server unreachable.**\n"
+                        "The Palworld server isn't responding right now. You have not been charged, please try again shortly.",
+                view=None
+            )
+            return
         
         if not is_online:
             await interaction.edit_original_message(
@@ -194,53 +202,37 @@ class PurchaseConfirmView(View):
             )
             return
 
-        # Double check balance
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT palmarks FROM players WHERE steam_id = ?", (self.steam_id,))
-        result = cursor.fetchone()
+        # 2. Charge and deliver as one recorded order (failed items are retried when next online)
+        kit_data = kit_system.get_kit(self.kit_name)
+        if not kit_data:
+            await interaction.edit_original_message(content="❌ **Purchase Failed: This kit is no longer available.**", view=None)
+            return
+        order = await delivery_engine.deliver(
+            self.steam_id, delivery_engine.kit_items(kit_data), source='shop',
+            description=f"Bought kit: {self.kit_name}", cost=self.price
+        )
         
-        if not result or result['palmarks'] < self.price:
+        if order is None:
             await interaction.edit_original_message(content="❌ **Purchase Failed: Insufficient balance.**", view=None)
-            conn.close()
             return
-            
-        # 2. Process Transaction
-        new_balance = result['palmarks'] - self.price
-        cursor.execute("UPDATE players SET palmarks = ? WHERE steam_id = ?", (new_balance, self.steam_id))
-        
-        # Record history
-        cursor.execute(
-            "INSERT INTO reward_history (steam_id, reward_type, amount, description) VALUES (?, ?, ?, ?)",
-            (self.steam_id, 'purchase', -self.price, f"Bought kit: {self.kit_name}")
-        )
         
-        conn.commit()
-        conn.close()
+        items_report = [f"✅ {line['amount']}x **{line['item_id']}**" for line in order['delivered']]
+        items_report += [f"⏳ {line['amount']}x **{line['item_id']}** ({line['response']})" for line in order['pending']]
+        items_report += [f"❌ {line['amount']}x **{line['item_id']}** ({line['response']})" for line in order['failed']]
         
-        # 3. Deliver Items via RCON
-        kit_data = kit_system.get_kit(self.kit_name)
-        items_report = []
-        all_success = True
-        
-        if rcon_util.is_configured():
-            for item_id, amount in kit_data['items'].items():
-                success, resp = await rcon_util.give_item(self.steam_id, item_id, amount)
-                if success:
-                    items_report.append(f"✅ {amount}x **{item_id}**")
-                else:
-                    items_report.append(f"❌ {amount}x **{item_id}** ({resp})")
-                    all_success = False
-        
-        # 4. Final Response
-        if all_success:
+        # 3. Final Response
+        if not order['pending'] and not order['failed']:
             msg = f"✨ **Kit Purchased!**\nSuccessfully delivered **{self.kit_name.capitalize()}** to your inventory.\n"
             msg += "\n".join(items_report)
-            msg += f"\n\n💰 New Balance: **{new_balance:,} PALDOGS**"
+            msg += f"\n\n💰 New Balance: **{order['balance']:,} PALDOGS**"
         else:
-            msg = f"⚠️ **Partial Delivery!**\nSome items could not be sent. Please check your inventory.\n"
+            msg = "⚠️ **Partial Delivery!**\n"
+            if order['pending']:
+                msg += "Items marked ⏳ are saved and will be re-sent automatically next time you're online.\n"
+            if order['failed']:
+                msg += f"Items marked ❌ could not be delivered and won't be retried. Please contact an admin with order **#{order['id']}**.\n"
             msg += "\n".join(items_report)
-            msg += f"\n\n*If you didn't receive your items, the Item IDs in the kit might be incorrect.*"
+            msg += f"\n\n*If items keep failing, the Item IDs in the kit might be incorrect.*"
             
         await interaction.edit_original_message(content=msg, view=None)
         
@@ -263,7 +255,7 @@ class AnnouncerConfirmView(View):
     async def buy_btn(self, button: Button, interaction: Interaction):
         await interaction.response.defer()
         
-        stats = await db.get_player_stats(self.steam_id)
+        stats = await db.get_player_state(self.steam_id)
         if not stats or stats.get('palmarks', 0) < self.pack['price']:
             await interaction.edit_original_message(content="❌ **Insufficient Balance!**", view=None)
             return
@@ -3,12 +3,16 @@ from nextcord.ext import commands
 import sys
 import os
 import asyncio
-import aiohttp
 import logging
 from utils.config_manager import config
 from utils.bot_utils import load_cogs, enforce_single_instance
 from utils.error_handler import setup_logging
 from utils.rest_api import rest_api
+from utils.http_client import http_client
+from utils.message_aggregator import message_aggregator
+from utils.rcon_utility import rcon_util
+from utils.scheduler import scheduler
+from utils.database import db
 from cogs.views import ServerControlView
 from cogs.shop_system import UnifiedShopView, ShopView
 from cogs.skin_shop import UnifiedSkinShopView
@@ -28,7 +32,22 @@ enforce_single_instance(64210)
 # 3. Bot Initialization
 intents = nextcord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix="!", intents=intents, help_command=None)
+
+class PalBot(commands.Bot):
+    async def close(self):
+        """Stop background services and release network resources before the event loop stops"""
+        try:
+            await scheduler.stop()
+            await rest_api.close()
+            await rcon_util.close()
+            # Send batched notifications while the HTTP session and webhooks are still open
+            await message_aggregator.flush_all()
+            await http_client.close()
+        except Exception as e:
+            logging.error(f"Error during shutdown cleanup: {e}")
+        await super().close()
+
+bot = PalBot(command_prefix="!", intents=intents, help_command=None)
 
 # Global variables/State attached to bot
 bot.http_session = None
@@ -38,10 +57,12 @@ live_stats = LiveStatsDisplay(bot)
 async def on_ready():
     logging.info(f"✨ Logged in as {bot.user} (ID: {bot.user.id})")
     
-    # Initialize HTTP Session
-    if bot.http_session is None:
-        bot.http_session = aiohttp.ClientSession()
-        await rest_api.initialize()
+    # Shared HTTP client (pooled keep-alive connections for REST API and webhooks)
+    bot.http_session = await http_client.get_session()
+    await rest_api.initialize()
+    
+    # Persistent timers (restarts, daily schedule, event countdowns, giveaways)
+    await scheduler.start()
     
     # Register Persistent Views
     bot.add_view(ServerControlView())
@@ -104,3 +125,6 @@ if __name__ == "__main__":
         bot.run(token)
     except Exception as e:
         logging.critical(f"❌ Bot failed to start: {e}")
+    finally:
+        # Flush and close pooled SQLite connections
+        db.close()
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The global config and database are built on import: keep them out of the repo's data/
+_data_dir = tempfile.TemporaryDirectory(prefix='palbot_tests_', ignore_cleanup_errors=True)
+os.environ['BOT_DATA_DIR'] = _data_dir.name
@@ -0,0 +1,83 @@
+"""
+The hot queries in PlayerStatsDB must use the indexes added by the schema
+migrations instead of scanning whole tables (EXPLAIN QUERY PLAN on a
+freshly migrated, lightly seeded database).
+"""
+import pytest
+
+from utils.database import PlayerStatsDB
+
+# (label, sql, params, index that must appear in the plan)
+CHECKS = [
+    ("player by discord id",
+     "SELECT * FROM players WHERE discord_id = ?",
+     ("123",), "idx_players_discord_id"),
+    ("player by name",
+     """SELECT p.*, a.* FROM players p
+        LEFT JOIN activity_stats a ON p.steam_id = a.steam_id
+        WHERE p.player_name = ? COLLATE NOCASE
+        ORDER BY p.player_name = ? DESC, p.last_seen DESC LIMIT 1""",
+     ("Bench1", "Bench1"), "idx_players_name_nocase"),
+    ("open session on logout",
+     """SELECT id, login_time FROM sessions
+        WHERE steam_id = ? AND logout_time IS NULL
+        ORDER BY login_time DESC LIMIT 1""",
+     ("steam_bench1",), "idx_sessions_open"),
+    ("active players today",
+     "SELECT COUNT(DISTINCT steam_id) as count FROM sessions WHERE DATE(login_time) = ?",
+     ("2024-01-01",), "idx_sessions_login_date"),
+    ("recent rewards",
+     """SELECT r.*, p.player_name FROM reward_history r
+        JOIN players p ON r.steam_id = p.steam_id
+        ORDER BY r.timestamp DESC LIMIT 3""",
+     (), "idx_reward_history_timestamp"),
+    ("unclaimed inventory",
+     """SELECT inv.* FROM player_inventory inv
+        JOIN players p ON inv.steam_id = p.steam_id
+        WHERE p.discord_id = ? AND inv.claimed = 0""",
+     ("123",), "idx_inventory_unclaimed"),
+    ("daily totals",
+     "SELECT COALESCE(SUM(palmarks_earned), 0) as total FROM daily_stats WHERE date = ?",
+     ("2024-01-01",), "idx_daily_stats_date"),
+]
+
+
+def seed(database: PlayerStatsDB, players: int = 200):
+    """Enough rows that the planner prefers the indexes"""
+    conn = database.get_connection()
+    cursor = conn.cursor()
+    for i in range(players):
+        steam_id = f"steam_bench{i}"
+        day = f"2024-01-{i % 28 + 1:02d}"
+        cursor.execute(
+            "INSERT INTO players (steam_id, player_name, discord_id) VALUES (?, ?, ?)",
+            (steam_id, f"Bench{i}", str(i))
+        )
+        cursor.execute("INSERT INTO activity_stats (steam_id) VALUES (?)", (steam_id,))
+        cursor.execute("INSERT INTO sessions (steam_id, login_time, logout_time) VALUES (?, ?, ?)", (steam_id, f"{day} 10:00:00", f"{day} 11:00:00"))
+        cursor.execute("INSERT INTO daily_stats (steam_id, date) VALUES (?, ?)", (steam_id, day))
+        cursor.execute("INSERT INTO reward_history (steam_id, reward_type, amount, description) VALUES (?, 'palmarks', 1, 'bench')", (steam_id,))
+        cursor.execute("INSERT INTO player_inventory (steam_id, item_id, claimed) VALUES (?, 'Wood', 1)", (steam_id,))
+    cursor.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture(scope='module')
+def database(tmp_path_factory):
+    database = PlayerStatsDB(str(tmp_path_factory.mktemp('query_plans') / 'query_plan.db'))
+    seed(database)
+    yield database
+    database.close()
+
+
+@pytest.mark.parametrize('label, sql, params, index', CHECKS, ids=[check[0] for check in CHECKS])
+def test_query_uses_index(database, label, sql, params, index):
+    conn = database.get_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        plan = " | ".join(row[3] for row in cursor.fetchall())
+    finally:
+        conn.close()
+    assert index in plan, f"{label}: {plan}"
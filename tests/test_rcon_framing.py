@@ -0,0 +1,183 @@
+"""
+RCON packet framing and multi-packet response reassembly.
+
+RconPacketReader is fed coalesced and split packets directly; RconSession
+runs against a local fake RCON server that
+  * source - splits long output into 4096-byte packets, mirrors the empty
+             sentinel (plus Source's extra trailing packet) and dribbles
+             bytes out in odd-sized writes
+  * silent - ignores the sentinel (as some Palworld builds may); short
+             responses must still return immediately
+  * stray  - answers the sentinel under an ID we never sent; concurrent
+             commands must not pick up those replies
+"""
+import asyncio
+import random
+import struct
+import time
+
+import pytest
+
+from utils.rcon_utility import RconPacketReader, RconSession, RconUtility
+
+PASSWORD = 'secret'
+FRAGMENT = 4096
+
+
+def packet(request_id: int, packet_type: int, body: bytes) -> bytes:
+    return struct.pack('<iii', len(body) + 10, request_id, packet_type) + body + b'\x00\x00'
+
+
+def show_players(count: int) -> str:
+    lines = ['name,playeruid,steamid']
+    lines += [f'Player{i:02d}_{"x" * 40},{1000000 + i},7656119{i:010d}' for i in range(count)]
+    return '\n'.join(lines)
+
+
+class FakeRconServer:
+    """Minimal RCON server; commands answer from RESPONSES or echo themselves"""
+
+    RESPONSES = {
+        'ShowPlayers': show_players(32),
+        'help': '\n'.join(f'/command_{i:03d} <arg> - does thing number {i}' for i in range(600)),
+    }
+
+    def __init__(self, mirror_sentinel: bool, stray_sentinel: bool = False):
+        self.mirror_sentinel = mirror_sentinel
+        self.stray_sentinel = stray_sentinel
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, '127.0.0.1', 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def send_chunked(self, writer, data: bytes):
+        # Odd-sized writes so packets get split and coalesced on the wire
+        pos = 0
+        while pos < len(data):
+            step = random.randint(1, 3000)
+            writer.write(data[pos:pos + step])
+            await writer.drain()
+            pos += step
+            await asyncio.sleep(0)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                size = struct.unpack('<i', await reader.readexactly(4))[0]
+                data = await reader.readexactly(size)
+                request_id, packet_type = struct.unpack('<ii', data[:8])
+                body = data[8:-2].decode()
+                if packet_type == RconUtility.SERVERDATA_AUTH:
+                    ok = body == PASSWORD
+                    out = packet(request_id, RconUtility.SERVERDATA_RESPONSE_VALUE, b'')
+                    out += packet(request_id if ok else -1, RconUtility.SERVERDATA_AUTH_RESPONSE, b'')
+                elif packet_type == RconUtility.SERVERDATA_RESPONSE_VALUE:
+                    if self.stray_sentinel:
+                        out = packet(0, RconUtility.SERVERDATA_RESPONSE_VALUE, b'')
+                    elif self.mirror_sentinel:
+                        out = packet(request_id, RconUtility.SERVERDATA_RESPONSE_VALUE, b'')
+                        out += packet(request_id, RconUtility.SERVERDATA_RESPONSE_VALUE, b'\x00\x01\x00\x00')
+                    else:
+                        continue
+                else:
+                    text = self.RESPONSES.get(body, f'OK {body}').encode()
+                    out = b''.join(
+                        packet(request_id, RconUtility.SERVERDATA_RESPONSE_VALUE, text[i:i + FRAGMENT])
+                        for i in range(0, max(len(text), 1), FRAGMENT)
+                    )
+                await self.send_chunked(writer, out)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def with_session(server: FakeRconServer, body):
+    """Run body(session) against a started fake server, then tear both down"""
+    await server.start()
+    session = RconSession(RconUtility(), '127.0.0.1', server.port, PASSWORD)
+    try:
+        return await body(session)
+    finally:
+        await session.close()
+        await server.stop()
+
+
+# --- Framer ---
+PACKETS = [(7, 0, 'hello'), (8, 0, ''), (9, 2, 'x' * 5000), (10, 0, 'ünïcödé')]
+WIRE = b''.join(packet(rid, ptype, body.encode()) for rid, ptype, body in PACKETS)
+
+
+def test_framer_coalesced_packets():
+    framer = RconPacketReader(None)
+    framer.feed(WIRE)
+    assert list(framer.ready) == PACKETS
+
+
+def test_framer_byte_by_byte():
+    framer = RconPacketReader(None)
+    for i in range(len(WIRE)):
+        framer.feed(WIRE[i:i + 1])
+    assert list(framer.ready) == PACKETS
+    assert not framer.buffer
+
+
+def test_framer_partial_packet_waits_for_the_rest():
+    big = packet(9, 2, b'x' * 5000)
+    framer = RconPacketReader(None)
+    framer.feed(big[:3000])
+    assert not framer.ready and len(framer.buffer) == 3000
+    framer.feed(big[3000:])
+    assert list(framer.ready) == [PACKETS[2]]
+    assert not framer.buffer
+
+
+def test_framer_rejects_malformed_size():
+    framer = RconPacketReader(None)
+    with pytest.raises(ConnectionError):
+        framer.feed(struct.pack('<i', 3) + b'\x00' * 8)
+
+
+# --- Sessions ---
+@pytest.mark.parametrize('mirror', [True, False], ids=['source', 'silent'])
+def test_session_reassembles_responses(mirror):
+    random.seed(14)
+
+    async def body(session: RconSession):
+        start = time.perf_counter()
+        assert await session.execute('ping', timeout=2) == 'OK ping'
+        assert time.perf_counter() - start < 1, "short response was delayed"
+
+        # The warm-up above taught the session whether the server mirrors sentinels
+        assert session.sentinel_echo == mirror
+
+        assert await session.execute('ShowPlayers', timeout=2) == FakeRconServer.RESPONSES['ShowPlayers']
+        assert await session.execute('help', timeout=2) == FakeRconServer.RESPONSES['help']
+
+        commands = [f'cmd{i}' for i in range(50)] + ['ShowPlayers'] * 5
+        random.shuffle(commands)
+        results = await asyncio.gather(*(session.execute(c, timeout=5) for c in commands))
+        assert results == [FakeRconServer.RESPONSES.get(c, f'OK {c}') for c in commands]
+        assert session.connects == 1
+        assert not session.pending and not session.sentinels
+
+    asyncio.run(with_session(FakeRconServer(mirror), body))
+
+
+def test_session_drops_replies_under_unknown_ids():
+    random.seed(14)
+
+    async def body(session: RconSession):
+        commands = [f'cmd{i}' for i in range(20)] + ['help'] * 2
+        random.shuffle(commands)
+        results = await asyncio.gather(*(session.execute(c, timeout=5) for c in commands))
+        assert results == [FakeRconServer.RESPONSES.get(c, f'OK {c}') for c in commands]
+        assert session.unmatched > 0
+
+    asyncio.run(with_session(FakeRconServer(mirror_sentinel=False, stray_sentinel=True), body))
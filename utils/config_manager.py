@@ -2,6 +2,7 @@ import json
 import os
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
+from utils.event_bus import event_bus, ConfigChanged
 
 # Load environment variables is now handled inside ConfigManager using absolute paths
 
@@ -15,7 +16,9 @@ class ConfigManager:
     def __init__(self, config_file: str = "bot_config.json"):
         # self.base_dir isutils/ folder, so we go up one to get root
         self.root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self.config_file = os.path.join(self.root_dir, "data", config_file)
+        # BOT_DATA_DIR moves config and database elsewhere (tests, benchmarks)
+        data_dir = os.environ.get('BOT_DATA_DIR') or os.path.join(self.root_dir, "data")
+        self.config_file = os.path.join(data_dir, config_file)
         self.env_file = os.path.join(self.root_dir, ".env")
         
         # Load environment variables using absolute path
@@ -102,9 +105,11 @@ class ConfigManager:
         return self.config_data.get(key, default)
     
     def set(self, key: str, value: Any) -> bool:
-        """Set a configuration value and save to file"""
+        """Set a configuration value, save to file and publish ConfigChanged"""
         self.config_data[key] = value
-        return self.save_config()
+        saved = self.save_config()
+        event_bus.publish(ConfigChanged(key, value))
+        return saved
     
     def get_all(self) -> Dict[str, Any]:
         """Get all configuration values"""
@@ -5,23 +5,494 @@ from datetime import datetime
 from typing import Optional, Dict, List, Tuple, Any
 import threading
 import asyncio
+from contextlib import contextmanager
+from collections import OrderedDict
+
+from utils.leaderboards import Leaderboards, CATEGORIES as LEADERBOARD_CATEGORIES
+from utils.name_search import NameIndex
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    Persistent per-thread connection handed out by PlayerStatsDB.
+    close() only releases it back to the pool (discarding anything left
+    uncommitted, like a real close would). The pool closes it for real on shutdown.
+    """
+
+    def close(self):
+        if self.in_transaction:
+            self.rollback()
+
+    def force_close(self):
+        super().close()
+
+
+class PlayerCache:
+    """
+    In-memory copy of the hot player fields (rank, level, EXP, PALDOGS, announcer,
+    wheel/chest levels). Every mutating PlayerStatsDB method writes through to it.
+    Online players stay pinned; offline ones are evicted least-recently-used first.
+    """
+    
+    FIELDS = ('rank', 'level', 'experience', 'palmarks', 'active_announcer', 'wheel_level', 'chest_level')
+    
+    def __init__(self, capacity: int = 512):
+        self.capacity = capacity
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._online = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, steam_id: str) -> Optional[Dict[str, Any]]:
+        """Cached fields for a player (copy), or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(steam_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(steam_id)
+            return dict(entry, steam_id=steam_id)
+    
+    def put(self, steam_id: str, row: Dict[str, Any]):
+        """Cache a freshly read player row (caller guarantees it's current)"""
+        entry = {field: row.get(field) for field in self.FIELDS}
+        with self._lock:
+            self._entries[steam_id] = entry
+            self._entries.move_to_end(steam_id)
+            self._evict()
+    
+    def update(self, steam_id: str, **fields):
+        """Write-through of absolute values (no-op if the player isn't cached)"""
+        with self._lock:
+            entry = self._entries.get(steam_id)
+            if entry is not None:
+                entry.update(fields)
+    
+    def adjust(self, steam_id: str, field: str, delta: int):
+        """Write-through of an increment (no-op if the player isn't cached)"""
+        with self._lock:
+            entry = self._entries.get(steam_id)
+            if entry is not None:
+                entry[field] = (entry.get(field) or 0) + delta
+    
+    def invalidate(self, steam_id: str = None):
+        """Drop one player, or everything when steam_id is None"""
+        with self._lock:
+            if steam_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(steam_id, None)
+    
+    def set_online(self, steam_id: str, online: bool = True):
+        """Pin (online) or unpin (offline) a player"""
+        with self._lock:
+            if online:
+                self._online.add(steam_id)
+            else:
+                self._online.discard(steam_id)
+                self._evict()
+    
+    def online_ids(self) -> set:
+        """steam_ids of the players currently marked online"""
+        with self._lock:
+            return set(self._online)
+    
+    def _evict(self):
+        # Oldest offline entries go first; online players are never evicted
+        if len(self._entries) <= self.capacity:
+            return
+        for steam_id in list(self._entries):
+            if len(self._entries) <= self.capacity:
+                break
+            if steam_id not in self._online:
+                del self._entries[steam_id]
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'online': len(self._online),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total * 100, 1) if total else 0.0
+            }
+
+
+class WriteBehindQueue:
+    """
+    Buffers high-volume reward writes (PALDOGS deltas, reward history, daily stats,
+    activity counters) and commits them in a single transaction every
+    FLUSH_INTERVAL seconds or once MAX_BATCH operations are pending.
+    Pending deltas are overlaid onto player reads so balance checks stay exact.
+    """
+    
+    FLUSH_INTERVAL = 0.5  # seconds
+    MAX_BATCH = 500       # operations
+    
+    ACTIVITY_COLUMNS = {
+        'building': 'structures_built',
+        'crafting': 'items_crafted',
+        'tech': 'tech_unlocked',
+        'chat': 'chat_messages'
+    }
+    
+    def __init__(self, database: 'PlayerStatsDB'):
+        self.db = database
+        self._buffer_lock = threading.Lock()
+        self._reset_buffers()
+        self._flusher: Optional[asyncio.Task] = None
+        self._has_data: Optional[asyncio.Event] = None
+        self._batch_full: Optional[asyncio.Event] = None
+    
+    def _reset_buffers(self):
+        self.palmarks: Dict[str, int] = {}                  # steam_id -> delta
+        self.history: List[Tuple[str, int, str, str]] = []  # (steam_id, amount, description, timestamp)
+        self.daily: Dict[Tuple[str, str], int] = {}         # (steam_id, date) -> palmarks earned
+        self.activity: Dict[Tuple[str, str], int] = {}      # (steam_id, column) -> increment
+        self.op_count = 0
+    
+    def add_palmarks(self, steam_id: str, amount: int, reason: str = ""):
+        """Queue a PALDOGS change with its history and daily stats rows"""
+        # reward_history.timestamp defaults to CURRENT_TIMESTAMP (UTC), keep the same format
+        timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+        today = datetime.now().date().isoformat()
+        with self._buffer_lock:
+            self.palmarks[steam_id] = self.palmarks.get(steam_id, 0) + amount
+            self.db.cache.adjust(steam_id, 'palmarks', amount)
+            self.db.leaderboards.earn(steam_id, amount)
+            self.history.append((steam_id, amount, reason, timestamp))
+            self.daily[(steam_id, today)] = self.daily.get((steam_id, today), 0) + amount
+            self.op_count += 1
+        self._notify()
+    
+    def add_activity(self, steam_id: str, activity_type: str, count: int = 1):
+        """Queue an activity_stats increment"""
+        column = self.ACTIVITY_COLUMNS.get(activity_type)
+        if not column:
+            return
+        with self._buffer_lock:
+            key = (steam_id, column)
+            self.activity[key] = self.activity.get(key, 0) + count
+            self.db.leaderboards.adjust(activity_type, steam_id, count)
+            self.op_count += 1
+        self._notify()
+    
+    def overlay(self, data: Dict, steam_id: Optional[str] = None) -> Dict:
+        """
+        Add not-yet-flushed deltas to a player row read from disk (caller holds db.lock)
+        and refresh the player cache from it. Both happen under the buffer lock so a
+        concurrent add_palmarks lands either in the row or in the cached entry, never neither.
+        """
+        steam_id = steam_id or data.get('steam_id')
+        with self._buffer_lock:
+            if 'palmarks' in data and steam_id in self.palmarks:
+                data['palmarks'] = (data['palmarks'] or 0) + self.palmarks[steam_id]
+            for column in self.ACTIVITY_COLUMNS.values():
+                if column in data and (steam_id, column) in self.activity:
+                    data[column] = (data[column] or 0) + self.activity[(steam_id, column)]
+            if steam_id and 'rank' in data:
+                self.db.cache.put(steam_id, data)
+        return data
+    
+    def _notify(self):
+        """Make sure the background flusher is running and wake it up"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (sync caller / shutdown): write straight through
+            self.flush()
+            return
+        
+        if self._flusher is None or self._flusher.done():
+            self._has_data = asyncio.Event()
+            self._batch_full = asyncio.Event()
+            self._flusher = loop.create_task(self._flush_loop())
+        
+        self._has_data.set()
+        if self.op_count >= self.MAX_BATCH:
+            self._batch_full.set()
+    
+    async def _flush_loop(self):
+        while True:
+            # Sleep until there is something to write (no idle wake-ups)
+            await self._has_data.wait()
+            try:
+                await asyncio.wait_for(self._batch_full.wait(), timeout=self.FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._has_data.clear()
+            self._batch_full.clear()
+            
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                print(f"[ERROR] Write-behind flush failed: {e}")
+                await asyncio.sleep(self.FLUSH_INTERVAL)
+            
+            # Writes that arrived during the flush need another round
+            if self.op_count:
+                self._has_data.set()
+    
+    async def flush_async(self):
+        """Flush pending writes now (Async)"""
+        if self.op_count:
+            await asyncio.to_thread(self.flush)
+    
+    def flush(self):
+        """Commit everything pending in one transaction (Internal)"""
+        with self.db.lock:
+            with self._buffer_lock:
+                if not self.op_count:
+                    return
+                palmarks, history, daily, activity = self.palmarks, self.history, self.daily, self.activity
+                self._reset_buffers()
+            
+            conn = self.db.get_connection()
+            cursor = conn.cursor()
+            try:
+                if palmarks:
+                    cursor.executemany(
+                        "UPDATE players SET palmarks = palmarks + ? WHERE steam_id = ?",
+                        [(amount, sid) for sid, amount in palmarks.items()]
+                    )
+                if history:
+                    cursor.executemany('''
+                        INSERT INTO reward_history (steam_id, reward_type, amount, description, timestamp)
+                        VALUES (?, 'paldogs', ?, ?, ?)
+                    ''', history)
+                if daily:
+                    cursor.executemany('''
+                        INSERT INTO daily_stats (steam_id, date, palmarks_earned)
+                        VALUES (?, ?, ?)
+                        ON CONFLICT(steam_id, date) DO UPDATE SET
+                            palmarks_earned = palmarks_earned + excluded.palmarks_earned
+                    ''', [(sid, date, amount) for (sid, date), amount in daily.items()])
+                for column in self.ACTIVITY_COLUMNS.values():
+                    rows = [(count, sid) for (sid, col), count in activity.items() if col == column]
+                    if rows:
+                        cursor.executemany(
+                            f"UPDATE activity_stats SET {column} = {column} + ? WHERE steam_id = ?",
+                            rows
+                        )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                self._requeue(palmarks, history, daily, activity)
+                raise
+            finally:
+                conn.close()
+    
+    def _requeue(self, palmarks, history, daily, activity):
+        """Put a failed batch back in front of anything queued since"""
+        with self._buffer_lock:
+            for sid, amount in palmarks.items():
+                self.palmarks[sid] = self.palmarks.get(sid, 0) + amount
+            self.history = history + self.history
+            for key, amount in daily.items():
+                self.daily[key] = self.daily.get(key, 0) + amount
+            for key, count in activity.items():
+                self.activity[key] = self.activity.get(key, 0) + count
+            self.op_count += len(history) + len(activity)
+
+
+class ActivityUnitOfWork:
+    """
+    One player's upsert -> reward -> level-up -> rank-check sequence, run on a
+    single connection inside a single transaction (see PlayerStatsDB.unit_of_work).
+    The player row is read once and kept current in memory as steps are applied.
+    """
+    
+    def __init__(self, database: 'PlayerStatsDB', cursor, steam_id: str):
+        self.db = database
+        self.cursor = cursor
+        self.steam_id = steam_id
+        
+        # Hot path: online players are normally cached, so no read at all
+        self.stats = database.cache.get(steam_id)
+        if self.stats is None:
+            cursor.execute("SELECT * FROM players WHERE steam_id = ?", (steam_id,))
+            row = cursor.fetchone()
+            self.stats = database.write_queue.overlay(dict(row), steam_id) if row else None
+        
+        self.old_rank = self.rank
+        self.old_level = self.level
+        self.leveled_up = False
+        self.ranked_up = False
+        self.streak = 0
+        self.is_first_today = False
+        self.palmarks_awarded = 0
+        self.exp_awarded = 0
+    
+    @property
+    def rank(self) -> str:
+        return self.stats.get('rank', 'Trainer') if self.stats else 'Trainer'
+    
+    @property
+    def level(self) -> int:
+        return self.stats.get('level', 1) if self.stats else 1
+    
+    @property
+    def announcer(self) -> str:
+        return self.stats.get('active_announcer', 'default') if self.stats else 'default'
+    
+    def record_login(self) -> Tuple[int, bool]:
+        self.streak, self.is_first_today = self.db._record_login_tx(self.cursor, self.steam_id)
+        self.db.cache.set_online(self.steam_id, True)
+        return self.streak, self.is_first_today
+    
+    def record_logout(self):
+        self.db._record_logout_tx(self.cursor, self.steam_id)
+        self.db.cache.set_online(self.steam_id, False)
+    
+    def add_activity(self, activity_type: str, count: int = 1):
+        self.db._add_activity_tx(self.cursor, self.steam_id, activity_type, count)
+    
+    def add_palmarks(self, amount: int, reason: str = ""):
+        self.db._add_palmarks_tx(self.cursor, self.steam_id, amount, reason)
+        self.palmarks_awarded += amount
+        if self.stats:
+            self.stats['palmarks'] = (self.stats.get('palmarks') or 0) + amount
+    
+    def add_experience(self, amount: int) -> Tuple[bool, int]:
+        current = (self.stats.get('experience') or 0, self.level) if self.stats else None
+        leveled_up, new_level = self.db._add_experience_tx(self.cursor, self.steam_id, amount, current)
+        self.exp_awarded += amount
+        if self.stats:
+            self.stats['experience'] = (self.stats.get('experience') or 0) + amount
+            self.stats['level'] = new_level
+        self.leveled_up = self.leveled_up or leveled_up
+        return leveled_up, new_level
+    
+    def check_rank(self, resolver) -> Tuple[str, bool]:
+        """resolver(current_rank, palmarks) -> (rank, ranked_up), e.g. RankSystem.resolve_rank"""
+        if not self.stats:
+            return 'Trainer', False
+        new_rank, ranked_up = resolver(self.rank, self.stats.get('palmarks', 0))
+        if ranked_up:
+            self.cursor.execute("UPDATE players SET rank = ? WHERE steam_id = ?", (new_rank, self.steam_id))
+            self.db.cache.update(self.steam_id, rank=new_rank)
+            self.stats['rank'] = new_rank
+            self.ranked_up = True
+            print(f"[OK] Updated {self.steam_id} to rank: {new_rank}")
+        return self.rank, ranked_up
+    
+    def summary(self) -> Dict[str, Any]:
+        """Everything process_activity needs to build its messages"""
+        return {
+            'old_rank': self.old_rank,
+            'rank': self.rank,
+            'ranked_up': self.ranked_up,
+            'old_level': self.old_level,
+            'level': self.level,
+            'leveled_up': self.leveled_up,
+            'announcer': self.announcer,
+            'streak': self.streak,
+            'is_first_today': self.is_first_today,
+            'palmarks': self.palmarks_awarded,
+            'exp': self.exp_awarded
+        }
+
 
 class PlayerStatsDB:
     """Database handler for player statistics and rewards system (PALDOGS)"""
     
+    # Connection tuning applied to every pooled connection
+    PRAGMAS = {
+        'journal_mode': 'WAL',       # Readers never block the writer (and vice versa)
+        'synchronous': 'NORMAL',     # Safe with WAL, fsync only at checkpoints
+        'cache_size': -16000,        # ~16MB page cache per connection
+        'mmap_size': 268435456,      # 256MB memory-mapped reads
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,        # Wait (ms) instead of failing on a locked db
+    }
+    
     def __init__(self, db_path: str = "player_stats.db"):
-        # Go up from utils/ to root, then into data/
+        # Go up from utils/ to root, then into data/ (or BOT_DATA_DIR, see ConfigManager)
         root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self.db_path = os.path.join(root_dir, "data", db_path)
+        self.db_path = os.path.join(os.environ.get('BOT_DATA_DIR') or os.path.join(root_dir, "data"), db_path)
         self.lock = threading.RLock()
+        
+        # Connection pool: one persistent connection per thread
+        self._local = threading.local()
+        self._pool = []
+        self._pool_lock = threading.Lock()
+        self._closed = False
+        
+        # Hot player fields kept in memory (see PlayerCache)
+        self.cache = PlayerCache()
+        
+        # Batched reward/activity writes (see WriteBehindQueue)
+        self.write_queue = WriteBehindQueue(self)
+        
+        # Top-K per category kept in memory (see Leaderboards)
+        self.leaderboards = Leaderboards()
+        
+        # Trigram index over player names (see NameIndex)
+        self.names = NameIndex()
+        
         self.init_database()
+        self._reset_interrupted_deliveries()
+        self._load_leaderboards()
+        self._load_name_index()
     
     def get_connection(self):
-        """Get a database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        """Get this thread's pooled database connection (opened on first use)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            if self._closed:
+                raise sqlite3.ProgrammingError("PlayerStatsDB has been shut down")
+            conn = sqlite3.connect(self.db_path, factory=PooledConnection, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._configure_connection(conn)
+            self._local.conn = conn
+            with self._pool_lock:
+                self._pool.append(conn)
+        elif conn.in_transaction:
+            # A previous call on this thread failed before commit; don't let a later commit pick it up
+            conn.rollback()
         return conn
     
+    def _configure_connection(self, conn: sqlite3.Connection):
+        """Apply performance pragmas to a fresh connection"""
+        for pragma, value in self.PRAGMAS.items():
+            try:
+                conn.execute(f"PRAGMA {pragma} = {value}")
+            except sqlite3.Error as e:
+                print(f"⚠️ [DATABASE] Could not set PRAGMA {pragma}: {e}")
+    
+    def get_pool_size(self) -> int:
+        """Number of open pooled connections"""
+        with self._pool_lock:
+            return len(self._pool)
+    
+    async def flush_writes(self):
+        """Commit any queued reward/activity writes immediately (Async)"""
+        await self.write_queue.flush_async()
+    
+    def close(self):
+        """Flush queued writes and close every pooled connection (call on bot shutdown)"""
+        try:
+            self.write_queue.flush()
+        except Exception as e:
+            print(f"[ERROR] Final write-behind flush failed: {e}")
+        with self.lock, self._pool_lock:
+            self._closed = True
+            for conn in self._pool:
+                try:
+                    if conn.in_transaction:
+                        conn.rollback()
+                    conn.force_close()
+                except Exception as e:
+                    print(f"⚠️ [DATABASE] Error closing connection: {e}")
+            count = len(self._pool)
+            self._pool.clear()
+            # Other threads' locals still point at closed connections; a fresh local forgets them
+            self._local = threading.local()
+        print(f"[OK] Database pool closed ({count} connections)")
+    
     def init_database(self):
         """Initialize database tables"""
         with self.lock:
@@ -117,86 +588,232 @@ class PlayerStatsDB:
                 )
             ''')
             
-            # Migration: Rename dogcoin to palmarks in players table
-            cursor.execute("PRAGMA table_info(players)")
-            columns = [column[1] for column in cursor.fetchall()]
-            if 'dogcoin' in columns and 'palmarks' not in columns:
-                try:
-                    cursor.execute("ALTER TABLE players RENAME COLUMN dogcoin TO palmarks")
-                    print("🔄 Migrated database: players.dogcoin -> players.palmarks")
-                except Exception as e:
-                    print(f"[ERROR] Migration error (players): {e}")
+            # Bring the schema up to date (each step runs once, see MIGRATIONS)
+            self._run_migrations(cursor)
 
-            # Migration: Rename dogcoin_earned to palmarks_earned in daily_stats table
-            cursor.execute("PRAGMA table_info(daily_stats)")
-            columns = [column[1] for column in cursor.fetchall()]
-            if 'dogcoin_earned' in columns and 'palmarks_earned' not in columns:
-                try:
-                    cursor.execute("ALTER TABLE daily_stats RENAME COLUMN dogcoin_earned TO palmarks_earned")
-                    print("🔄 Migrated database: daily_stats.dogcoin_earned -> daily_stats.palmarks_earned")
-                except Exception as e:
-                    print(f"[ERROR] Migration error (daily_stats): {e}")
+            conn.commit()
+            conn.close()
+            print("[OK] Database initialized successfully")
+    
+    def _load_leaderboards(self):
+        """Build the in-memory leaderboards; the only time they are read from SQL"""
+        with self.lock:
+            conn = self.get_connection()
+            try:
+                self.leaderboards.load(conn.cursor())
+            finally:
+                conn.close()
 
-            # Migration: Add chest_rolls and wheel_spins to daily_stats
-            cursor.execute("PRAGMA table_info(daily_stats)")
-            columns = [column[1] for column in cursor.fetchall()]
-            if 'chest_rolls' not in columns:
-                try:
-                    cursor.execute("ALTER TABLE daily_stats ADD COLUMN chest_rolls INTEGER DEFAULT 0")
-                except: pass
-            if 'wheel_spins' not in columns:
-                try:
-                    cursor.execute("ALTER TABLE daily_stats ADD COLUMN wheel_spins INTEGER DEFAULT 0")
-                except: pass
+    def _load_name_index(self):
+        """Build the player name index, least recently seen first"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT steam_id, player_name FROM players ORDER BY last_seen, rowid")
+            self.names.load((row[0], row[1]) for row in cursor.fetchall())
+        finally:
+            conn.close()
 
-            # Migration: Add active_announcer column if not exists
-            cursor.execute("PRAGMA table_info(players)")
-            columns = [column[1] for column in cursor.fetchall()]
-            if 'active_announcer' not in columns:
-                try:
-                    cursor.execute("ALTER TABLE players ADD COLUMN active_announcer TEXT DEFAULT 'default'")
-                    print("🔄 Migrated database: Added active_announcer to players")
-                except Exception as e:
-                    print(f"[ERROR] Migration error (announcer): {e}")
+    # --- SCHEMA MIGRATIONS ---
+    # Ordered (version, description, method name). Append new steps; never edit or reorder applied ones.
+    MIGRATIONS = [
+        (1, "legacy column renames/additions", '_migration_1_legacy_columns'),
+        (2, "indexes for hot lookups", '_migration_2_indexes'),
+        (3, "log tail checkpoints", '_migration_3_log_checkpoints'),
+        (4, "item delivery ledger", '_migration_4_deliveries'),
+        (5, "scheduled jobs", '_migration_5_scheduled_jobs'),
+    ]
+
+    def _run_migrations(self, cursor):
+        """Apply every migration newer than the recorded schema_version"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        current = cursor.fetchone()[0]
 
-            # Migration: Add level and experience columns if not exists
-            cursor.execute("PRAGMA table_info(players)")
-            columns = [column[1] for column in cursor.fetchall()]
-            if 'level' not in columns:
-                try:
-                    cursor.execute("ALTER TABLE players ADD COLUMN level INTEGER DEFAULT 1")
-                    print("🔄 Migrated database: Added level to players")
-                except Exception as e:
-                    print(f"[ERROR] Migration error (level): {e}")
-            if 'experience' not in columns:
-                try:
-                    cursor.execute("ALTER TABLE players ADD COLUMN experience INTEGER DEFAULT 0")
-                    print("🔄 Migrated database: Added experience to players")
-                except Exception as e:
-                    print(f"[ERROR] Migration error (experience): {e}")
+        for version, description, method_name in self.MIGRATIONS:
+            if version <= current:
+                continue
+            getattr(self, method_name)(cursor)
+            cursor.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (version, description)
+            )
+            cursor.connection.commit()
+            print(f"🔄 Migrated database to schema v{version}: {description}")
 
-            # Migration: Add wheel_level to players
-            cursor.execute("PRAGMA table_info(players)")
-            columns = [column[1] for column in cursor.fetchall()]
-            if 'wheel_level' not in columns:
-                try:
-                    cursor.execute("ALTER TABLE players ADD COLUMN wheel_level INTEGER DEFAULT 0")
-                    print("🔄 Migrated database: Added wheel_level to players")
-                except Exception as e:
-                    print(f"[ERROR] Migration error (wheel_level): {e}")
+    def get_schema_version(self) -> int:
+        """Highest applied migration"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        version = cursor.fetchone()[0]
+        conn.close()
+        return version
+
+    def _migration_1_legacy_columns(self, cursor):
+        """Column changes that used to be re-checked on every start (all idempotent)"""
+        # Migration: Rename dogcoin to palmarks in players table
+        cursor.execute("PRAGMA table_info(players)")
+        columns = [column[1] for column in cursor.fetchall()]
+        if 'dogcoin' in columns and 'palmarks' not in columns:
+            try:
+                cursor.execute("ALTER TABLE players RENAME COLUMN dogcoin TO palmarks")
+                print("🔄 Migrated database: players.dogcoin -> players.palmarks")
+            except Exception as e:
+                print(f"[ERROR] Migration error (players): {e}")
 
-            # Migration: Add chest_level to players
-            if 'chest_level' not in columns:
-                try:
-                    cursor.execute("ALTER TABLE players ADD COLUMN chest_level INTEGER DEFAULT 0")
-                    print("🔄 Migrated database: Added chest_level to players")
-                except Exception as e:
-                    print(f"[ERROR] Migration error (chest_level): {e}")
+        # Migration: Rename dogcoin_earned to palmarks_earned in daily_stats table
+        cursor.execute("PRAGMA table_info(daily_stats)")
+        columns = [column[1] for column in cursor.fetchall()]
+        if 'dogcoin_earned' in columns and 'palmarks_earned' not in columns:
+            try:
+                cursor.execute("ALTER TABLE daily_stats RENAME COLUMN dogcoin_earned TO palmarks_earned")
+                print("🔄 Migrated database: daily_stats.dogcoin_earned -> daily_stats.palmarks_earned")
+            except Exception as e:
+                print(f"[ERROR] Migration error (daily_stats): {e}")
+
+        # Migration: Add chest_rolls and wheel_spins to daily_stats
+        cursor.execute("PRAGMA table_info(daily_stats)")
+        columns = [column[1] for column in cursor.fetchall()]
+        if 'chest_rolls' not in columns:
+            try:
+                cursor.execute("ALTER TABLE daily_stats ADD COLUMN chest_rolls INTEGER DEFAULT 0")
+            except: pass
+        if 'wheel_spins' not in columns:
+            try:
+                cursor.execute("ALTER TABLE daily_stats ADD COLUMN wheel_spins INTEGER DEFAULT 0")
+            except: pass
+
+        # Migration: Add active_announcer column if not exists
+        cursor.execute("PRAGMA table_info(players)")
+        columns = [column[1] for column in cursor.fetchall()]
+        if 'active_announcer' not in columns:
+            try:
+                cursor.execute("ALTER TABLE players ADD COLUMN active_announcer TEXT DEFAULT 'default'")
+                print("🔄 Migrated database: Added active_announcer to players")
+            except Exception as e:
+                print(f"[ERROR] Migration error (announcer): {e}")
+
+        # Migration: Add level and experience columns if not exists
+        cursor.execute("PRAGMA table_info(players)")
+        columns = [column[1] for column in cursor.fetchall()]
+        if 'level' not in columns:
+            try:
+                cursor.execute("ALTER TABLE players ADD COLUMN level INTEGER DEFAULT 1")
+                print("🔄 Migrated database: Added level to players")
+            except Exception as e:
+                print(f"[ERROR] Migration error (level): {e}")
+        if 'experience' not in columns:
+            try:
+                cursor.execute("ALTER TABLE players ADD COLUMN experience INTEGER DEFAULT 0")
+                print("🔄 Migrated database: Added experience to players")
+            except Exception as e:
+                print(f"[ERROR] Migration error (experience): {e}")
+
+        # Migration: Add wheel_level to players
+        cursor.execute("PRAGMA table_info(players)")
+        columns = [column[1] for column in cursor.fetchall()]
+        if 'wheel_level' not in columns:
+            try:
+                cursor.execute("ALTER TABLE players ADD COLUMN wheel_level INTEGER DEFAULT 0")
+                print("🔄 Migrated database: Added wheel_level to players")
+            except Exception as e:
+                print(f"[ERROR] Migration error (wheel_level): {e}")
+
+        # Migration: Add chest_level to players
+        if 'chest_level' not in columns:
+            try:
+                cursor.execute("ALTER TABLE players ADD COLUMN chest_level INTEGER DEFAULT 0")
+                print("🔄 Migrated database: Added chest_level to players")
+            except Exception as e:
+                print(f"[ERROR] Migration error (chest_level): {e}")
+
+        # Migration: Add type to player_inventory (was checked on every insert)
+        cursor.execute("PRAGMA table_info(player_inventory)")
+        columns = [c[1] for c in cursor.fetchall()]
+        if 'type' not in columns:
+            cursor.execute("ALTER TABLE player_inventory ADD COLUMN type TEXT DEFAULT 'item'")
+
+    def _migration_2_indexes(self, cursor):
+        """Secondary indexes for the lookups we run constantly"""
+        # /link, shop, gambling: WHERE discord_id = ?
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_players_discord_id ON players(discord_id)")
+        # Lookups by name: WHERE player_name = ? COLLATE NOCASE ORDER BY last_seen DESC
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_players_name_nocase ON players(player_name COLLATE NOCASE, last_seen)")
+        # Logout: WHERE steam_id = ? AND logout_time IS NULL ORDER BY login_time DESC
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_open ON sessions(steam_id, logout_time, login_time)")
+        # Server stats: COUNT(DISTINCT steam_id) WHERE DATE(login_time) = ? (covering)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_login_date ON sessions(DATE(login_time), steam_id)")
+        # Live stats recent activity: ORDER BY timestamp DESC LIMIT n
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_reward_history_timestamp ON reward_history(timestamp)")
+        # Unclaimed items: JOIN ... WHERE steam_id = ? AND claimed = 0
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_inventory_unclaimed ON player_inventory(steam_id, claimed)")
+        # Server stats: SUM(...) WHERE date = ? (the UNIQUE(steam_id, date) index can't serve date alone)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_daily_stats_date ON daily_stats(date)")
+        cursor.execute("ANALYZE")
+
+    def _migration_3_log_checkpoints(self, cursor):
+        """Where the PalDefender log tailer got to in each file"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS log_checkpoints (
+                path TEXT PRIMARY KEY,
+                inode INTEGER,
+                size INTEGER,
+                offset INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+    def _migration_4_deliveries(self, cursor):
+        """Orders and per-line-item state for RCON deliveries (see utils/delivery_engine.py)"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS deliveries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                steam_id TEXT NOT NULL,
+                source TEXT,
+                description TEXT,
+                cost INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS delivery_items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                delivery_id INTEGER NOT NULL,
+                steam_id TEXT NOT NULL,
+                kind TEXT NOT NULL DEFAULT 'item',
+                item_id TEXT NOT NULL,
+                amount INTEGER DEFAULT 1,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER DEFAULT 0,
+                last_error TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (delivery_id) REFERENCES deliveries(id)
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_delivery_items_status ON delivery_items(status, steam_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_delivery_items_delivery ON delivery_items(delivery_id)")
+
+    def _migration_5_scheduled_jobs(self, cursor):
+        """Persistent timers for utils/scheduler.py"""
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scheduled_jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                run_at REAL NOT NULL,
+                schedule TEXT,
+                payload TEXT,
+                grace REAL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
 
-            conn.commit()
-            conn.close()
-            print("[OK] Database initialized successfully")
-    
     async def upsert_player(self, steam_id: str, player_name: str, discord_id: str = None):
         """Insert or update player information (Async)"""
         await asyncio.to_thread(self._upsert_player, steam_id, player_name, discord_id)
@@ -206,25 +823,29 @@ class PlayerStatsDB:
         with self.lock:
             conn = self.get_connection()
             cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO players (steam_id, player_name, discord_id, last_seen)
-                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-                ON CONFLICT(steam_id) DO UPDATE SET
-                    player_name = excluded.player_name,
-                    discord_id = COALESCE(excluded.discord_id, discord_id),
-                    last_seen = CURRENT_TIMESTAMP
-            ''', (steam_id, player_name, discord_id))
-            
-            # Ensure activity stats entry exists
-            cursor.execute('''
-                INSERT OR IGNORE INTO activity_stats (steam_id)
-                VALUES (?)
-            ''', (steam_id,))
-            
+            self._upsert_player_tx(cursor, steam_id, player_name, discord_id)
             conn.commit()
             conn.close()
 
+    def _upsert_player_tx(self, cursor, steam_id: str, player_name: str, discord_id: str = None):
+        """Upsert statements on an open cursor (caller commits)"""
+        cursor.execute('''
+            INSERT INTO players (steam_id, player_name, discord_id, last_seen)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(steam_id) DO UPDATE SET
+                player_name = excluded.player_name,
+                discord_id = COALESCE(excluded.discord_id, discord_id),
+                last_seen = CURRENT_TIMESTAMP
+        ''', (steam_id, player_name, discord_id))
+        
+        # Ensure activity stats entry exists
+        cursor.execute('''
+            INSERT OR IGNORE INTO activity_stats (steam_id)
+            VALUES (?)
+        ''', (steam_id,))
+        self.leaderboards.ensure_player(steam_id)
+        self.names.update(steam_id, player_name)
+
     async def link_account(self, steam_id: str, discord_id: int):
         """Link a Steam ID to a Discord ID (Async)"""
         await asyncio.to_thread(self._link_account, steam_id, discord_id)
@@ -250,12 +871,13 @@ class PlayerStatsDB:
 
     def _get_player_by_discord(self, discord_id: int) -> Optional[Dict]:
         """Find player data by Discord ID (Internal)"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM players WHERE discord_id = ?", (str(discord_id),))
-        result = cursor.fetchone()
-        conn.close()
-        return dict(result) if result else None
+        with self.lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM players WHERE discord_id = ?", (str(discord_id),))
+            result = cursor.fetchone()
+            conn.close()
+            return self.write_queue.overlay(dict(result)) if result else None
     
     async def record_login(self, steam_id: str, player_name: str):
         """Record player login (Async)"""
@@ -268,45 +890,50 @@ class PlayerStatsDB:
             cursor = conn.cursor()
             
             # Update player
-            self._upsert_player(steam_id, player_name)
-            
-            # Check login streak
-            cursor.execute('''
-                SELECT last_login_date, login_streak FROM players WHERE steam_id = ?
-            ''', (steam_id,))
-            result = cursor.fetchone()
-            
-            today = datetime.now().date()
-            new_streak = 1
-            is_first_today = True
-            
-            if result and result['last_login_date']:
-                last_date = datetime.strptime(result['last_login_date'], '%Y-%m-%d').date()
-                days_diff = (today - last_date).days
-                
-                if days_diff == 1:
-                    new_streak = result['login_streak'] + 1
-                elif days_diff == 0:
-                    new_streak = result['login_streak']
-                    is_first_today = False
-            
-            # Update streak
-            cursor.execute('''
-                UPDATE players 
-                SET login_streak = ?, last_login_date = ?
-                WHERE steam_id = ?
-            ''', (new_streak, today.isoformat(), steam_id))
-            
-            # Create session
-            cursor.execute('''
-                INSERT INTO sessions (steam_id, login_time)
-                VALUES (?, CURRENT_TIMESTAMP)
-            ''', (steam_id,))
+            self._upsert_player_tx(cursor, steam_id, player_name)
+            new_streak, is_first_today = self._record_login_tx(cursor, steam_id)
             
             conn.commit()
             conn.close()
             
             return new_streak, is_first_today
+
+    def _record_login_tx(self, cursor, steam_id: str) -> Tuple[int, bool]:
+        """Streak update + new session on an open cursor (caller commits)"""
+        # Check login streak
+        cursor.execute('''
+            SELECT last_login_date, login_streak FROM players WHERE steam_id = ?
+        ''', (steam_id,))
+        result = cursor.fetchone()
+        
+        today = datetime.now().date()
+        new_streak = 1
+        is_first_today = True
+        
+        if result and result['last_login_date']:
+            last_date = datetime.strptime(result['last_login_date'], '%Y-%m-%d').date()
+            days_diff = (today - last_date).days
+            
+            if days_diff == 1:
+                new_streak = result['login_streak'] + 1
+            elif days_diff == 0:
+                new_streak = result['login_streak']
+                is_first_today = False
+        
+        # Update streak
+        cursor.execute('''
+            UPDATE players 
+            SET login_streak = ?, last_login_date = ?
+            WHERE steam_id = ?
+        ''', (new_streak, today.isoformat(), steam_id))
+        
+        # Create session
+        cursor.execute('''
+            INSERT INTO sessions (steam_id, login_time)
+            VALUES (?, CURRENT_TIMESTAMP)
+        ''', (steam_id,))
+        
+        return new_streak, is_first_today
     
     async def record_logout(self, steam_id: str):
         """Record player logout and calculate session duration (Async)"""
@@ -317,109 +944,104 @@ class PlayerStatsDB:
         with self.lock:
             conn = self.get_connection()
             cursor = conn.cursor()
-            
-            # Find active session
-            cursor.execute('''
-                SELECT id, login_time FROM sessions
-                WHERE steam_id = ? AND logout_time IS NULL
-                ORDER BY login_time DESC LIMIT 1
-            ''', (steam_id,))
-            
-            session = cursor.fetchone()
-            if session:
-                login_time = datetime.fromisoformat(session['login_time'])
-                logout_time = datetime.now()
-                duration = int((logout_time - login_time).total_seconds())
-                
-                # Update session
-                cursor.execute('''
-                    UPDATE sessions
-                    SET logout_time = ?, duration = ?
-                    WHERE id = ?
-                ''', (logout_time.isoformat(), duration, session['id']))
-                
-                # Update total playtime
-                cursor.execute('''
-                    UPDATE players
-                    SET total_playtime = total_playtime + ?
-                    WHERE steam_id = ?
-                ''', (duration, steam_id))
-                
+            if self._record_logout_tx(cursor, steam_id):
                 conn.commit()
-            
             conn.close()
+
+    def _record_logout_tx(self, cursor, steam_id: str) -> bool:
+        """Close the active session on an open cursor (caller commits). Returns False if none was open."""
+        # Find active session
+        cursor.execute('''
+            SELECT id, login_time FROM sessions
+            WHERE steam_id = ? AND logout_time IS NULL
+            ORDER BY login_time DESC LIMIT 1
+        ''', (steam_id,))
+        
+        session = cursor.fetchone()
+        if not session:
+            return False
+        
+        login_time = datetime.fromisoformat(session['login_time'])
+        logout_time = datetime.now()
+        duration = int((logout_time - login_time).total_seconds())
+        
+        # Update session
+        cursor.execute('''
+            UPDATE sessions
+            SET logout_time = ?, duration = ?
+            WHERE id = ?
+        ''', (logout_time.isoformat(), duration, session['id']))
+        
+        # Update total playtime
+        cursor.execute('''
+            UPDATE players
+            SET total_playtime = total_playtime + ?
+            WHERE steam_id = ?
+        ''', (duration, steam_id))
+        self.leaderboards.adjust('playtime', steam_id, duration)
+        return True
     
     async def add_activity(self, steam_id: str, activity_type: str, count: int = 1):
-        """Record player activity (Async)"""
-        await asyncio.to_thread(self._add_activity, steam_id, activity_type, count)
+        """Record player activity (Async, batched via write_queue)"""
+        self.write_queue.add_activity(steam_id, activity_type, count)
 
     def _add_activity(self, steam_id: str, activity_type: str, count: int = 1):
         """Record player activity (Internal)"""
         with self.lock:
             conn = self.get_connection()
             cursor = conn.cursor()
-            
-            if activity_type == 'building':
-                cursor.execute('''
-                    UPDATE activity_stats
-                    SET structures_built = structures_built + ?
-                    WHERE steam_id = ?
-                ''', (count, steam_id))
-            elif activity_type == 'crafting':
-                cursor.execute('''
-                    UPDATE activity_stats
-                    SET items_crafted = items_crafted + ?
-                    WHERE steam_id = ?
-                ''', (count, steam_id))
-            elif activity_type == 'tech':
-                cursor.execute('''
-                    UPDATE activity_stats
-                    SET tech_unlocked = tech_unlocked + ?
-                    WHERE steam_id = ?
-                ''', (count, steam_id))
-            elif activity_type == 'chat':
-                cursor.execute('''
-                    UPDATE activity_stats
-                    SET chat_messages = chat_messages + ?
-                    WHERE steam_id = ?
-                ''', (count, steam_id))
-            
+            self._add_activity_tx(cursor, steam_id, activity_type, count)
             conn.commit()
             conn.close()
+
+    def _add_activity_tx(self, cursor, steam_id: str, activity_type: str, count: int = 1):
+        """Activity counter update on an open cursor (caller commits)"""
+        column = WriteBehindQueue.ACTIVITY_COLUMNS.get(activity_type)
+        if column:
+            cursor.execute(f'''
+                UPDATE activity_stats
+                SET {column} = {column} + ?
+                WHERE steam_id = ?
+            ''', (count, steam_id))
+            self.leaderboards.adjust(activity_type, steam_id, count)
     
     async def add_palmarks(self, steam_id: str, amount: int, reason: str = ""):
-        """Add PALDOGS to player (Async)"""
-        await asyncio.to_thread(self._add_palmarks, steam_id, amount, reason)
+        """Add PALDOGS to player (Async, batched via write_queue)"""
+        self.write_queue.add_palmarks(steam_id, amount, reason)
 
     def _add_palmarks(self, steam_id: str, amount: int, reason: str = ""):
         """Add PALDOGS to player (Internal)"""
         with self.lock:
             conn = self.get_connection()
             cursor = conn.cursor()
-            
-            cursor.execute('''
-                UPDATE players
-                SET palmarks = palmarks + ?
-                WHERE steam_id = ?
-            ''', (amount, steam_id))
-            
-            # Record in history
-            cursor.execute('''
-                INSERT INTO reward_history (steam_id, reward_type, amount, description)
-                VALUES (?, 'paldogs', ?, ?)
-            ''', (steam_id, amount, reason))
-            
-            # Update daily stats
-            today = datetime.now().date().isoformat()
-            cursor.execute('''
-                INSERT INTO daily_stats (steam_id, date, palmarks_earned)
-                VALUES (?, ?, ?)
-                ON CONFLICT(steam_id, date) DO UPDATE SET
-                    palmarks_earned = palmarks_earned + excluded.palmarks_earned
-            ''', (steam_id, today, amount))
-            
+            self._add_palmarks_tx(cursor, steam_id, amount, reason)
             conn.commit()
             conn.close()
+
+    def _add_palmarks_tx(self, cursor, steam_id: str, amount: int, reason: str = ""):
+        """Balance, history and daily stats writes on an open cursor (caller commits)"""
+        cursor.execute('''
+            UPDATE players
+            SET palmarks = palmarks + ?
+            WHERE steam_id = ?
+        ''', (amount, steam_id))
+        self.cache.adjust(steam_id, 'palmarks', amount)
+        self.leaderboards.earn(steam_id, amount)
+        
+        # Record in history
+        cursor.execute('''
+            INSERT INTO reward_history (steam_id, reward_type, amount, description)
+            VALUES (?, 'paldogs', ?, ?)
+        ''', (steam_id, amount, reason))
+        
+        # Update daily stats
+        today = datetime.now().date().isoformat()
+        cursor.execute('''
+            INSERT INTO daily_stats (steam_id, date, palmarks_earned)
+            VALUES (?, ?, ?)
+            ON CONFLICT(steam_id, date) DO UPDATE SET
+                palmarks_earned = palmarks_earned + excluded.palmarks_earned
+        ''', (steam_id, today, amount))
     
     async def get_player_stats(self, steam_id: str) -> Optional[Dict]:
         """Get complete player statistics (Async)"""
@@ -427,23 +1049,343 @@ class PlayerStatsDB:
 
     def _get_player_stats(self, steam_id: str) -> Optional[Dict]:
         """Get complete player statistics (Internal)"""
+        # Held so a concurrent write-behind flush can't land between the read and the overlay
+        with self.lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT p.*, a.*
+                FROM players p
+                LEFT JOIN activity_stats a ON p.steam_id = a.steam_id
+                WHERE p.steam_id = ?
+            ''', (steam_id,))
+            
+            result = cursor.fetchone()
+            conn.close()
+            
+            if result:
+                return self.write_queue.overlay(dict(result), steam_id)
+            return None
+    
+    async def get_player_state(self, steam_id: str) -> Optional[Dict]:
+        """
+        Hot player fields (rank, level, experience, palmarks, active_announcer,
+        wheel_level, chest_level) from the player cache; only a miss touches SQLite (Async)
+        """
+        state = self.cache.get(steam_id)
+        if state is not None:
+            return state
+        return await asyncio.to_thread(self._get_player_state, steam_id)
+
+    def _get_player_state(self, steam_id: str) -> Optional[Dict]:
+        """Load a player into the cache and return the cached fields (Internal)"""
+        # _get_player_stats refreshes the cache entry as a side effect
+        stats = self._get_player_stats(steam_id)
+        if not stats:
+            return None
+        state = {field: stats.get(field) for field in PlayerCache.FIELDS}
+        state['steam_id'] = steam_id
+        return state
+
+    @contextmanager
+    def unit_of_work(self, steam_id: str, player_name: str = None, checkpoint=None):
+        """
+        Run several player updates as one transaction on this thread's connection.
+        Upserts the player first when player_name is given. Commits on exit, rolls back on error.
+        A (path, inode, size, offset) log checkpoint, or a function returning one (called under
+        the lock right before the commit), commits in the same transaction.
+        """
+        with self.lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            try:
+                if player_name:
+                    self._upsert_player_tx(cursor, steam_id, player_name)
+                yield ActivityUnitOfWork(self, cursor, steam_id)
+                if callable(checkpoint):
+                    checkpoint = checkpoint()
+                if checkpoint:
+                    self._save_log_checkpoint_tx(cursor, *checkpoint)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                # Cached values may include writes that just got rolled back
+                self.cache.invalidate(steam_id)
+                self._resync_leaderboards(steam_id)
+                raise
+            finally:
+                conn.close()
+
+    def _resync_leaderboards(self, steam_id: str):
+        """Re-read one player's ranked columns (plus queued deltas) after a rollback (Internal)"""
         conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT p.*, a.*
-            FROM players p
-            LEFT JOIN activity_stats a ON p.steam_id = a.steam_id
-            WHERE p.steam_id = ?
-        ''', (steam_id,))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
-            return dict(result)
-        return None
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT p.steam_id, p.palmarks, p.total_playtime, a.structures_built, a.items_crafted
+                FROM players p
+                LEFT JOIN activity_stats a ON p.steam_id = a.steam_id
+                WHERE p.steam_id = ?
+            ''', (steam_id,))
+            row = cursor.fetchone()
+            today = datetime.now().date().isoformat()
+            cursor.execute("SELECT palmarks_earned FROM daily_stats WHERE steam_id = ? AND date = ?", (steam_id, today))
+            daily = cursor.fetchone()
+        finally:
+            conn.close()
+
+        if row is None:
+            self.leaderboards.set_scores(steam_id, dict.fromkeys(('palmarks', 'playtime', 'building', 'crafting', 'daily')))
+            return
+        data = self.write_queue.overlay(dict(row), steam_id)
+        with self.write_queue._buffer_lock:
+            pending_daily = self.write_queue.daily.get((steam_id, today), 0)
+        earned = (daily['palmarks_earned'] if daily else 0) + pending_daily
+        self.leaderboards.set_scores(steam_id, {
+            'palmarks': data['palmarks'] or 0,
+            'playtime': data['total_playtime'] or 0,
+            'building': data['structures_built'] or 0,
+            'crafting': data['items_crafted'] or 0,
+            'daily': earned if daily or pending_daily else None
+        })
+
+    async def apply_activity_batch(self, steam_id: str, player_name: str, work, checkpoint=None) -> Any:
+        """
+        Run work(uow) inside unit_of_work in a single thread dispatch (Async).
+        work is a plain function; whatever it returns is passed back.
+        """
+        return await asyncio.to_thread(self._apply_activity_batch, steam_id, player_name, work, checkpoint)
+
+    def _apply_activity_batch(self, steam_id: str, player_name: str, work, checkpoint=None) -> Any:
+        """Run work(uow) inside unit_of_work (Internal)"""
+        with self.unit_of_work(steam_id, player_name, checkpoint) as uow:
+            return work(uow)
     
+    # --- LOG CHECKPOINTS ---
+    async def save_log_checkpoint(self, path: str, inode: int, size: int, offset: int):
+        """Record how far a log file has been processed (Async)"""
+        await asyncio.to_thread(self._save_log_checkpoint, path, inode, size, offset)
+
+    def _save_log_checkpoint(self, path: str, inode: int, size: int, offset: int):
+        """
+        Record how far a log file has been processed (Internal). Line rewards commit
+        through unit_of_work before this is called, so the checkpoint never runs ahead of them.
+        """
+        with self.lock:
+            conn = self.get_connection()
+            try:
+                self._save_log_checkpoint_tx(conn.cursor(), path, inode, size, offset)
+                conn.commit()
+            finally:
+                conn.close()
+
+    def _save_log_checkpoint_tx(self, cursor, path: str, inode: int, size: int, offset: int):
+        """Upsert a log checkpoint on an open transaction (Internal)"""
+        cursor.execute('''
+            INSERT INTO log_checkpoints (path, inode, size, offset, updated_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(path) DO UPDATE SET
+                inode = excluded.inode, size = excluded.size,
+                offset = excluded.offset, updated_at = excluded.updated_at
+        ''', (path, inode, size, offset))
+
+    async def get_log_checkpoints(self) -> Dict[str, Dict]:
+        """All log checkpoints keyed by path, newest first (Async)"""
+        return await asyncio.to_thread(self._get_log_checkpoints)
+
+    def _get_log_checkpoints(self) -> Dict[str, Dict]:
+        """All log checkpoints (Internal)"""
+        with self.lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM log_checkpoints ORDER BY updated_at DESC")
+            checkpoints = {row['path']: dict(row) for row in cursor.fetchall()}
+            conn.close()
+        return checkpoints
+
+    # --- DELIVERIES ---
+    async def create_delivery(self, steam_id: str, items: List[Tuple[str, str, int]], source: str,
+                              description: str = "", cost: int = 0) -> Optional[Dict]:
+        """
+        Record an order of (kind, item_id, amount) line items, charging `cost`
+        PALDOGS in the same transaction (Async). None if the balance is too low.
+        """
+        return await asyncio.to_thread(self._create_delivery, steam_id, items, source, description, cost)
+
+    def _create_delivery(self, steam_id: str, items: List[Tuple[str, str, int]], source: str,
+                         description: str = "", cost: int = 0) -> Optional[Dict]:
+        """Charge and record an order atomically (Internal)"""
+        with self.lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            try:
+                balance = None
+                if cost:
+                    # Balance check below reads the table directly
+                    self.write_queue.flush()
+                    cursor.execute("SELECT palmarks FROM players WHERE steam_id = ?", (steam_id,))
+                    row = cursor.fetchone()
+                    if not row or row['palmarks'] < cost:
+                        return None
+                    balance = row['palmarks'] - cost
+                    cursor.execute("UPDATE players SET palmarks = palmarks - ? WHERE steam_id = ?", (cost, steam_id))
+                    cursor.execute('''
+                        INSERT INTO reward_history (steam_id, reward_type, amount, description)
+                        VALUES (?, 'purchase', ?, ?)
+                    ''', (steam_id, -cost, description))
+
+                cursor.execute(
+                    "INSERT INTO deliveries (steam_id, source, description, cost) VALUES (?, ?, ?, ?)",
+                    (steam_id, source, description, cost)
+                )
+                delivery_id = cursor.lastrowid
+                lines = []
+                for kind, item_id, amount in items:
+                    cursor.execute('''
+                        INSERT INTO delivery_items (delivery_id, steam_id, kind, item_id, amount, status)
+                        VALUES (?, ?, ?, ?, ?, 'sending')
+                    ''', (delivery_id, steam_id, kind, item_id, amount))
+                    lines.append({'id': cursor.lastrowid, 'delivery_id': delivery_id, 'steam_id': steam_id,
+                                  'kind': kind, 'item_id': item_id, 'amount': amount, 'status': 'sending',
+                                  'attempts': 0})
+                conn.commit()
+                if cost:
+                    self.cache.adjust(steam_id, 'palmarks', -cost)
+                    self.leaderboards.adjust('palmarks', steam_id, -cost)
+                return {'id': delivery_id, 'items': lines, 'balance': balance}
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+
+    async def update_delivery_items(self, results: List[Tuple[int, str, Optional[str]]]):
+        """Record attempt outcomes as (item row id, status, error) (Async)"""
+        await asyncio.to_thread(self._update_delivery_items, results)
+
+    def _update_delivery_items(self, results: List[Tuple[int, str, Optional[str]]]):
+        """Record attempt outcomes (Internal)"""
+        with self.lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.executemany('''
+                UPDATE delivery_items
+                SET status = ?, last_error = ?, attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', [(status, error, item_row_id) for item_row_id, status, error in results])
+            conn.commit()
+            conn.close()
+
+    async def get_pending_delivery_items(self, steam_id: str = None) -> List[Dict]:
+        """Undelivered line items, oldest first, for one player or everyone (Async)"""
+        return await asyncio.to_thread(self._get_pending_delivery_items, steam_id)
+
+    def _get_pending_delivery_items(self, steam_id: str = None) -> List[Dict]:
+        """Undelivered line items (Internal)"""
+        with self.lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            query = "SELECT * FROM delivery_items WHERE status = 'pending'"
+            params = ()
+            if steam_id:
+                query += " AND steam_id = ?"
+                params = (steam_id,)
+            cursor.execute(query + " ORDER BY id", params)
+            rows = [dict(row) for row in cursor.fetchall()]
+            conn.close()
+        return rows
+
+    async def claim_pending_delivery_items(self, steam_id: str) -> List[Dict]:
+        """Mark a player's pending line items as 'sending' and return the ones this call took (Async)"""
+        return await asyncio.to_thread(self._claim_pending_delivery_items, steam_id)
+
+    def _claim_pending_delivery_items(self, steam_id: str) -> List[Dict]:
+        """
+        Conditional pending -> sending update per line; a line another sender already
+        took doesn't match and isn't returned, so nothing is given twice (Internal)
+        """
+        with self.lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            try:
+                cursor.execute(
+                    "SELECT * FROM delivery_items WHERE status = 'pending' AND steam_id = ? ORDER BY id",
+                    (steam_id,)
+                )
+                claimed = []
+                for row in cursor.fetchall():
+                    cursor.execute('''
+                        UPDATE delivery_items SET status = 'sending', updated_at = CURRENT_TIMESTAMP
+                        WHERE id = ? AND status = 'pending'
+                    ''', (row['id'],))
+                    if cursor.rowcount == 1:
+                        claimed.append(dict(row, status='sending'))
+                conn.commit()
+                return claimed
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+
+    def _reset_interrupted_deliveries(self):
+        """Lines left 'sending' by a crash go back to pending (startup only)"""
+        with self.lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute("UPDATE delivery_items SET status = 'pending' WHERE status = 'sending'")
+            if cursor.rowcount:
+                print(f"📦 [DATABASE] {cursor.rowcount} interrupted delivery item(s) queued for retry")
+            conn.commit()
+            conn.close()
+
+    async def save_scheduled_job(self, job: Dict):
+        """Insert or replace a scheduler job (Async)"""
+        await asyncio.to_thread(self._save_scheduled_job, job)
+
+    def _save_scheduled_job(self, job: Dict):
+        """Insert or replace a scheduler job (Internal)"""
+        with self.lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO scheduled_jobs (id, kind, run_at, schedule, payload, grace)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (job['id'], job['kind'], job['run_at'], job.get('schedule'),
+                  json.dumps(job.get('payload') or {}), job.get('grace')))
+            conn.commit()
+            conn.close()
+
+    async def delete_scheduled_jobs(self, job_ids: List[str]):
+        """Remove scheduler jobs by id (Async)"""
+        await asyncio.to_thread(self._delete_scheduled_jobs, job_ids)
+
+    def _delete_scheduled_jobs(self, job_ids: List[str]):
+        """Remove scheduler jobs (Internal)"""
+        with self.lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.executemany("DELETE FROM scheduled_jobs WHERE id = ?", [(job_id,) for job_id in job_ids])
+            conn.commit()
+            conn.close()
+
+    async def get_scheduled_jobs(self) -> List[Dict]:
+        """All persisted scheduler jobs (Async)"""
+        return await asyncio.to_thread(self._get_scheduled_jobs)
+
+    def _get_scheduled_jobs(self) -> List[Dict]:
+        """All persisted scheduler jobs, soonest first (Internal)"""
+        with self.lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, kind, run_at, schedule, payload, grace FROM scheduled_jobs ORDER BY run_at")
+            rows = [dict(row) for row in cursor.fetchall()]
+            conn.close()
+        for row in rows:
+            row['payload'] = json.loads(row['payload'] or '{}')
+        return rows
+
     async def get_server_stats(self) -> Dict:
         """Get overall server statistics (PALDOGS dashboard) (Async)"""
         return await asyncio.to_thread(self._get_server_stats)
@@ -518,51 +1460,93 @@ class PlayerStatsDB:
         count = cursor.fetchone()['count']
         conn.close()
         return count
-    
+
+    async def get_dashboard_snapshot(self, online_ids: List[str], leaderboard_limit: int = 10,
+                                     activity_limit: int = 3) -> Dict:
+        """Everything the live stats dashboard shows, in one round trip (Async)"""
+        return await asyncio.to_thread(self._get_dashboard_snapshot, online_ids, leaderboard_limit, activity_limit)
+
+    def _get_dashboard_snapshot(self, online_ids: List[str], leaderboard_limit: int = 10,
+                                activity_limit: int = 3) -> Dict:
+        """
+        PALDOGS leaderboard (with levels) from the in-memory boards, ranks of the
+        online players (cache first, the rest in one IN query), player count and
+        recent rewards (Internal)
+        """
+        leaderboard = self._get_leaderboard('palmarks', leaderboard_limit)
+
+        ranks = {}
+        missing = []
+        for steam_id in dict.fromkeys(online_ids):
+            cached = self.cache.get(steam_id)
+            if cached is not None:
+                ranks[steam_id] = cached.get('rank')
+            else:
+                missing.append(steam_id)
+        ranks.update({steam_id: row['rank'] for steam_id, row in self._get_player_rows(missing).items()})
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute('''
+                SELECT p.player_name, r.reward_type, r.description
+                FROM reward_history r
+                JOIN players p ON r.steam_id = p.steam_id
+                ORDER BY r.timestamp DESC LIMIT ?
+            ''', (activity_limit,))
+            activity = [dict(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+        return {
+            'leaderboard': leaderboard,
+            'online_ranks': ranks,
+            'total_players': self.leaderboards.size('palmarks'),
+            'activity': activity
+        }
+
     async def get_leaderboard(self, category: str = 'dogcoin', limit: int = 10) -> List[Dict]:
         """Get leaderboard for specified category (Async)"""
         return await asyncio.to_thread(self._get_leaderboard, category, limit)
 
     def _get_leaderboard(self, category: str = 'dogcoin', limit: int = 10) -> List[Dict]:
-        """Get leaderboard for specified category (Internal)"""
+        """
+        Get leaderboard for specified category (Internal). Order and scores come from
+        the in-memory boards; only the K listed players are looked up, by primary key.
+        """
+        if category not in LEADERBOARD_CATEGORIES:
+            return []
+        top = self.leaderboards.top(category, limit)
+        players = self._get_player_rows([steam_id for steam_id, _ in top])
+        column = LEADERBOARD_CATEGORIES[category][1]
+        return [
+            dict(players[steam_id], **{column: score})
+            for steam_id, score in top if steam_id in players
+        ]
+
+    def _get_player_rows(self, steam_ids: List[str]) -> Dict[str, Dict]:
+        """steam_id -> name, rank and level for a batch of players; rank/level from the cache when present (Internal)"""
+        rows = {}
+        if not steam_ids:
+            return rows
         conn = self.get_connection()
         cursor = conn.cursor()
-        
-        if category == 'palmarks':
-            cursor.execute('''
-                SELECT player_name, palmarks, rank
-                FROM players
-                ORDER BY palmarks DESC
-                LIMIT ?
-            ''', (limit,))
-        elif category == 'playtime':
-            cursor.execute('''
-                SELECT player_name, total_playtime, rank
-                FROM players
-                ORDER BY total_playtime DESC
-                LIMIT ?
-            ''', (limit,))
-        elif category == 'building':
-            cursor.execute('''
-                SELECT p.player_name, a.structures_built, p.rank
-                FROM players p
-                JOIN activity_stats a ON p.steam_id = a.steam_id
-                ORDER BY a.structures_built DESC
-                LIMIT ?
-            ''', (limit,))
-        elif category == 'crafting':
-            cursor.execute('''
-                SELECT p.player_name, a.items_crafted, p.rank
-                FROM players p
-                JOIN activity_stats a ON p.steam_id = a.steam_id
-                ORDER BY a.items_crafted DESC
-                LIMIT ?
-            ''', (limit,))
-        
-        results = cursor.fetchall()
-        conn.close()
-        
-        return [dict(row) for row in results]
+        try:
+            # Chunked to stay under SQLite's bound-parameter limit
+            for start in range(0, len(steam_ids), 500):
+                chunk = steam_ids[start:start + 500]
+                cursor.execute(f'''
+                    SELECT steam_id, player_name, rank, level FROM players
+                    WHERE steam_id IN ({','.join('?' * len(chunk))})
+                ''', chunk)
+                rows.update({row['steam_id']: dict(row) for row in cursor.fetchall()})
+        finally:
+            conn.close()
+        for steam_id, row in rows.items():
+            cached = self.cache.get(steam_id)
+            if cached is not None:
+                row.update({field: cached[field] for field in ('rank', 'level') if cached.get(field) is not None})
+        return rows
     
     async def update_player_rank(self, steam_id: str, new_rank: str):
         """Update player's rank (Async)"""
@@ -582,6 +1566,7 @@ class PlayerStatsDB:
             
             conn.commit()
             conn.close()
+            self.cache.update(steam_id, rank=new_rank)
             print(f"[OK] Updated {steam_id} to rank: {new_rank}")
     
     async def get_player_stats_by_name(self, player_name: str) -> Optional[Dict]:
@@ -589,29 +1574,32 @@ class PlayerStatsDB:
         return await asyncio.to_thread(self._get_player_stats_by_name, player_name)
 
     def _get_player_stats_by_name(self, player_name: str) -> Optional[Dict]:
-        """Get player statistics by player name (Internal)"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT p.*, a.*
-            FROM players p
-            LEFT JOIN activity_stats a ON p.steam_id = a.steam_id
-            WHERE p.player_name = ? COLLATE NOCASE
-            ORDER BY p.last_seen DESC
-            LIMIT 1
-        ''', (player_name,))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
-            return dict(result)
-        return None
-
-
-
+        """
+        Get player statistics by player name (Internal). The exact name wins, then a
+        case-insensitive match; an accent-folded match from the name index is only
+        used when neither exists. Ties go to the most recently seen player.
+        """
+        with self.lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT p.*, a.*
+                FROM players p
+                LEFT JOIN activity_stats a ON p.steam_id = a.steam_id
+                WHERE p.player_name = ? COLLATE NOCASE
+                ORDER BY p.player_name = ? DESC, p.last_seen DESC
+                LIMIT 1
+            ''', (player_name, player_name))
+            
+            result = cursor.fetchone()
+            conn.close()
+            
+            if result:
+                return self.write_queue.overlay(dict(result))
 
+        matches = self.names.exact(player_name)
+        return self._get_player_stats(matches[0]) if matches else None
 
     async def transfer_paldogs(self, sender_steam_id: str, receiver_steam_id: str, amount: int) -> bool:
         """Transfer Paldogs from one player to another (Async)"""
@@ -620,6 +1608,8 @@ class PlayerStatsDB:
     def _transfer_paldogs(self, sender_steam_id: str, receiver_steam_id: str, amount: int) -> bool:
         """Transfer Paldogs from one player to another (Internal)"""
         with self.lock:
+            # Balance check below reads the table directly
+            self.write_queue.flush()
             conn = self.get_connection()
             cursor = conn.cursor()
             
@@ -656,6 +1646,10 @@ class PlayerStatsDB:
                 ''', (receiver_steam_id, amount, f"Transfer from {sender['player_name']}"))
                 
                 conn.commit()
+                self.cache.adjust(sender_steam_id, 'palmarks', -amount)
+                self.cache.adjust(receiver_steam_id, 'palmarks', amount)
+                self.leaderboards.adjust('palmarks', sender_steam_id, -amount)
+                self.leaderboards.adjust('palmarks', receiver_steam_id, amount)
                 return True
             except Exception as e:
                 print(f"[ERROR] Transfer error: {e}")
@@ -664,21 +1658,17 @@ class PlayerStatsDB:
             finally:
                 conn.close()
 
-    async def get_player_names_autocomplete(self, current: str) -> List[str]:
+    async def get_player_names_autocomplete(self, current: str, online_first: bool = True) -> List[str]:
         """Get player names for autocomplete (Async)"""
-        return await asyncio.to_thread(self._get_player_names_autocomplete, current)
+        return await asyncio.to_thread(self._get_player_names_autocomplete, current, online_first)
 
-    def _get_player_names_autocomplete(self, current: str) -> List[str]:
-        """Get player names for autocomplete (Internal)"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT player_name FROM players WHERE player_name LIKE ? LIMIT 25",
-            (f"%{current}%",)
-        )
-        results = cursor.fetchall()
-        conn.close()
-        return [row['player_name'] for row in results]
+    def _get_player_names_autocomplete(self, current: str, online_first: bool = True) -> List[str]:
+        """
+        Get player names for autocomplete from the name index (Internal): exact, prefix,
+        word-prefix, then substring matches, online players first when online_first is set
+        """
+        online = self.cache.online_ids() if online_first else set()
+        return [name for _, name in self.names.search(current, limit=25, online=online)]
 
     async def reset_all_progression(self):
         """Reset ALL player ranks and PalMarks to start over (Async)"""
@@ -687,6 +1677,8 @@ class PlayerStatsDB:
     def _reset_all_progression(self):
         """Reset ALL player ranks and PalMarks to start over (Internal)"""
         with self.lock:
+            # Land queued rewards first so they don't reappear after the reset
+            self.write_queue.flush()
             conn = self.get_connection()
             cursor = conn.cursor()
             
@@ -704,6 +1696,9 @@ class PlayerStatsDB:
             
             conn.commit()
             conn.close()
+            self.cache.invalidate()
+            self.leaderboards.reset('palmarks', self.leaderboards.players('palmarks'))
+            self.leaderboards.reset('daily')
             print("🚨 [DATABASE] ALL PLAYER PROGRESSION RESET (PALDOGS=0, Rank=Trainer, Level=1, EXP=0)")
 
     async def update_active_announcer(self, steam_id: str, announcer_id: str):
@@ -718,6 +1713,7 @@ class PlayerStatsDB:
             cursor.execute("UPDATE players SET active_announcer = ? WHERE steam_id = ?", (announcer_id, steam_id))
             conn.commit()
             conn.close()
+            self.cache.update(steam_id, active_announcer=announcer_id)
 
     async def add_experience(self, steam_id: str, amount: int):
         """Add experience to player and handle leveling (Async)"""
@@ -728,33 +1724,48 @@ class PlayerStatsDB:
         with self.lock:
             conn = self.get_connection()
             cursor = conn.cursor()
-            
-            # 1. Add EXP
-            cursor.execute("UPDATE players SET experience = experience + ? WHERE steam_id = ?", (amount, steam_id))
-            
-            # 2. Check for level up
+            result = self._add_experience_tx(cursor, steam_id, amount)
+            conn.commit()
+            conn.close()
+            return result
+
+    def _add_experience_tx(self, cursor, steam_id: str, amount: int, current: Tuple[int, int] = None) -> Tuple[bool, int]:
+        """
+        EXP + level-up on an open cursor (caller commits).
+        current=(experience, level) before this call skips the read-back when the caller already knows it.
+        """
+        # 1. Add EXP
+        cursor.execute("UPDATE players SET experience = experience + ? WHERE steam_id = ?", (amount, steam_id))
+        
+        # 2. Check for level up
+        if current is not None:
+            current_exp, current_level = current[0] + amount, current[1]
+        else:
             cursor.execute("SELECT experience, level FROM players WHERE steam_id = ?", (steam_id,))
             row = cursor.fetchone()
             if not row:
-                conn.close()
                 return False, 0
-            
             current_exp = row['experience']
             current_level = row['level']
-            
-            # Simple level formula: level * level * 100
-            new_level = current_level
-            while current_exp >= (new_level * new_level * 100):
-                new_level += 1
-            
-            leveled_up = False
-            if new_level > current_level:
-                cursor.execute("UPDATE players SET level = ? WHERE steam_id = ?", (new_level, steam_id))
-                leveled_up = True
-            
-            conn.commit()
-            conn.close()
-            return leveled_up, new_level
+        
+        new_level = self.level_for_experience(current_exp, current_level)
+        
+        leveled_up = False
+        if new_level > current_level:
+            cursor.execute("UPDATE players SET level = ? WHERE steam_id = ?", (new_level, steam_id))
+            leveled_up = True
+        
+        self.cache.update(steam_id, experience=current_exp, level=new_level)
+        return leveled_up, new_level
+
+    @staticmethod
+    def level_for_experience(experience: int, current_level: int = 1) -> int:
+        """Level reached with this much EXP (levels never go down)"""
+        # Simple level formula: level * level * 100
+        new_level = current_level
+        while experience >= (new_level * new_level * 100):
+            new_level += 1
+        return new_level
 
     async def add_to_inventory(self, steam_id: str, item_id: str, amount: int = 1, source: str = "Reward", type: str = "item"):
         """Add item to player's virtual inventory (Async)"""
@@ -765,13 +1776,6 @@ class PlayerStatsDB:
         with self.lock:
             conn = self.get_connection()
             cursor = conn.cursor()
-            
-            # Check if column exists (for migration)
-            cursor.execute("PRAGMA table_info(player_inventory)")
-            columns = [c[1] for c in cursor.fetchall()]
-            if 'type' not in columns:
-                cursor.execute("ALTER TABLE player_inventory ADD COLUMN type TEXT DEFAULT 'item'")
-
             cursor.execute(
                 "INSERT INTO player_inventory (steam_id, item_id, amount, source, type) VALUES (?, ?, ?, ?, ?)",
                 (steam_id, item_id, amount, source, type)
@@ -861,6 +1865,10 @@ class PlayerStatsDB:
             
             conn.commit()
             conn.close()
+            self.cache.invalidate()
+            steam_ids = [row[0] for row in all_players]
+            self.leaderboards.shift_all('palmarks', amount, steam_ids)
+            self.leaderboards.shift_all('daily', amount, steam_ids)
             print(f"💰 [DATABASE] GAVE {amount} PALDOGS TO ALL {len(all_players)} PLAYERS")
 
     async def get_daily_usage(self, steam_id: str, column: str) -> int:
@@ -884,15 +1892,8 @@ class PlayerStatsDB:
 
     async def get_wheel_level(self, steam_id: str) -> int:
         """Get player's current wheel progressive level"""
-        return await asyncio.to_thread(self._get_wheel_level, steam_id)
-
-    def _get_wheel_level(self, steam_id: str) -> int:
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT wheel_level FROM players WHERE steam_id = ?", (steam_id,))
-        result = cursor.fetchone()
-        conn.close()
-        return result['wheel_level'] if result else 0
+        state = await self.get_player_state(steam_id)
+        return (state.get('wheel_level') or 0) if state else 0
 
     async def increment_wheel_level(self, steam_id: str):
         """Increment player's wheel progressive level"""
@@ -905,6 +1906,7 @@ class PlayerStatsDB:
             cursor.execute("UPDATE players SET wheel_level = wheel_level + 1 WHERE steam_id = ?", (steam_id,))
             conn.commit()
             conn.close()
+            self.cache.adjust(steam_id, 'wheel_level', 1)
 
     async def reset_wheel_level(self, steam_id: str):
         """Reset player's wheel progressive level"""
@@ -917,18 +1919,12 @@ class PlayerStatsDB:
             cursor.execute("UPDATE players SET wheel_level = 0 WHERE steam_id = ?", (steam_id,))
             conn.commit()
             conn.close()
+            self.cache.update(steam_id, wheel_level=0)
     
     async def get_chest_level(self, steam_id: str) -> int:
         """Get player's current chest progressive level"""
-        return await asyncio.to_thread(self._get_chest_level, steam_id)
-
-    def _get_chest_level(self, steam_id: str) -> int:
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT chest_level FROM players WHERE steam_id = ?", (steam_id,))
-        result = cursor.fetchone()
-        conn.close()
-        return result['chest_level'] if result else 0
+        state = await self.get_player_state(steam_id)
+        return (state.get('chest_level') or 0) if state else 0
 
     async def increment_chest_level(self, steam_id: str):
         """Increment player's chest progressive level"""
@@ -941,6 +1937,7 @@ class PlayerStatsDB:
             cursor.execute("UPDATE players SET chest_level = chest_level + 1 WHERE steam_id = ?", (steam_id,))
             conn.commit()
             conn.close()
+            self.cache.adjust(steam_id, 'chest_level', 1)
 
     async def reset_chest_level(self, steam_id: str):
         """Reset player's chest progressive level"""
@@ -953,6 +1950,7 @@ class PlayerStatsDB:
             cursor.execute("UPDATE players SET chest_level = 0 WHERE steam_id = ?", (steam_id,))
             conn.commit()
             conn.close()
+            self.cache.update(steam_id, chest_level=0)
 
     async def increment_daily_usage(self, steam_id: str, column: str):
         """Increment daily usage count (Async)"""
@@ -0,0 +1,150 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.config_manager import config
+from utils.database import db
+from utils.rcon_utility import rcon_util
+
+
+class DeliveryEngine:
+    """
+    Delivers multi-item orders (kits, chest rewards, giveaway prizes) over RCON.
+
+    Every line item is written to SQLite before anything is sent, so a paid
+    order can't be lost: all `give` commands of an order are submitted at
+    once and pipelined through the RCON scheduler, each line's outcome is
+    recorded, and lines that failed stay pending and are re-sent the next
+    time the player is seen online (up to delivery_max_attempts). Lines
+    are 'sending' while a give is in flight (new orders start that way,
+    retries claim pending lines with a conditional update), so an order
+    being sent is never picked up by a retry as well.
+    """
+
+    def __init__(self):
+        self.retrying: Dict[str, asyncio.Task] = {}
+        # steam_id -> monotonic time before which we don't retry again
+        self.next_retry: Dict[str, float] = {}
+        self.counters = {'orders': 0, 'delivered': 0, 'retried': 0, 'pending': 0, 'failed': 0}
+
+    @property
+    def max_attempts(self) -> int:
+        return max(1, int(config.get('delivery_max_attempts', 5)))
+
+    @property
+    def retry_delay(self) -> float:
+        return float(config.get('delivery_retry_delay', 30))
+
+    @staticmethod
+    def kit_items(kit: Dict) -> List[Tuple[str, str, int]]:
+        """Line items for a kit definition"""
+        return [('item', item_id, amount) for item_id, amount in kit.get('items', {}).items()]
+
+    async def deliver(self, steam_id: str, items: List[Tuple[str, str, int]], source: str,
+                      description: str = "", cost: int = 0,
+                      priority: int = rcon_util.PRIORITY_DELIVERY) -> Optional[Dict]:
+        """
+        Record, charge (if cost) and send an order of (kind, item_id, amount)
+        items; kind is 'item', 'exp' or 'pal'. Returns None when the balance is
+        too low, otherwise {'id', 'balance', 'delivered', 'pending', 'failed'}
+        where each list holds the line items with their last 'response'.
+        """
+        order = await db.create_delivery(steam_id, items, source, description, cost)
+        if order is None:
+            return None
+        self.counters['orders'] += 1
+        outcome = await self._send(steam_id, order['items'], priority)
+        outcome['id'] = order['id']
+        outcome['balance'] = order['balance']
+        if outcome['pending']:
+            self.next_retry.pop(steam_id, None)
+            print(f"⏳ Delivery #{order['id']} to {steam_id}: {len(outcome['pending'])} item(s) queued for retry")
+        return outcome
+
+    async def _send(self, steam_id: str, lines: List[Dict], priority: int) -> Dict:
+        """Pipeline one give per line, then record every outcome in one write"""
+        if not lines:
+            return {'delivered': [], 'pending': [], 'failed': []}
+        responses = await asyncio.gather(*(self._give(steam_id, line, priority) for line in lines),
+                                         return_exceptions=True)
+
+        outcome = {'delivered': [], 'pending': [], 'failed': []}
+        updates = []
+        for line, result in zip(lines, responses):
+            if isinstance(result, Exception):
+                result = (False, str(result))
+            success, response = result
+            line = dict(line, response=response)
+            if success:
+                status = 'delivered'
+            elif line.get('attempts', 0) + 1 >= self.max_attempts:
+                status = 'failed'
+            else:
+                status = 'pending'
+            outcome[status].append(line)
+            self.counters[status] += 1
+            updates.append((line['id'], status, None if success else str(response)[:200]))
+
+        try:
+            await db.update_delivery_items(updates)
+        except Exception as e:
+            logging.error(f"Error recording delivery results for {steam_id}: {e}")
+        for line in outcome['failed']:
+            logging.warning(f"❌ Giving up on delivery item #{line['id']} ({line['amount']}x {line['item_id']}) "
+                            f"for {steam_id} after {self.max_attempts} attempts: {line['response']}")
+        return outcome
+
+    async def _give(self, steam_id: str, line: Dict, priority: int) -> Tuple[bool, str]:
+        kind = line['kind']
+        if kind == 'exp':
+            return await rcon_util.give_exp(steam_id, line['amount'], priority)
+        if kind == 'pal':
+            return await rcon_util.give_pal_template(steam_id, line['item_id'], priority)
+        return await rcon_util.give_item(steam_id, line['item_id'], line['amount'], priority)
+
+    # --- Retries ---
+    def player_online(self, steam_id: str):
+        """Player was seen online: re-send anything still pending for them (after a short settle delay)"""
+        if not steam_id or not rcon_util.is_configured():
+            return
+        task = self.retrying.get(steam_id)
+        if task and not task.done():
+            return
+        if time.monotonic() < self.next_retry.get(steam_id, 0):
+            return
+        self.retrying[steam_id] = asyncio.create_task(self._retry_player(steam_id))
+
+    def players_online(self, steam_ids: Iterable[str]):
+        for steam_id in steam_ids:
+            self.player_online(steam_id)
+
+    async def _retry_player(self, steam_id: str):
+        try:
+            if not await db.get_pending_delivery_items(steam_id):
+                # Nothing owed: don't hit the database again for a while
+                self.next_retry[steam_id] = time.monotonic() + self.retry_delay * 10
+                return
+            # Give the player time to finish loading in before sending
+            await asyncio.sleep(self.retry_delay)
+            # Re-read after the wait and take only lines nobody else is sending
+            lines = await db.claim_pending_delivery_items(steam_id)
+            if not lines:
+                self.next_retry[steam_id] = time.monotonic() + self.retry_delay
+                return
+            self.counters['retried'] += len(lines)
+            outcome = await self._send(steam_id, lines, rcon_util.PRIORITY_DELIVERY)
+            self.next_retry[steam_id] = time.monotonic() + self.retry_delay
+            if outcome['delivered']:
+                print(f"📦 Re-delivered {len(outcome['delivered'])} pending item(s) to {steam_id}")
+        except Exception as e:
+            logging.error(f"Error retrying deliveries for {steam_id}: {e}")
+        finally:
+            self.retrying.pop(steam_id, None)
+
+    def stats(self) -> Dict:
+        return {**self.counters, 'retrying_players': len(self.retrying)}
+
+
+# Global instance
+delivery_engine = DeliveryEngine()
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Type
+
+
+class Event:
+    """Base class for everything published on the bus"""
+
+    def __init__(self):
+        self.timestamp = time.time()
+
+    def __repr__(self):
+        fields = ', '.join(f"{k}={v!r}" for k, v in vars(self).items() if k != 'timestamp')
+        return f"{type(self).__name__}({fields})"
+
+
+class ServerStateChanged(Event):
+    """
+    The server moved between OFFLINE / STARTING / ONLINE / STOPPING.
+    source is 'probe' when the lifecycle service detected it, 'initial' for
+    the state found at bot start, 'command' when start_server / stop_server
+    (a user or a schedule) caused it.
+    """
+
+    def __init__(self, old_state, new_state, source: str = 'command'):
+        super().__init__()
+        self.old_state = old_state
+        self.new_state = new_state
+        self.source = source
+
+
+class ServerResponsivenessChanged(Event):
+    """The REST API started or stopped answering while the process runs"""
+
+    def __init__(self, responsive: bool):
+        super().__init__()
+        self.responsive = responsive
+
+
+class ServerProbed(Event):
+    """Result of one lifecycle probe (published after every probe)"""
+
+    def __init__(self, state, process_running: bool, responsive):
+        super().__init__()
+        self.state = state
+        self.process_running = process_running
+        self.responsive = responsive
+
+
+class ConfigChanged(Event):
+    """A setting was changed at runtime (config.set)"""
+
+    def __init__(self, key: str, value):
+        super().__init__()
+        self.key = key
+        self.value = value
+
+
+class EventBus:
+    """
+    In-process async publish/subscribe.
+
+    Handlers are registered per event class (subclasses are delivered to
+    handlers of their base classes too) and each handler runs as its own
+    task, so a slow or failing subscriber can't hold up the publisher or
+    the other subscribers.
+    """
+
+    def __init__(self):
+        self.handlers: Dict[Type[Event], List[Callable[[Event], Awaitable[None]]]] = {}
+        self.counters = {'published': 0, 'delivered': 0, 'errors': 0}
+
+    def subscribe(self, event_type: Type[Event], handler: Callable[[Event], Awaitable[None]]):
+        handlers = self.handlers.setdefault(event_type, [])
+        if handler not in handlers:
+            handlers.append(handler)
+
+    def unsubscribe(self, event_type: Type[Event], handler):
+        handlers = self.handlers.get(event_type, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
+    def publish(self, event: Event) -> List[asyncio.Task]:
+        """Schedule every matching handler; returns the tasks (await them to wait for delivery)"""
+        self.counters['published'] += 1
+        tasks = []
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return tasks  # Published from sync code outside the bot loop: nobody to deliver to
+        for event_type in type(event).__mro__:
+            for handler in list(self.handlers.get(event_type, ())):
+                tasks.append(asyncio.create_task(self._deliver(handler, event)))
+        return tasks
+
+    async def _deliver(self, handler, event: Event):
+        try:
+            await handler(event)
+            self.counters['delivered'] += 1
+        except Exception as e:
+            self.counters['errors'] += 1
+            logging.error(f"Error in {type(event).__name__} handler {getattr(handler, '__qualname__', handler)}: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            'subscriptions': sum(len(h) for h in self.handlers.values()),
+            **self.counters
+        }
+
+
+# Global instance
+event_bus = EventBus()
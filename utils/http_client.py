@@ -0,0 +1,105 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import aiohttp
+import nextcord
+
+from utils.config_manager import config
+
+
+class HttpClient:
+    """
+    The bot's one outgoing HTTP client (REST API, chat relay webhooks).
+
+    A single ClientSession on a tuned TCPConnector: connections to the
+    Palworld REST API and to Discord's webhook endpoint are kept alive and
+    reused instead of a new TCP (and TLS) handshake per request, per-host
+    limits stop a burst from opening dozens of sockets, and DNS lookups are
+    cached. Webhook objects are built once per URL and reused.
+    """
+
+    MAX_WEBHOOKS = 16
+
+    def __init__(self):
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.webhooks: "OrderedDict[str, nextcord.Webhook]" = OrderedDict()
+        self._lock: Optional[asyncio.Lock] = None
+        self.counters = {'sessions': 0, 'connections': 0, 'reused': 0}
+
+    def _make_connector(self) -> aiohttp.TCPConnector:
+        return aiohttp.TCPConnector(
+            limit=int(config.get('http_pool_limit', 50)),
+            limit_per_host=int(config.get('http_pool_limit_per_host', 10)),
+            ttl_dns_cache=int(config.get('http_dns_cache_ttl', 300)),
+            use_dns_cache=True,
+            keepalive_timeout=float(config.get('http_keepalive_timeout', 30))
+        )
+
+    def _make_trace(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_create(session, ctx, params):
+            self.counters['connections'] += 1
+
+        async def on_reuse(session, ctx, params):
+            self.counters['reused'] += 1
+
+        trace.on_connection_create_end.append(on_create)
+        trace.on_connection_reuseconn.append(on_reuse)
+        return trace
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """The shared session, created on first use (or after close)"""
+        if self.session and not self.session.closed:
+            return self.session
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.session is None or self.session.closed:
+                self.session = aiohttp.ClientSession(
+                    connector=self._make_connector(),
+                    timeout=aiohttp.ClientTimeout(total=float(config.get('http_timeout', 15))),
+                    trace_configs=[self._make_trace()]
+                )
+                # Webhooks hold a reference to the session they were built with
+                self.webhooks.clear()
+                self.counters['sessions'] += 1
+        return self.session
+
+    async def webhook(self, url: str) -> nextcord.Webhook:
+        """Webhook for a URL, bound to the shared session and reused across messages"""
+        session = await self.get_session()
+        webhook = self.webhooks.get(url)
+        if webhook is None:
+            webhook = nextcord.Webhook.from_url(url, session=session)
+            self.webhooks[url] = webhook
+            if len(self.webhooks) > self.MAX_WEBHOOKS:
+                self.webhooks.popitem(last=False)
+        else:
+            self.webhooks.move_to_end(url)
+        return webhook
+
+    async def close(self):
+        """Close the session and its pooled connections (bot shutdown)"""
+        self.webhooks.clear()
+        if self.session and not self.session.closed:
+            try:
+                await self.session.close()
+                # Let pooled TLS transports finish closing before the loop stops
+                await asyncio.sleep(0.25)
+            except Exception as e:
+                logging.error(f"Error closing HTTP session: {e}")
+        self.session = None
+
+    def stats(self) -> Dict:
+        return {
+            'open': bool(self.session and not self.session.closed),
+            'webhooks': len(self.webhooks),
+            **self.counters
+        }
+
+
+# Global instance
+http_client = HttpClient()
@@ -0,0 +1,220 @@
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Category -> (table, column) the scores mirror
+CATEGORIES = {
+    'palmarks': ('players', 'palmarks'),
+    'playtime': ('players', 'total_playtime'),
+    'building': ('activity_stats', 'structures_built'),
+    'crafting': ('activity_stats', 'items_crafted'),
+    'daily': ('daily_stats', 'palmarks_earned'),  # Today's rows only
+}
+
+
+class RankedScores:
+    """
+    Every player's score for one category, kept in descending order.
+
+    Entries are (-score, steam_id) keys in a list of sorted chunks of at most
+    2 * LOAD entries: an update is two bisects (O(log n)) plus a shift inside
+    one small chunk, and the top K is read off the front in O(K). `offset`
+    is added to every stored score, so "everyone gets +N" is O(1).
+    """
+
+    LOAD = 256
+
+    def __init__(self):
+        self.scores: Dict[str, int] = {}  # steam_id -> stored score (true score - offset)
+        self.offset = 0
+        self._chunks: List[List[Tuple[int, str]]] = []
+        self._maxes: List[Tuple[int, str]] = []
+
+    def __len__(self):
+        return len(self.scores)
+
+    def __contains__(self, steam_id: str):
+        return steam_id in self.scores
+
+    def load(self, rows: Iterable[Tuple[str, int]]):
+        """Replace everything with (steam_id, score) rows"""
+        self.offset = 0
+        self.scores = {steam_id: score or 0 for steam_id, score in rows}
+        keys = sorted((-score, steam_id) for steam_id, score in self.scores.items())
+        self._chunks = [keys[i:i + self.LOAD] for i in range(0, len(keys), self.LOAD)]
+        self._maxes = [chunk[-1] for chunk in self._chunks]
+
+    def _insert(self, key: Tuple[int, str]):
+        if not self._chunks:
+            self._chunks.append([key])
+            self._maxes.append(key)
+            return
+        i = min(bisect_left(self._maxes, key), len(self._chunks) - 1)
+        chunk = self._chunks[i]
+        insort(chunk, key)
+        self._maxes[i] = chunk[-1]
+        if len(chunk) > 2 * self.LOAD:
+            self._chunks[i:i + 1] = [chunk[:self.LOAD], chunk[self.LOAD:]]
+            self._maxes[i:i + 1] = [self._chunks[i][-1], self._chunks[i + 1][-1]]
+
+    def _remove(self, key: Tuple[int, str]):
+        i = bisect_left(self._maxes, key)
+        chunk = self._chunks[i]
+        del chunk[bisect_left(chunk, key)]
+        if chunk:
+            self._maxes[i] = chunk[-1]
+        else:
+            del self._chunks[i]
+            del self._maxes[i]
+
+    def get(self, steam_id: str) -> Optional[int]:
+        stored = self.scores.get(steam_id)
+        return None if stored is None else stored + self.offset
+
+    def set(self, steam_id: str, score: int):
+        stored = (score or 0) - self.offset
+        old = self.scores.get(steam_id)
+        if old == stored:
+            return
+        if old is not None:
+            self._remove((-old, steam_id))
+        self.scores[steam_id] = stored
+        self._insert((-stored, steam_id))
+
+    def adjust(self, steam_id: str, delta: int):
+        self.set(steam_id, (self.get(steam_id) or 0) + delta)
+
+    def discard(self, steam_id: str):
+        old = self.scores.pop(steam_id, None)
+        if old is not None:
+            self._remove((-old, steam_id))
+
+    def shift(self, delta: int):
+        """Add delta to every score (order doesn't change)"""
+        self.offset += delta
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        """[(steam_id, score)] of the k highest scores (ties by steam_id)"""
+        result = []
+        for chunk in self._chunks:
+            for neg_score, steam_id in chunk:
+                if len(result) >= k:
+                    return result
+                result.append((steam_id, -neg_score + self.offset))
+        return result
+
+
+class Leaderboards:
+    """
+    Materialized leaderboards for every category in CATEGORIES.
+
+    Loaded from SQL once when the database opens; after that the
+    PlayerStatsDB methods (and the write-behind queue) that change a ranked
+    column update the matching board in the same call, so reading a
+    leaderboard never sorts a table. The daily board only holds today's
+    earnings and starts empty at midnight.
+    """
+
+    def __init__(self):
+        self.boards: Dict[str, RankedScores] = {name: RankedScores() for name in CATEGORIES}
+        self.lock = threading.Lock()
+        self.daily_date = datetime.now().date().isoformat()
+        self.counters = {'updates': 0, 'reads': 0}
+
+    def load(self, cursor):
+        """Build every board from the database (startup only)"""
+        today = datetime.now().date().isoformat()
+        cursor.execute("SELECT steam_id, palmarks, total_playtime FROM players")
+        players = cursor.fetchall()
+        cursor.execute("SELECT steam_id, structures_built, items_crafted FROM activity_stats")
+        activity = cursor.fetchall()
+        cursor.execute("SELECT steam_id, palmarks_earned FROM daily_stats WHERE date = ?", (today,))
+        daily = cursor.fetchall()
+        with self.lock:
+            self.boards['palmarks'].load((row[0], row[1]) for row in players)
+            self.boards['playtime'].load((row[0], row[2]) for row in players)
+            self.boards['building'].load((row[0], row[1]) for row in activity)
+            self.boards['crafting'].load((row[0], row[2]) for row in activity)
+            self.boards['daily'].load((row[0], row[1]) for row in daily)
+            self.daily_date = today
+
+    def _roll_daily(self):
+        # Caller holds the lock
+        today = datetime.now().date().isoformat()
+        if today != self.daily_date:
+            self.boards['daily'].load(())
+            self.daily_date = today
+
+    def ensure_player(self, steam_id: str):
+        """A new player starts at 0 on the all-time boards"""
+        with self.lock:
+            for name in ('palmarks', 'playtime', 'building', 'crafting'):
+                if steam_id not in self.boards[name]:
+                    self.boards[name].set(steam_id, 0)
+
+    def adjust(self, category: str, steam_id: str, delta: int):
+        if not delta or category not in self.boards:
+            return
+        with self.lock:
+            if category == 'daily':
+                self._roll_daily()
+            self.boards[category].adjust(steam_id, delta)
+            self.counters['updates'] += 1
+
+    def earn(self, steam_id: str, amount: int):
+        """PALDOGS change that is also recorded in today's daily stats"""
+        self.adjust('palmarks', steam_id, amount)
+        self.adjust('daily', steam_id, amount)
+
+    def set_scores(self, steam_id: str, scores: Dict[str, int]):
+        """Absolute values for one player, e.g. re-read after a rolled back transaction"""
+        with self.lock:
+            self._roll_daily()
+            for category, score in scores.items():
+                if score is None:
+                    self.boards[category].discard(steam_id)
+                else:
+                    self.boards[category].set(steam_id, score)
+
+    def shift_all(self, category: str, delta: int, players: Iterable[str] = ()):
+        """Add delta to everyone on a board; `players` are added first if missing"""
+        with self.lock:
+            if category == 'daily':
+                self._roll_daily()
+            board = self.boards[category]
+            for steam_id in players:
+                if steam_id not in board:
+                    board.set(steam_id, 0)
+            board.shift(delta)
+
+    def reset(self, category: str, players: Iterable[str] = ()):
+        """Everyone in `players` back to 0, everyone else removed"""
+        with self.lock:
+            self.boards[category].load((steam_id, 0) for steam_id in players)
+
+    def size(self, category: str = 'palmarks') -> int:
+        with self.lock:
+            return len(self.boards[category])
+
+    def players(self, category: str = 'palmarks') -> List[str]:
+        with self.lock:
+            return list(self.boards[category].scores)
+
+    def top(self, category: str, k: int = 10) -> List[Tuple[str, int]]:
+        with self.lock:
+            if category == 'daily':
+                self._roll_daily()
+            self.counters['reads'] += 1
+            return self.boards[category].top(k)
+
+    def score(self, category: str, steam_id: str) -> Optional[int]:
+        with self.lock:
+            return self.boards[category].get(steam_id)
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                **{name: len(board) for name, board in self.boards.items()},
+                **self.counters
+            }
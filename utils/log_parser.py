@@ -1,28 +1,189 @@
 import re
 import os
+import hashlib
+import asyncio
+from collections import deque
 from datetime import datetime
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from utils.database import db
 from utils.rcon_utility import rcon_util
 from cogs.rank_system import rank_system
+from utils.config_manager import config
+from utils.file_watcher import create_watch_backend
+
+class LineDeduper:
+    """
+    Bounded "have we already handled this log line?" memory.
+
+    Keys are 64-bit blake2b digests of (file, byte offset, line), so they are
+    stable across restarts (unlike the salted built-in hash()) and a truncated
+    file that reuses an offset with different content is not mistaken for a
+    duplicate. A ring (deque) plus set keeps the newest keys, as many as fit
+    in `max_bytes`; the oldest fall out once the cap is reached, so memory
+    stays flat.
+    """
+
+    # Measured CPython cost of one key (int object + set slots + deque slot)
+    BYTES_PER_ENTRY = 88
+
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024):
+        self.max_bytes = self.max_entries = 0
+        self._ring = deque()
+        self._seen = set()
+        self.checks = 0
+        self.duplicates = 0
+        self.evictions = 0
+        self.resize(max_bytes)
+
+    @staticmethod
+    def make_key(source: str, offset: int, line: str) -> int:
+        """Deterministic key for a line at a byte offset in a file"""
+        digest = hashlib.blake2b(f"{source}\0{offset}\0{line}".encode('utf-8', 'replace'), digest_size=8).digest()
+        return int.from_bytes(digest, 'big')
+
+    def seen(self, key) -> bool:
+        """True if key was already recorded"""
+        self.checks += 1
+        if key in self._seen:
+            self.duplicates += 1
+            return True
+        return False
+
+    def add(self, key):
+        """Record key, evicting the oldest entry when full"""
+        if key in self._seen:
+            return
+        self._seen.add(key)
+        self._ring.append(key)
+        while len(self._ring) > self.max_entries:
+            self._seen.discard(self._ring.popleft())
+            self.evictions += 1
+
+    def resize(self, max_bytes: int):
+        """Change the memory cap (shrinks immediately)"""
+        self.max_bytes = max(self.BYTES_PER_ENTRY, int(max_bytes))
+        self.max_entries = self.max_bytes // self.BYTES_PER_ENTRY
+        while len(self._ring) > self.max_entries:
+            self._seen.discard(self._ring.popleft())
+            self.evictions += 1
+
+    def stats(self) -> Dict:
+        """Size, approximate memory and collision metrics"""
+        entries = len(self._ring)
+        return {
+            'entries': entries,
+            'max_entries': self.max_entries,
+            # Same per-entry estimate as the cap, so the two compare directly
+            'approx_bytes': entries * self.BYTES_PER_ENTRY,
+            'max_bytes': self.max_bytes,
+            'checks': self.checks,
+            'duplicates': self.duplicates,
+            'evictions': self.evictions,
+            # Chance a new line collides with a stored 64-bit key
+            'false_positive_rate': entries / 2 ** 64,
+        }
+
+
+class LogLineClassifier:
+    """
+    Single-pass classifier for PalDefender log lines.
+
+    Every activity line looks like "[time][info] 'Name' (UserId=steam_x, IP=y) <verb> ...".
+    Instead of running one full regex per activity type, find the "][info] "
+    marker once, parse the shared player prefix once, then dispatch on the
+    verb to a single small anchored pattern. Chat and [OilRig] lines are
+    recognised by their first token.
+    """
+
+    INFO_MARKER = '][info] '
+
+    PLAYER_PREFIX = re.compile(r"'(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\) ")
+    CHAT = re.compile(r"\[Chat::(?P<type>.*?)\].*?\['(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\)\](?:\[.*?\])*: (?P<msg>.+)")
+    OIL_RIG = re.compile(r"\[OilRig\] '(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\) has (?P<msg>.+)")
+
+    # Verb after the player prefix (minus "has "/"started ") -> [(activity type, pattern for the rest)]
+    _CHEST = re.compile(r"(?:has )?(?:opened|opening|looted|looting) '(?P<item>.+?)' at (?P<coords>.+)")
+    VERBS = {
+        'logged': [('login', re.compile(r"has logged in")), ('logout', re.compile(r"has logged out"))],
+        'built': [('building', re.compile(r"(?:has )?buil[td] an?\s*'(?P<item>.+?)'"))],
+        'crafting': [('crafting', re.compile(r"(?:has )?(?:started )?crafting (?:(?P<qty>\d+)x\s*)?'(?P<item>.+?)'"))],
+        'unlocking': [('tech', re.compile(r"unlocking Technology: '(?P<item>.+?)'"))],
+        'dealing': [('combat', re.compile(r"dealing damage \((?P<dmg>\d+)\) to '(?P<tar>.+?)'"))],
+        'killed': [('kill', re.compile(r"killed '(?P<tar>.+?)'"))],
+        'opened': [('chest', _CHEST)],
+        'opening': [('chest', _CHEST)],
+        'looted': [('chest', _CHEST)],
+        'looting': [('chest', _CHEST)],
+    }
+    VERBS['build'] = VERBS['built']
+
+    # Looser Game -> Discord relay patterns, only tried on Global chat lines
+    # the strict CHAT pattern could not parse
+    RELAY_PATTERNS = [
+        re.compile(r"\[Chat::Global\]\['(?P<author>.+?)'\s*\(UserId=.*?\)\].*?:\s*(?P<content>.*)"),
+        re.compile(r"\[Chat::(?:Global)\]\['(?P<author>[^']+)'.*\].*?:\s*(?P<content>.*)"),
+        re.compile(r"\[Chat::Global\]\s*\[?(?P<author>[^'\[]+?)[\s'\]]*\(UserId=.*?\)\].*?:\s*(?P<content>.*)"),
+        re.compile(r"\[.*?\]\[info\] \[Chat::Global\]\['(?P<author>.+?)' \(UserId=steam_\d+, IP=.+?\)\](?:\[.*?\])*:\s*(?P<content>.+)")
+    ]
+
+    def classify(self, line: str) -> Tuple[Optional[str], Optional[Dict]]:
+        """Return (activity type, named fields) or (None, None)"""
+        idx = line.find(self.INFO_MARKER)
+        if idx < 0:
+            return None, None
+        pos = idx + len(self.INFO_MARKER)
+
+        first = line[pos:pos + 1]
+        if first == "'":
+            prefix = self.PLAYER_PREFIX.match(line, pos)
+            if not prefix:
+                return None, None
+            rest = prefix.end()
+            verb = line[rest:line.find(' ', rest)]
+            if verb == 'has' or verb == 'started':
+                nxt = line.find(' ', rest) + 1
+                verb = line[nxt:line.find(' ', nxt)]
+                if verb == 'started':
+                    nxt = line.find(' ', nxt) + 1
+                    verb = line[nxt:line.find(' ', nxt)]
+            for activity_type, pattern in self.VERBS.get(verb, ()):
+                match = pattern.match(line, rest)
+                if match:
+                    fields = match.groupdict()
+                    fields['name'] = prefix.group('name')
+                    fields['sid'] = prefix.group('sid')
+                    return activity_type, fields
+            return None, None
+
+        if first == '[':
+            if line.startswith('[Chat::', pos):
+                match = self.CHAT.match(line, pos)
+                return ('chat', match.groupdict()) if match else (None, None)
+            if line.startswith('[OilRig] ', pos):
+                match = self.OIL_RIG.match(line, pos)
+                return ('oil_rig', match.groupdict()) if match else (None, None)
+
+        return None, None
+
+    def relay_fields(self, line: str, activity_type: Optional[str], fields: Optional[Dict]) -> Optional[Tuple[str, str]]:
+        """(author, content) for Global chat that should be relayed to Discord"""
+        if '[Chat::Global]' not in line:
+            return None
+        if activity_type == 'chat' and fields.get('type') == 'Global':
+            return fields['name'].strip("'[] "), fields['msg'].strip()
+        for pattern in self.RELAY_PATTERNS:
+            match = pattern.search(line)
+            if match:
+                return match.group('author').strip("'[] "), match.group('content').strip()
+        return None
+
 
 class PalDefenderLogParser:
     """Parser for PalDefender log files to extract player activities"""
     
     def __init__(self):
-        # Regex patterns for log parsing
-        self.patterns = {
-            'login': re.compile(r"\[.*?\]\[info\] '(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\) has logged in.*"),
-            'logout': re.compile(r"\[.*?\]\[info\] '(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\) has logged out.*"),
-            'building': re.compile(r"\[.*?\]\[info\] '(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\) (?:has )?buil[td] an?\s*'(?P<item>.+?)'"),
-            'crafting': re.compile(r"\[.*?\]\[info\] '(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\) (?:has )?(?:started )?crafting (?:(?P<qty>\d+)x\s*)?'(?P<item>.+?)'"),
-            'tech': re.compile(r"\[.*?\]\[info\] '(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\) unlocking Technology: '(?P<item>.+?)'"),
-            'chat': re.compile(r"\[.*?\]\[info\] \[Chat::(?P<type>.*?)\].*?\['(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\)\](?:\[.*?\])*: (?P<msg>.+)"),
-            'combat': re.compile(r"\[.*?\]\[info\] '(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\) dealing damage \((?P<dmg>\d+)\) to '(?P<tar>.+?)'"),
-            'kill': re.compile(r"\[.*?\]\[info\] '(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\) killed '(?P<tar>.+?)'"),
-            'chest': re.compile(r"\[.*?\]\[info\] '(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\) (?:has )?(?:opened|opening|looted|looting) '(?P<item>.+?)' at (?P<coords>.+)"),
-            'oil_rig': re.compile(r"\[.*?\]\[info\] \[OilRig\] '(?P<name>.+?)' \(UserId=(?P<sid>steam_\d+), IP=.+?\) has (?P<msg>.+)")
-        }
+        # Single-pass line classifier (replaces one regex per activity type)
+        self.classifier = LogLineClassifier()
         
         # Reward values (Both PALDOGS and EXP)
         self.rewards = {
@@ -63,7 +224,8 @@ class PalDefenderLogParser:
             'Champion': 3.0
         }
         
-        self.processed_lines = set()  # Track processed log lines to avoid duplicates
+        # Track processed log lines to avoid duplicates (bounded, see LineDeduper)
+        self.processed_lines = LineDeduper(int(float(config.get('log_dedupe_max_mb', 8)) * 1024 * 1024))
 
     def get_crafting_reward(self, item_name: str) -> Dict[str, int]:
         """Calculate PALDOGS and EXP for crafting"""
@@ -79,230 +241,315 @@ class PalDefenderLogParser:
                 return self.rewards['building'][material]
         return self.rewards['building']['default']
     
+    def get_rank_multiplier(self, rank: str) -> float:
+        """Reward multiplier for a rank"""
+        return self.rank_multipliers.get(rank, 1.0)
+    
     async def apply_rank_multiplier(self, steam_id: str, base_reward: int) -> int:
         """Apply rank multiplier to reward (Async)"""
-        stats = await db.get_player_stats(steam_id)
+        stats = await db.get_player_state(steam_id)
         if stats:
-            rank = stats.get('rank', 'Trainer')
-            multiplier = self.rank_multipliers.get(rank, 1.0)
-            return int(base_reward * multiplier)
+            return int(base_reward * self.get_rank_multiplier(stats.get('rank', 'Trainer')))
         return base_reward
     
-    def parse_line(self, line: str, line_hash: str = None) -> Optional[Dict]:
+    def parse_line(self, line: str, line_hash: int = None) -> Optional[Dict]:
         """Parse a single log line and return activity data"""
+        return self.classify_line(line, line_hash)[0]
+
+    def classify_line(self, line: str, line_hash: int = None) -> Tuple[Optional[Dict], Optional[Tuple[str, str]]]:
+        """Parse a log line once -> (activity data, (author, content) for the chat relay)"""
+        activity_type, fields = self.classifier.classify(line)
+        relay = self.classifier.relay_fields(line, activity_type, fields)
+        if not activity_type:
+            return None, relay
+
         # Avoid processing duplicate lines
-        if line_hash and line_hash in self.processed_lines:
-            return None
+        if line_hash:
+            if self.processed_lines.seen(line_hash):
+                return None, relay
+            self.processed_lines.add(line_hash)
+
+        return self.build_activity(activity_type, fields), relay
+
+    def build_activity(self, activity_type: str, match: Dict) -> Optional[Dict]:
+        """Turn classified fields into an activity dict (None if it earns nothing)"""
+        if activity_type == 'login':
+            player_name, steam_id = match['name'], match['sid']
+            return {
+                'type': 'login',
+                'player_name': player_name,
+                'steam_id': steam_id,
+                'ip': 'hidden'
+            }
         
-        # Try each pattern
-        for activity_type, pattern in self.patterns.items():
-            match = pattern.search(line)
-            if match:
-                if line_hash:
-                    self.processed_lines.add(line_hash)
-                
-                if activity_type == 'login':
-                    player_name, steam_id = match.group('name'), match.group('sid')
-                    return {
-                        'type': 'login',
-                        'player_name': player_name,
-                        'steam_id': steam_id,
-                        'ip': 'hidden'
-                    }
-                
-                elif activity_type == 'logout':
-                    player_name, steam_id = match.group('name'), match.group('sid')
-                    return {
-                        'type': 'logout',
-                        'player_name': player_name,
-                        'steam_id': steam_id,
-                        'ip': 'hidden'
-                    }
-                
-                elif activity_type == 'building':
-                    player_name, steam_id = match.group('name'), match.group('sid')
-                    building = match.group('item').strip()
-                    reward = self.get_building_reward(building)
-                    return {
-                        'type': 'building',
-                        'player_name': player_name,
-                        'steam_id': steam_id,
-                        'building': building,
-                        'reward': reward
-                    }
-                
-                elif activity_type == 'crafting':
-                    player_name, steam_id = match.group('name'), match.group('sid')
-                    item = match.group('item').strip()
-                    # Detect qty if group exists and is not None
-                    qty = 1
-                    try:
-                        gd = match.groupdict()
-                        if gd.get('qty'): qty = int(gd['qty'])
-                    except: pass
-                    
-                    reward = self.get_crafting_reward(item).copy()
-                    if qty > 1:
-                        reward['paldogs'] *= qty
-                        reward['exp'] *= qty
-                        
-                    return {
-                        'type': 'crafting',
-                        'player_name': player_name,
-                        'steam_id': steam_id,
-                        'item': item,
-                        'qty': qty,
-                        'reward': reward
-                    }
+        elif activity_type == 'logout':
+            player_name, steam_id = match['name'], match['sid']
+            return {
+                'type': 'logout',
+                'player_name': player_name,
+                'steam_id': steam_id,
+                'ip': 'hidden'
+            }
+        
+        elif activity_type == 'building':
+            player_name, steam_id = match['name'], match['sid']
+            building = match['item'].strip()
+            reward = self.get_building_reward(building)
+            return {
+                'type': 'building',
+                'player_name': player_name,
+                'steam_id': steam_id,
+                'building': building,
+                'reward': reward
+            }
+        
+        elif activity_type == 'crafting':
+            player_name, steam_id = match['name'], match['sid']
+            item = match['item'].strip()
+            # Detect qty if group exists and is not None
+            qty = 1
+            try:
+                if match.get('qty'): qty = int(match['qty'])
+            except: pass
+            
+            reward = self.get_crafting_reward(item).copy()
+            if qty > 1:
+                reward['paldogs'] *= qty
+                reward['exp'] *= qty
                 
-                elif activity_type == 'tech':
-                    player_name, steam_id, tech = match.group('name'), match.group('sid'), match.group('item')
-                    return {
-                        'type': 'tech',
-                        'player_name': player_name,
-                        'steam_id': steam_id,
-                        'tech': tech,
-                        'reward': self.rewards['tech']
-                    }
+            return {
+                'type': 'crafting',
+                'player_name': player_name,
+                'steam_id': steam_id,
+                'item': item,
+                'qty': qty,
+                'reward': reward
+            }
+        
+        elif activity_type == 'tech':
+            player_name, steam_id, tech = match['name'], match['sid'], match['item']
+            return {
+                'type': 'tech',
+                'player_name': player_name,
+                'steam_id': steam_id,
+                'tech': tech,
+                'reward': self.rewards['tech']
+            }
+        
+        elif activity_type == 'chat':
+            player_name, steam_id, message = match['name'], match['sid'], match['msg']
+            return {
+                'type': 'chat',
+                'player_name': player_name,
+                'steam_id': steam_id,
+                'message': message,
+                'reward': self.rewards['chat']
+            }
+
+        elif activity_type == 'combat':
+            player_name, steam_id, damage, target = match['name'], match['sid'], match['dmg'], match['tar']
+            return {
+                'type': 'combat',
+                'player_name': player_name,
+                'steam_id': steam_id,
+                'damage': int(damage),
+                'target': target,
+                'reward': self.rewards['combat']
+            }
+
+        elif activity_type == 'kill':
+            player_name, steam_id, target = match['name'], match['sid'], match['tar']
+            return {
+                'type': 'kill',
+                'player_name': player_name,
+                'steam_id': steam_id,
+                'target': target,
+                'reward': self.rewards['kill']
+            }
+        
+        elif activity_type == 'chest':
+            player_name, steam_id, item, coords = match['name'], match['sid'], match['item'], match['coords']
+            
+            # Normal chest rewards (small)
+            if "SupplyChest" in item or "Large" in item:
+                # Fallback for coord-based rig if [OilRig] log missing
+                is_lvl60 = False
+                try:
+                    parts = coords.strip().split()
+                    if len(parts) >= 2:
+                        x, y = int(parts[0]), int(parts[1])
+                        if 450 <= x <= 700 and -550 <= y <= -300: is_lvl60 = True
+                except: pass
                 
-                elif activity_type == 'chat':
-                    player_name, steam_id, message = match.group('name'), match.group('sid'), match.group('msg')
-                    return {
-                        'type': 'chat',
-                        'player_name': player_name,
-                        'steam_id': steam_id,
-                        'message': message,
-                        'reward': self.rewards['chat']
-                    }
-
-                elif activity_type == 'combat':
-                    player_name, steam_id, damage, target = match.group('name'), match.group('sid'), match.group('dmg'), match.group('tar')
-                    return {
-                        'type': 'combat',
-                        'player_name': player_name,
-                        'steam_id': steam_id,
-                        'damage': int(damage),
-                        'target': target,
-                        'reward': self.rewards['combat']
-                    }
-
-                elif activity_type == 'kill':
-                    player_name, steam_id, target = match.group('name'), match.group('sid'), match.group('tar')
-                    return {
-                        'type': 'kill',
-                        'player_name': player_name,
-                        'steam_id': steam_id,
-                        'target': target,
-                        'reward': self.rewards['kill']
-                    }
+                reward = self.rewards['oil_rig']['lvl60'] if is_lvl60 else self.rewards['oil_rig']['default']
+                return {
+                    'type': 'oil_rig',
+                    'player_name': player_name,
+                    'steam_id': steam_id,
+                    'event_type': 'box',
+                    'lv': 'lvl60' if is_lvl60 else 'default',
+                    'reward': reward
+                }
+            return None
+
+        elif activity_type == 'oil_rig':
+            player_name, steam_id, msg = match['name'], match['sid'], match['msg']
+            msg_lower = msg.lower()
+            
+            is_chopper = "killed the combaticopter" in msg_lower
+            is_goal = "opened the endgoalbox" in msg_lower or "opened the oilrig" in msg_lower
+            
+            if not is_chopper and not is_goal:
+                return None
                 
-                elif activity_type == 'chest':
-                    player_name, steam_id, item, coords = match.group('name'), match.group('sid'), match.group('item'), match.group('coords')
-                    
-                    # Normal chest rewards (small)
-                    if "SupplyChest" in item or "Large" in item:
-                        # Fallback for coord-based rig if [OilRig] log missing
-                        is_lvl60 = False
-                        try:
-                            parts = coords.strip().split()
-                            if len(parts) >= 2:
-                                x, y = int(parts[0]), int(parts[1])
-                                if 450 <= x <= 700 and -550 <= y <= -300: is_lvl60 = True
-                        except: pass
-                        
-                        reward = self.rewards['oil_rig']['lvl60'] if is_lvl60 else self.rewards['oil_rig']['default']
-                        return {
-                            'type': 'oil_rig',
-                            'player_name': player_name,
-                            'steam_id': steam_id,
-                            'event_type': 'box',
-                            'lv': 'lvl60' if is_lvl60 else 'default',
-                            'reward': reward
-                        }
-                    return None
-
-                elif activity_type == 'oil_rig':
-                    player_name, steam_id, msg = match.group('name'), match.group('sid'), match.group('msg')
-                    msg_lower = msg.lower()
-                    
-                    is_chopper = "killed the combaticopter" in msg_lower
-                    is_goal = "opened the endgoalbox" in msg_lower or "opened the oilrig" in msg_lower
-                    
-                    if not is_chopper and not is_goal:
-                        return None
-                        
-                    lv = "default"
-                    if "(Lv60)" in msg: lv = "lvl60"
-                    elif "(Lv55)" in msg: lv = "lvl55"
-                    elif "(Lv30)" in msg: lv = "lvl30"
-                    
-                    reward_key = "chopper" if is_chopper else lv
-                    reward = self.rewards['oil_rig'].get(reward_key, self.rewards['oil_rig']['default'])
-                    
-                    return {
-                        'type': 'oil_rig',
-                        'player_name': player_name,
-                        'steam_id': steam_id,
-                        'event_type': 'chopper' if is_chopper else 'box',
-                        'lv': lv,
-                        'reward': reward
-                    }
+            lv = "default"
+            if "(Lv60)" in msg: lv = "lvl60"
+            elif "(Lv55)" in msg: lv = "lvl55"
+            elif "(Lv30)" in msg: lv = "lvl30"
+            
+            reward_key = "chopper" if is_chopper else lv
+            reward = self.rewards['oil_rig'].get(reward_key, self.rewards['oil_rig']['default'])
+            
+            return {
+                'type': 'oil_rig',
+                'player_name': player_name,
+                'steam_id': steam_id,
+                'event_type': 'chopper' if is_chopper else 'box',
+                'lv': lv,
+                'reward': reward
+            }
         
         return None
     
-    async def process_activity(self, activity: Dict) -> Tuple[int, str, str]:
-        """Process activity and update database, return reward amount, discord message, and in-game message"""
-        activity_type = activity['type']
+    async def process_activity(self, activity: Dict, checkpoint=None) -> Tuple[int, str, str]:
+        """
+        Process activity and update database, return reward amount, discord message, and in-game message.
+        checkpoint (see db.unit_of_work) commits in the same transaction as the rewards.
+        """
         steam_id = activity['steam_id']
         player_name = activity['player_name']
         
-        # Ensure player exists
-        await db.upsert_player(steam_id, player_name)
+        # Upsert -> rewards -> level-up -> rank check: one thread hop, one transaction
+        result = await db.apply_activity_batch(
+            steam_id, player_name, lambda uow: self.apply_rewards(uow, activity), checkpoint
+        )
+        return self.build_messages(activity, result)
+    
+    async def process_activities_bulk(self, activities: List[Dict], checkpoints: List[Tuple] = None) -> int:
+        """
+        Apply rewards for many activities in one DB thread dispatch, without
+        Discord/in-game messages (catch-up and backfill). Returns PALDOGS awarded.
+        checkpoints[i] is the (path, inode, size, offset) just past activity i's
+        line; it commits in the same transaction as that activity's rewards, so a
+        crash mid-batch resumes right after the last rewarded line. An activity
+        that fails is logged and skipped: the next one's checkpoint moves past it.
+        """
+        def work():
+            total = 0
+            for i, activity in enumerate(activities):
+                checkpoint = checkpoints[i] if checkpoints else None
+                try:
+                    result = db._apply_activity_batch(
+                        activity['steam_id'], activity['player_name'],
+                        lambda uow, activity=activity: self.apply_rewards(uow, activity),
+                        checkpoint=checkpoint
+                    )
+                    total += result.get('palmarks', 0)
+                except Exception as e:
+                    where = f" ({checkpoint[0]} line ending at {checkpoint[3]})" if checkpoint else ""
+                    print(f"[ERROR] Bulk reward failed for {activity.get('player_name')}{where}, skipping it: {e}")
+            return total
+        return await asyncio.to_thread(work)
+    
+    def get_streak_bonus(self, streak: int) -> Tuple[int, int, str]:
+        """Daily login streak bonus -> (paldogs, exp, label)"""
+        if streak >= 30: return 500, 1000, "🎊 30-DAY STREAK!"
+        elif streak >= 14: return 250, 500, "🎉 14-DAY STREAK!"
+        elif streak >= 7: return 100, 250, "🔥 7-DAY STREAK!"
+        elif streak >= 3: return 50, 100, "⭐ 3-DAY STREAK!"
+        return 0, 0, ""
+    
+    def get_oil_rig_labels(self, activity: Dict) -> Tuple[str, str, str]:
+        """Oil rig event -> (raid label, history description, emoji)"""
+        if activity.get('event_type', 'box') == 'chopper':
+            return "COMBATICOPTER", "Killed the Combaticopter at Oil Rig", "🚁"
+        
+        lv = activity.get('lv', 'default')
+        if lv == 'lvl60': raid_label = "LVL 60 OIL RIG"
+        elif lv == 'lvl55': raid_label = "LVL 55 OIL RIG"
+        elif lv == 'lvl30': raid_label = "LVL 30 OIL RIG"
+        else: raid_label = "OIL RIG"
+        return raid_label, f"Successfully raided {raid_label}", "⚓"
+    
+    def apply_rewards(self, uow, activity: Dict) -> Dict:
+        """Apply an activity's database effects inside a unit of work (runs in the DB thread)"""
+        activity_type = activity['type']
+        reward = activity.get('reward', {})
+        multiplier = self.get_rank_multiplier(uow.rank)
+        
+        if activity_type == 'login':
+            streak, is_first_today = uow.record_login()
+            if is_first_today:
+                # Daily rewards + streak bonus
+                streak_p_bonus, streak_e_bonus, _ = self.get_streak_bonus(streak)
+                total_paldogs = int((self.rewards['daily_login']['paldogs'] + streak_p_bonus) * multiplier)
+                uow.add_palmarks(total_paldogs, f"Daily login (Streak: {streak})")
+                uow.add_experience(self.rewards['daily_login']['exp'] + streak_e_bonus)
+                uow.check_rank(rank_system.resolve_rank)
+        
+        elif activity_type == 'logout':
+            uow.record_logout()
+        
+        elif activity_type in ('building', 'crafting', 'tech'):
+            descriptions = {
+                'building': lambda: f"Built {activity['building']}",
+                'crafting': lambda: f"Crafted {activity['item']}",
+                'tech': lambda: f"Unlocked {activity['tech']}"
+            }
+            uow.add_activity(activity_type, 1)
+            uow.add_palmarks(int(reward['paldogs'] * multiplier), descriptions[activity_type]())
+            uow.add_experience(reward['exp'])
+            uow.check_rank(rank_system.resolve_rank)
+        
+        elif activity_type == 'chat':
+            uow.add_activity('chat', 1)
+            uow.add_experience(self.rewards['chat']['exp'])
+        
+        elif activity_type == 'combat':
+            # Award small amount of EXP for combat activity
+            uow.add_experience(reward['exp'])
+        
+        elif activity_type == 'kill':
+            uow.add_palmarks(int(reward['paldogs'] * multiplier), f"Killed {activity['target']}")
+            uow.add_experience(reward['exp'])
         
-        # Track initial rank to detect rank-up
-        stats = await db.get_player_stats(steam_id)
-        old_rank = stats.get('rank', 'Trainer') if stats else 'Trainer'
+        elif activity_type == 'oil_rig':
+            _, activity_desc, _ = self.get_oil_rig_labels(activity)
+            uow.add_palmarks(int(reward['paldogs'] * multiplier), activity_desc)
+            uow.add_experience(reward['exp'])
         
-        msg = ""
-        in_game_broadcast = ""
-        total_reward = 0
+        return uow.summary()
+    
+    def build_messages(self, activity: Dict, result: Dict) -> Tuple[int, str, str]:
+        """Turn a unit-of-work summary into (reward, discord message, in-game broadcast)"""
+        activity_type = activity['type']
+        player_name = activity['player_name']
+        total_paldogs = result['palmarks']
+        total_exp = result['exp']
+        leveled_up, new_level = result['leveled_up'], result['level']
+        ranked_up, new_rank = result['ranked_up'], result['rank']
+        active_announcer = result['announcer']
         
         if activity_type == 'login':
-            streak, is_first_today = await db.record_login(steam_id, player_name)
-            
-            # 1. Prepare base arrival messages
-            in_game_broadcast = ""
-            current_rank = old_rank
-            active_announcer = stats.get('active_announcer', 'default') if stats else 'default'
-            
-            if not is_first_today:
+            if not result['is_first_today']:
                 in_game_broadcast = rank_system.get_join_message(active_announcer, player_name)
                 msg = f"📥 **{player_name}** joined the server"
                 return 0, msg, in_game_broadcast
-
-            # 2. Daily Rewards
-            paldogs_reward = self.rewards['daily_login']['paldogs']
-            exp_reward = self.rewards['daily_login']['exp']
             
-            # Streak bonus
-            streak_p_bonus = 0
-            streak_e_bonus = 0
-            streak_msg = ""
-            if streak >= 30: streak_p_bonus, streak_e_bonus, streak_msg = 500, 1000, "🎊 30-DAY STREAK!"
-            elif streak >= 14: streak_p_bonus, streak_e_bonus, streak_msg = 250, 500, "🎉 14-DAY STREAK!"
-            elif streak >= 7: streak_p_bonus, streak_e_bonus, streak_msg = 100, 250, "🔥 7-DAY STREAK!"
-            elif streak >= 3: streak_p_bonus, streak_e_bonus, streak_msg = 50, 100, "⭐ 3-DAY STREAK!"
+            streak = result['streak']
+            _, _, streak_msg = self.get_streak_bonus(streak)
             
-            total_paldogs = await self.apply_rank_multiplier(steam_id, paldogs_reward + streak_p_bonus)
-            total_exp = exp_reward + streak_e_bonus
-            
-            await db.add_palmarks(steam_id, total_paldogs, f"Daily login (Streak: {streak})")
-            leveled_up, new_level = await db.add_experience(steam_id, total_exp)
-            
-            new_rank, ranked_up = await rank_system.check_and_update_rank(steam_id)
-            current_rank = new_rank if ranked_up else old_rank
-            
-            rank_info = rank_system.get_rank_info(current_rank)
+            rank_info = rank_system.get_rank_info(new_rank)
             msg = f"🎉 {rank_info['emoji']} **{player_name}** logged in!\n💰 +{total_paldogs} PALDOGS | ✨ +{total_exp} EXP"
             
             if leveled_up:
@@ -318,27 +565,12 @@ class PalDefenderLogParser:
             
             return total_paldogs, msg, in_game_broadcast
         
-        elif activity_type == 'logout':
-            await db.record_logout(steam_id)
-            return 0, "", ""
-        
         elif activity_type == 'building':
-            await db.add_activity(steam_id, 'building', 1)
-            p_base = activity['reward']['paldogs']
-            e_base = activity['reward']['exp']
-            total_paldogs = await self.apply_rank_multiplier(steam_id, p_base)
-            total_exp = e_base
-            
-            await db.add_palmarks(steam_id, total_paldogs, f"Built {activity['building']}")
-            leveled_up, new_level = await db.add_experience(steam_id, total_exp)
-            
-            new_rank, ranked_up = await rank_system.check_and_update_rank(steam_id)
             msg = ""
             in_game_broadcast = ""
             
             if leveled_up or ranked_up:
-                active_announcer = stats.get('active_announcer', 'default') if stats else 'default'
-                rank_info = rank_system.get_rank_info(new_rank if ranked_up else old_rank)
+                rank_info = rank_system.get_rank_info(new_rank)
                 if leveled_up: msg += f"🆙 **LEVEL UP!** **{player_name}** is now level **{new_level}**!\n"
                 if ranked_up: 
                     msg += f"🎊 **RANK UP!** {rank_info['emoji']} **{player_name}** is now a **{new_rank}**!"
@@ -346,88 +578,27 @@ class PalDefenderLogParser:
             
             return total_paldogs, msg, in_game_broadcast
         
-        elif activity_type == 'crafting':
-            await db.add_activity(steam_id, 'crafting', 1)
-            p_base = activity['reward']['paldogs']
-            e_base = activity['reward']['exp']
-            total_paldogs = await self.apply_rank_multiplier(steam_id, p_base)
-            total_exp = e_base
-            
-            await db.add_palmarks(steam_id, total_paldogs, f"Crafted {activity['item']}")
-            leveled_up, new_level = await db.add_experience(steam_id, total_exp)
-            
-            new_rank, ranked_up = await rank_system.check_and_update_rank(steam_id)
+        elif activity_type in ('crafting', 'tech', 'kill'):
             msg = ""
             if leveled_up: msg += f"🆙 **LEVEL UP! {player_name}** reached Level **{new_level}**!"
             return total_paldogs, msg, ""
         
-        elif activity_type == 'tech':
-            await db.add_activity(steam_id, 'tech', 1)
-            total_paldogs = await self.apply_rank_multiplier(steam_id, activity['reward']['paldogs'])
-            total_exp = activity['reward']['exp']
-            
-            await db.add_palmarks(steam_id, total_paldogs, f"Unlocked {activity['tech']}")
-            leveled_up, new_level = await db.add_experience(steam_id, total_exp)
-            
-            new_rank, ranked_up = await rank_system.check_and_update_rank(steam_id)
-            msg = ""
-            if leveled_up: msg += f"🆙 **LEVEL UP! {player_name}** reached Level **{new_level}**!"
-            return total_paldogs, msg, ""
-        
-        elif activity_type == 'chat':
-            await db.add_activity(steam_id, 'chat', 1)
-            await db.add_experience(steam_id, self.rewards['chat']['exp'])
-            return 0, "", ""
-
-        elif activity_type == 'combat':
-            # Award small amount of EXP for combat activity
-            await db.add_experience(steam_id, activity['reward']['exp'])
-            return 0, "", ""
-        elif activity_type == 'kill':
-            total_paldogs = await self.apply_rank_multiplier(steam_id, activity['reward']['paldogs'])
-            total_exp = activity['reward']['exp']
-            await db.add_palmarks(steam_id, total_paldogs, f"Killed {activity['target']}")
-            leveled_up, new_level = await db.add_experience(steam_id, total_exp)
-            msg = ""
-            if leveled_up: msg = f"🆙 **LEVEL UP! {player_name}** reached Level **{new_level}**!"
-            return total_paldogs, msg, ""
-        
         elif activity_type == 'oil_rig':
-            total_paldogs = await self.apply_rank_multiplier(steam_id, activity['reward']['paldogs'])
-            total_exp = activity['reward']['exp']
-            
-            event_type = activity.get('event_type', 'box')
-            lv = activity.get('lv', 'default')
-            
-            if event_type == 'chopper':
-                raid_label = "COMBATICOPTER"
-                activity_desc = "Killed the Combaticopter at Oil Rig"
-                discord_emoji = "🚁"
-                broadcast_prefix = "🚁"
-            else:
-                if lv == 'lvl60': raid_label = "LVL 60 OIL RIG"
-                elif lv == 'lvl55': raid_label = "LVL 55 OIL RIG"
-                elif lv == 'lvl30': raid_label = "LVL 30 OIL RIG"
-                else: raid_label = "OIL RIG"
-                
-                activity_desc = f"Successfully raided {raid_label}"
-                discord_emoji = "⚓"
-                broadcast_prefix = "⚓"
-
-            await db.add_palmarks(steam_id, total_paldogs, activity_desc)
-            leveled_up, new_level = await db.add_experience(steam_id, total_exp)
+            raid_label, _, emoji = self.get_oil_rig_labels(activity)
+            is_chopper = activity.get('event_type', 'box') == 'chopper'
             
             # Discord Message (Rich)
-            verb = "killed the" if event_type == 'chopper' else "successfully raided the"
-            msg = f"{discord_emoji} **{player_name}** has {verb} **{raid_label}**!\n💰 Received **{total_paldogs:,} PALDOGS** and ✨ **{total_exp:,} EXP**!"
+            verb = "killed the" if is_chopper else "successfully raided the"
+            msg = f"{emoji} **{player_name}** has {verb} **{raid_label}**!\n💰 Received **{total_paldogs:,} PALDOGS** and ✨ **{total_exp:,} EXP**!"
             if leveled_up: msg += f"\n🆙 **LEVEL UP!** Now Level **{new_level}**!"
             
             # In-Game Broadcast
-            bc_verb = "killed the" if event_type == 'chopper' else "raided the"
-            broadcast = f"{broadcast_prefix} {player_name} {bc_verb} {raid_label} and earned {total_paldogs:,} PALDOGS!"
+            bc_verb = "killed the" if is_chopper else "raided the"
+            broadcast = f"{emoji} {player_name} {bc_verb} {raid_label} and earned {total_paldogs:,} PALDOGS!"
             
             return total_paldogs, msg, broadcast
         
+        # logout, chat, combat: no announcement
         return 0, "", ""
     
     async def tail_log_file(self, log_path: str, callback=None):
@@ -436,24 +607,31 @@ class PalDefenderLogParser:
             print(f"⚠️ Log file not found: {log_path}")
             return
         
-        with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-            # Go to end of file
-            f.seek(0, 2)
-            
-            while True:
-                line = f.readline()
-                if line:
-                    line_hash = hash(line)
-                    activity = self.parse_line(line, str(line_hash))
-                    
-                    if activity:
-                        reward, message, broadcast = await self.process_activity(activity)
+        # Wake on file change events instead of polling readline()
+        watcher = create_watch_backend(os.path.dirname(os.path.abspath(log_path)))
+        watcher.watch_file(log_path)
+        try:
+            with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
+                # Go to end of file
+                f.seek(0, 2)
+                
+                while True:
+                    offset = f.tell()
+                    line = f.readline()
+                    if line:
+                        line_hash = LineDeduper.make_key(log_path, offset, line)
+                        activity = self.parse_line(line, line_hash)
                         
-                        if callback and message:
-                            callback(activity, reward, message)
-                else:
-                    # No new line, wait a bit
-                    await asyncio.sleep(0.1)
+                        if activity:
+                            reward, message, broadcast = await self.process_activity(activity)
+                            
+                            if callback and message:
+                                callback(activity, reward, message)
+                    else:
+                        # No new line, wait for the next write
+                        await watcher.wait(timeout=5)
+        finally:
+            watcher.close()
 
 
 # Global instance
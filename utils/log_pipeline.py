@@ -0,0 +1,250 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Callable, Awaitable, Dict, List, Optional, Tuple
+
+from utils.config_manager import config
+from utils.database import db
+from utils.delivery_engine import delivery_engine
+
+
+class _Checkpoint:
+    """
+    Barrier travelling through the reward shards, marking the end of a read chunk.
+    Saved once every shard has passed it, so the lines without rewards are covered too.
+    """
+
+    __slots__ = ('args', 'pending')
+
+    def __init__(self, args: Tuple, shards: int):
+        self.args = args
+        self.pending = shards
+
+
+class _Line:
+    """A line with an activity on its way through the reward shards"""
+
+    __slots__ = ('path', 'inode', 'size', 'start', 'end')
+
+    def __init__(self, path: str, inode: int, size: int, start: int, end: int):
+        self.path = path
+        self.inode = inode
+        self.size = size
+        self.start = start
+        self.end = end
+
+
+class _Progress:
+    """
+    Where a log file can safely be resumed from, given the lines still in flight.
+
+    Shards commit out of order, so a line's checkpoint is the furthest line end
+    handled so far, unless an earlier line is still held by another shard, in
+    which case it is that line's start. resume_at() runs under db.lock right
+    before the commit that saves its result, so saved offsets never move backwards.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight: Dict[str, Dict[_Line, None]] = {}  # path -> lines in file order
+        self.done: Dict[Tuple[str, int], int] = {}        # (path, inode) -> furthest line end handled
+        self.saved: Dict[Tuple[str, int], int] = {}       # (path, inode) -> highest offset handed out
+
+    def add(self, line: _Line):
+        with self.lock:
+            self.in_flight.setdefault(line.path, {})[line] = None
+
+    def discard(self, line: _Line):
+        """The line is done (committed, or failed and skipped)"""
+        with self.lock:
+            key = (line.path, line.inode)
+            self.done[key] = max(self.done.get(key, 0), line.end)
+            lines = self.in_flight.get(line.path)
+            if lines is not None:
+                lines.pop(line, None)
+                if not lines:
+                    del self.in_flight[line.path]
+
+    def resume_at(self, line: _Line) -> Tuple[str, int, int, int]:
+        """(path, inode, size, offset) to save with this line's rewards; marks the line done"""
+        self.discard(line)
+        with self.lock:
+            key = (line.path, line.inode)
+            offset = self.done[key]
+            lines = self.in_flight.get(line.path)
+            if lines:
+                offset = min(offset, next(iter(lines)).start)
+            offset = max(offset, self.saved.get(key, 0))
+            self.saved[key] = offset
+            return line.path, line.inode, line.size, offset
+
+
+class LogEventPipeline:
+    """
+    Staged processing for tailed log lines:
+
+        reader -> [lines] -> parser -> [rewards x N shards] -> reward appliers -> [notify] -> notifiers
+
+    Stages are joined by bounded queues, so a burst fills the queues and then
+    pushes back on the reader instead of growing without limit, while slow
+    Discord/REST calls in the notifier stage no longer hold up rewards.
+    Activities are sharded by steam_id so each player's events stay in order.
+    """
+
+    def __init__(self, notify: Callable[[str, object], Awaitable[None]],
+                 on_command: Optional[Callable[[str, str, str], Awaitable[None]]] = None):
+        from utils.log_parser import log_parser
+        self.parser = log_parser
+        self.notify = notify
+        self.on_command = on_command
+
+        self.queue_size = max(1, int(config.get('log_pipeline_queue_size', 1000)))
+        self.reward_workers = max(1, int(config.get('log_pipeline_reward_workers', 2)))
+        self.notify_workers = max(1, int(config.get('log_pipeline_notify_workers', 1)))
+
+        self.lines: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self.rewards: List[asyncio.Queue] = [asyncio.Queue(self.queue_size) for _ in range(self.reward_workers)]
+        self.notifications: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self.tasks: List[asyncio.Task] = []
+        self.progress = _Progress()
+
+        self.counters = {'lines': 0, 'activities': 0, 'notifications': 0, 'errors': 0}
+        self._last_pressure_log = 0.0
+
+    def start(self):
+        """Spawn the stage workers (idempotent)"""
+        if self.tasks and not all(t.done() for t in self.tasks):
+            return
+        self.tasks = [asyncio.create_task(self._parse_worker())]
+        self.tasks += [asyncio.create_task(self._reward_worker(q)) for q in self.rewards]
+        self.tasks += [asyncio.create_task(self._notify_worker()) for _ in range(self.notify_workers)]
+
+    def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+
+    # --- Reader side ---
+    async def submit(self, path: str, offset: int, line: str, inode: int = 0, size: int = 0):
+        """Queue one raw line starting at byte `offset` of `path` (waits while the pipeline is full)"""
+        await self.lines.put((path, offset, line, inode, size))
+        self._check_pressure()
+
+    async def checkpoint(self, path: str, inode: int, size: int, offset: int):
+        """Save the checkpoint once every line submitted before it has been handled"""
+        await self.lines.put(_Checkpoint((path, inode, size, offset), len(self.rewards)))
+
+    async def join(self):
+        """Wait until everything submitted so far has gone through every stage"""
+        await self.lines.join()
+        for q in self.rewards:
+            await q.join()
+        await self.notifications.join()
+
+    # --- Stages ---
+    async def _parse_worker(self):
+        from utils.log_parser import LineDeduper
+        while True:
+            item = await self.lines.get()
+            try:
+                if isinstance(item, _Checkpoint):
+                    for q in self.rewards:
+                        await q.put(item)
+                    continue
+
+                path, offset, line, inode, size = item
+                self.counters['lines'] += 1
+                # One pass: activity for rewards + (author, content) for the chat relay
+                activity, relay = self.parser.classify_line(line, LineDeduper.make_key(path, offset, line))
+                if activity:
+                    source = _Line(path, inode, size, offset, offset + len(line.encode('utf-8')) + 1)
+                    self.progress.add(source)
+                    shard = hash(activity['steam_id']) % len(self.rewards)
+                    await self.rewards[shard].put((activity, source))
+                if relay:
+                    await self.notifications.put(('relay', relay))
+            except Exception as e:
+                self.counters['errors'] += 1
+                logging.error(f"Error in log parser stage: {e}")
+            finally:
+                self.lines.task_done()
+
+    async def _reward_worker(self, queue: asyncio.Queue):
+        while True:
+            item = await queue.get()
+            source = None
+            try:
+                if isinstance(item, _Checkpoint):
+                    item.pending -= 1
+                    if item.pending == 0:
+                        # Every line before it has been handled: resume here after a restart
+                        await asyncio.to_thread(self._save_barrier, item)
+                    continue
+
+                activity, source = item
+                # Special Case: Chat Command Handling
+                if activity['type'] == 'chat' and self.on_command:
+                    msg = activity['message'].strip()
+                    if msg.startswith('/') or msg.startswith('!'):
+                        asyncio.create_task(self.on_command(activity['player_name'], activity['steam_id'], msg))
+                elif activity['type'] == 'login':
+                    delivery_engine.player_online(activity['steam_id'])
+
+                # The line's offset commits in the same transaction as its rewards
+                reward, d_msg, g_msg = await self.parser.process_activity(
+                    activity, checkpoint=lambda: self.progress.resume_at(source)
+                )
+                self.counters['activities'] += 1
+                if d_msg:
+                    await self.notifications.put(('discord', d_msg))
+                if g_msg:
+                    await self.notifications.put(('broadcast', g_msg))
+            except Exception as e:
+                self.counters['errors'] += 1
+                logging.error(f"Error in activity processing, skipping the line: {e}")
+            finally:
+                if source is not None:
+                    self.progress.discard(source)
+                queue.task_done()
+
+    def _save_barrier(self, item: _Checkpoint):
+        """Save a chunk-end checkpoint without moving behind a line that already saved a later one (DB thread)"""
+        path, inode, size, offset = item.args
+        with db.lock:
+            db._save_log_checkpoint(*self.progress.resume_at(_Line(path, inode, size, offset, offset)))
+
+    async def _notify_worker(self):
+        while True:
+            kind, payload = await self.notifications.get()
+            try:
+                await self.notify(kind, payload)
+                self.counters['notifications'] += 1
+            except Exception as e:
+                self.counters['errors'] += 1
+                logging.error(f"Error sending {kind} notification: {e}")
+            finally:
+                self.notifications.task_done()
+
+    # --- Metrics ---
+    def stats(self) -> Dict:
+        """Queue depths and throughput counters"""
+        return {
+            'lines_queued': self.lines.qsize(),
+            'rewards_queued': [q.qsize() for q in self.rewards],
+            'notifications_queued': self.notifications.qsize(),
+            'queue_size': self.queue_size,
+            'reward_workers': self.reward_workers,
+            'notify_workers': self.notify_workers,
+            **self.counters
+        }
+
+    def _check_pressure(self):
+        """Log (at most every 30s) when a stage is backing up"""
+        depths = [self.lines.qsize(), self.notifications.qsize()] + [q.qsize() for q in self.rewards]
+        if max(depths) < self.queue_size * 0.8:
+            return
+        now = time.monotonic()
+        if now - self._last_pressure_log >= 30:
+            self._last_pressure_log = now
+            logging.warning(f"⚠️ Log pipeline backing up: {self.stats()}")
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional
+
+from utils.config_manager import config
+
+# Discord hard limits
+MAX_CONTENT = 2000
+MAX_EMBEDS = 10
+MAX_EMBED_CHARS = 6000
+
+
+def embed_length(embed) -> int:
+    """Characters Discord counts toward the 6000 limit: title, description, fields, footer, author"""
+    try:
+        return len(embed)  # nextcord.Embed.__len__ sums exactly those
+    except TypeError:
+        return 0
+
+
+class RouteBudget:
+    """
+    Token bucket mirroring a Discord route's rate limit (e.g. 5 messages / 5s
+    per channel) so we wait before nextcord's limiter would, and coalesce
+    more while waiting.
+    """
+
+    def __init__(self, limit: int, per: float):
+        self.limit = limit
+        self.per = per
+        self.tokens = float(limit)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.limit, self.tokens + (now - self.updated) * self.limit / self.per)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Seconds until a message may be sent"""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) * self.per / self.limit
+
+    def consume(self):
+        self._refill()
+        self.tokens -= 1
+
+
+class _Item:
+    __slots__ = ('group', 'text', 'embed')
+
+    def __init__(self, group, text: Optional[str], embed):
+        self.group = group
+        self.text = text
+        self.embed = embed
+
+
+class _Route:
+    def __init__(self, send, limit: int, per: float):
+        self.send = send
+        self.budget = RouteBudget(limit, per)
+        self.pending: List[_Item] = []
+        self.task: Optional[asyncio.Task] = None
+        self.sent_messages = 0
+        self.sent_items = 0
+
+
+class MessageAggregator:
+    """
+    Outbound Discord message coalescer. Notifications posted to the same
+    route (channel or webhook) within `window` seconds are merged into as
+    few messages as Discord's size limits allow: text lines are joined up to
+    2000 characters, embeds are packed 10 per message. Consecutive items
+    are only merged when they share a group (e.g. the webhook username).
+    """
+
+    def __init__(self):
+        self.routes: Dict[Hashable, _Route] = {}
+
+    @property
+    def window(self) -> float:
+        return float(config.get('discord_batch_window', 1.5))
+
+    def post(self, key: Hashable, send: Callable[..., Awaitable[None]], text: Optional[str] = None,
+             embed=None, group=None, limit: int = 5, per: float = 5.0):
+        """
+        Queue a message for route `key`. send(content=..., embeds=..., group=...)
+        performs the actual Discord call for a merged batch.
+        """
+        route = self.routes.get(key)
+        if route is None:
+            route = self.routes[key] = _Route(send, limit, per)
+        route.send = send
+        if text is not None and len(text) > MAX_CONTENT:
+            text = text[:MAX_CONTENT - 1] + '…'
+        route.pending.append(_Item(group, text, embed))
+        if route.task is None or route.task.done():
+            route.task = asyncio.create_task(self._drain(key, route))
+
+    def _take_batch(self, route: _Route) -> List[_Item]:
+        """Longest run of same-kind, same-group items that fits in one message"""
+        first = route.pending[0]
+        batch = [first]
+        size = len(first.text) if first.text is not None else embed_length(first.embed)
+        for item in route.pending[1:]:
+            if item.group != first.group or (item.text is None) != (first.text is None):
+                break
+            if first.text is not None:
+                size += 1 + len(item.text)
+                if size > MAX_CONTENT:
+                    break
+            else:
+                size += embed_length(item.embed)
+                if len(batch) >= MAX_EMBEDS or size > MAX_EMBED_CHARS:
+                    break
+            batch.append(item)
+        del route.pending[:len(batch)]
+        return batch
+
+    async def _drain(self, key, route: _Route):
+        # Collect for one window so a burst goes out together
+        await asyncio.sleep(self.window)
+        while route.pending:
+            delay = route.budget.delay()
+            if delay:
+                # Out of budget: keep collecting instead of queueing behind the rate limiter
+                await asyncio.sleep(delay)
+            batch = self._take_batch(route)
+            route.budget.consume()
+            try:
+                if batch[0].text is not None:
+                    await route.send(content="\n".join(item.text for item in batch), embeds=None, group=batch[0].group)
+                else:
+                    await route.send(content=None, embeds=[item.embed for item in batch], group=batch[0].group)
+                route.sent_messages += 1
+                route.sent_items += len(batch)
+            except Exception as e:
+                logging.error(f"Error sending batched Discord message to {key}: {e}")
+
+    async def flush_all(self):
+        """Wait for every route to send what it has (shutdown)"""
+        tasks = [route.task for route in self.routes.values() if route.task and not route.task.done()]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict:
+        """Per-route backlog and how much coalescing is happening"""
+        return {
+            str(key): {
+                'pending': len(route.pending),
+                'messages': route.sent_messages,
+                'items': route.sent_items,
+                'tokens': round(route.budget.tokens, 2)
+            }
+            for key, route in self.routes.items()
+        }
+
+
+# Global instance
+message_aggregator = MessageAggregator()
@@ -0,0 +1,164 @@
+import heapq
+import itertools
+import threading
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+def normalize_name(name: str) -> str:
+    """Case- and accent-insensitive form of a name ('Ünïcode' -> 'unicode', full-width -> ASCII)"""
+    name = name or ''
+    if not name.isascii():
+        decomposed = unicodedata.normalize('NFKD', name)
+        name = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(name.casefold().split())
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class NameIndex:
+    """
+    In-memory trigram index over player names.
+
+    Names are normalized (NFKD, accents dropped, casefolded). Queries of 3+
+    characters intersect the posting sets of their trigrams, smallest first,
+    and verify the survivors; shorter queries use a sorted list for prefix
+    matches and only fall back to scanning when that doesn't fill the
+    result. Results are ranked exact > prefix > word prefix > substring,
+    then online players, then most recently seen.
+    """
+
+    def __init__(self):
+        self.names: Dict[str, str] = {}        # steam_id -> display name
+        self.normalized: Dict[str, str] = {}   # steam_id -> normalized name
+        self.recency: Dict[str, int] = {}      # steam_id -> higher = seen more recently
+        self.postings: Dict[str, Set[str]] = {}
+        self.sorted_names: List[Tuple[str, str]] = []  # (normalized, steam_id)
+        self.seq = itertools.count()
+        self.lock = threading.Lock()
+        self.counters = {'queries': 0, 'scans': 0}
+
+    def load(self, rows: Iterable[Tuple[str, str]]):
+        """(steam_id, player_name) rows, least recently seen first"""
+        with self.lock:
+            self.names, self.normalized, self.recency, self.postings = {}, {}, {}, {}
+            for steam_id, name in rows:
+                self._add(steam_id, name)
+            self.sorted_names = sorted((norm, steam_id) for steam_id, norm in self.normalized.items())
+
+    def _add(self, steam_id: str, name: str):
+        norm = normalize_name(name)
+        self.names[steam_id] = name
+        self.normalized[steam_id] = norm
+        self.recency[steam_id] = next(self.seq)
+        for gram in trigrams(norm):
+            self.postings.setdefault(gram, set()).add(steam_id)
+        return norm
+
+    def _remove(self, steam_id: str):
+        norm = self.normalized.pop(steam_id)
+        del self.names[steam_id]
+        for gram in trigrams(norm):
+            posting = self.postings.get(gram)
+            if posting is not None:
+                posting.discard(steam_id)
+                if not posting:
+                    del self.postings[gram]
+        i = bisect_left(self.sorted_names, (norm, steam_id))
+        if i < len(self.sorted_names) and self.sorted_names[i] == (norm, steam_id):
+            del self.sorted_names[i]
+
+    def update(self, steam_id: str, name: str):
+        """Player was seen (new player, rename, or just active again)"""
+        with self.lock:
+            if self.names.get(steam_id) == name:
+                self.recency[steam_id] = next(self.seq)
+                return
+            if steam_id in self.names:
+                self._remove(steam_id)
+            norm = self._add(steam_id, name)
+            key = (norm, steam_id)
+            self.sorted_names.insert(bisect_left(self.sorted_names, key), key)
+
+    def _candidates(self, query: str, limit: int) -> Set[str]:
+        if len(query) >= 3:
+            postings = sorted((self.postings.get(gram, set()) for gram in trigrams(query)), key=len)
+            if not postings[0]:
+                return set()
+            found = set(postings[0])
+            for posting in postings[1:]:
+                found &= posting
+                if not found:
+                    break
+            return {sid for sid in found if query in self.normalized[sid]}
+
+        # Short query: prefix range of the sorted names first
+        found = set()
+        i = bisect_left(self.sorted_names, (query,))
+        while i < len(self.sorted_names) and self.sorted_names[i][0].startswith(query):
+            found.add(self.sorted_names[i][1])
+            i += 1
+        if len(found) < limit:
+            self.counters['scans'] += 1
+            for steam_id, norm in self.normalized.items():
+                if query in norm:
+                    found.add(steam_id)
+                    if len(found) >= limit * 4:
+                        break
+        return found
+
+    def search(self, query: str, limit: int = 25, online: Set[str] = frozenset()) -> List[Tuple[str, str]]:
+        """Best matches as [(steam_id, name)]; players in `online` rank ahead within a match type"""
+        norm = normalize_name(query)
+        with self.lock:
+            self.counters['queries'] += 1
+            if norm:
+                candidates = self._candidates(norm, limit)
+            else:
+                candidates = set(self.names)
+
+            def rank(steam_id: str):
+                name = self.normalized[steam_id]
+                if name == norm:
+                    kind = 0
+                elif name.startswith(norm):
+                    kind = 1
+                elif f" {norm}" in f" {name}":
+                    kind = 2
+                else:
+                    kind = 3
+                return kind, steam_id not in online, -self.recency[steam_id]
+
+            if len(candidates) > limit * 4:
+                best = heapq.nsmallest(limit * 4, candidates, key=rank)
+            else:
+                best = sorted(candidates, key=rank)
+
+            results, seen = [], set()
+            for steam_id in best:
+                name = self.names[steam_id]
+                if name in seen:
+                    continue  # Same name under several Steam IDs: list it once
+                seen.add(name)
+                results.append((steam_id, name))
+                if len(results) >= limit:
+                    break
+            return results
+
+    def exact(self, name: str) -> List[str]:
+        """steam_ids whose accent/case-folded name equals name's, most recently seen first"""
+        norm = normalize_name(name)
+        with self.lock:
+            i = bisect_left(self.sorted_names, (norm,))
+            matches = []
+            while i < len(self.sorted_names) and self.sorted_names[i][0] == norm:
+                matches.append(self.sorted_names[i][1])
+                i += 1
+            return sorted(matches, key=lambda sid: -self.recency[sid])
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {'names': len(self.names), 'trigrams': len(self.postings), **self.counters}
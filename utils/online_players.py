@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from utils.config_manager import config
+from utils.rest_api import rest_api
+
+JOINED = 'joined'
+LEFT = 'left'
+
+
+def normalize_id(player_id) -> str:
+    """'steam_7656...' and '7656...' compare equal"""
+    return str(player_id or '').replace('steam_', '')
+
+
+class OnlinePlayers:
+    """
+    Shared snapshot of the REST /v1/api/players list.
+
+    Snapshots younger than online_players_ttl seconds are served from
+    memory, and concurrent callers that find it stale share one in-flight
+    request (single-flight). Each refresh rebuilds O(1) lookups by userId,
+    playerId and name and emits joined/left events to subscribers, so cogs
+    don't need to poll and diff on their own.
+    """
+
+    def __init__(self):
+        self.players: List[Dict] = []
+        self.by_user_id: Dict[str, Dict] = {}
+        self.by_player_id: Dict[str, Dict] = {}
+        self.by_name: Dict[str, Dict] = {}
+        self.fetched_at = 0.0
+        self.available = False
+        self.primed = False
+        self._inflight: Optional[asyncio.Task] = None
+        self.listeners: List[Callable[[str, Dict], Awaitable[None]]] = []
+        self.counters = {'requests': 0, 'cache_hits': 0, 'coalesced': 0, 'failures': 0}
+
+    @property
+    def ttl(self) -> float:
+        return float(config.get('online_players_ttl', 5))
+
+    # --- Snapshot ---
+    async def refresh(self, max_age: float = None) -> bool:
+        """Make sure the snapshot is at most max_age (default: TTL) seconds old. False if the API failed."""
+        max_age = self.ttl if max_age is None else max_age
+        if self.available and time.monotonic() - self.fetched_at <= max_age:
+            self.counters['cache_hits'] += 1
+            return True
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self._fetch())
+        else:
+            self.counters['coalesced'] += 1
+        # Shielded: one caller being cancelled must not cancel the request for the others
+        return await asyncio.shield(self._inflight)
+
+    async def _fetch(self) -> bool:
+        self.counters['requests'] += 1
+        data = await rest_api.get_player_list()
+        if data is None:
+            self.counters['failures'] += 1
+            self.available = False
+            return False
+        self._apply([p for p in data.get('players', []) if p.get('userId')])
+        return True
+
+    def _apply(self, players: List[Dict]):
+        previous = self.by_user_id
+        self.players = players
+        self.by_user_id = {normalize_id(p.get('userId')): p for p in players}
+        self.by_player_id = {normalize_id(p.get('playerId')): p for p in players if p.get('playerId')}
+        self.by_name = {p.get('name'): p for p in players if p.get('name')}
+        self.fetched_at = time.monotonic()
+        self.available = True
+
+        if not self.primed:
+            # First snapshot after start/offline: everyone was already there
+            self.primed = True
+            return
+        for uid, player in self.by_user_id.items():
+            if uid not in previous:
+                self._emit(JOINED, player)
+        for uid, player in previous.items():
+            if uid not in self.by_user_id:
+                self._emit(LEFT, player)
+
+    def reset(self):
+        """Forget the snapshot (server went offline); the next one won't emit events"""
+        self.players = []
+        self.by_user_id, self.by_player_id, self.by_name = {}, {}, {}
+        self.available = False
+        self.primed = False
+
+    async def get_player_list(self, max_age: float = None) -> Optional[Dict]:
+        """Same shape as rest_api.get_player_list(), served from the shared snapshot"""
+        if not await self.refresh(max_age):
+            return None
+        return {'players': list(self.players)}
+
+    async def is_online(self, steam_id: str = None, name: str = None, max_age: float = None) -> Optional[bool]:
+        """Whether a player (by userId/playerId, or name) is online. None if the API is unreachable."""
+        if not await self.refresh(max_age):
+            return None
+        return self.find(steam_id, name) is not None
+
+    def find(self, steam_id: str = None, name: str = None) -> Optional[Dict]:
+        """Player entry from the current snapshot (no request)"""
+        if steam_id:
+            key = normalize_id(steam_id)
+            player = self.by_user_id.get(key) or self.by_player_id.get(key)
+            if player:
+                return player
+        if name:
+            return self.by_name.get(name)
+        return None
+
+    @property
+    def count(self) -> int:
+        return len(self.players)
+
+    # --- Events ---
+    def subscribe(self, callback: Callable[[str, Dict], Awaitable[None]]):
+        """callback(kind, player) is awaited for every JOINED / LEFT"""
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def _emit(self, kind: str, player: Dict):
+        for callback in list(self.listeners):
+            asyncio.create_task(self._deliver(callback, kind, player))
+
+    async def _deliver(self, callback, kind: str, player: Dict):
+        try:
+            await callback(kind, player)
+        except Exception as e:
+            logging.error(f"Error in online player {kind} listener: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            'online': len(self.players),
+            'age': round(time.monotonic() - self.fetched_at, 1) if self.fetched_at else None,
+            'listeners': len(self.listeners),
+            **self.counters
+        }
+
+
+# Global instance
+online_players = OnlinePlayers()
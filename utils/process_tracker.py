@@ -0,0 +1,154 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+import psutil
+
+from utils.config_manager import config
+
+# Lower-case name fragments of the actual server binaries
+SERVER_BINARIES = ["palserver.exe", "palserver-win64-shipping.exe", "palserver-win64-shipping-cmd.exe",
+                   "palserver-linux"]
+
+
+class ServerProcessTracker:
+    """
+    Keeps a handle on the running Palworld server process.
+
+    The PID is recorded when start_server launches the server (the launcher
+    script's children are searched for the binary), or found by one scan of
+    the process table. After that, "is it running?" is a single check of that
+    PID (psutil also compares the creation time, so a reused PID isn't
+    mistaken for the server). Only when the tracked process goes away does
+    the tracker fall back to scanning every process again; while nothing is
+    tracked (server offline) scans run at most every process_scan_interval
+    seconds.
+    """
+
+    def __init__(self):
+        self.process: Optional[psutil.Process] = None
+        self.launcher: Optional[psutil.Process] = None
+        self.lock = threading.Lock()
+        self.last_scan = 0.0
+        self.counters = {'checks': 0, 'pid_hits': 0, 'child_lookups': 0, 'scans': 0}
+
+    @staticmethod
+    def _is_server(proc: psutil.Process) -> bool:
+        try:
+            name = (proc.name() or '').lower()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return False
+        return any(bin_name in name for bin_name in SERVER_BINARIES)
+
+    @staticmethod
+    def _alive(proc: Optional[psutil.Process]) -> bool:
+        try:
+            return bool(proc) and proc.is_running() and proc.status() != psutil.STATUS_ZOMBIE
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return False
+
+    @staticmethod
+    def _pick(candidates: List[psutil.Process]) -> Optional[psutil.Process]:
+        """PalServer.exe spawns the Shipping binary, which is the one doing the work"""
+        if not candidates:
+            return None
+        for proc in candidates:
+            try:
+                if 'shipping' in proc.name().lower():
+                    return proc
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return candidates[0]
+
+    def launched(self, pid: int):
+        """start_server spawned the launcher script with this PID"""
+        with self.lock:
+            try:
+                self.launcher = psutil.Process(pid)
+            except psutil.NoSuchProcess:
+                self.launcher = None
+            self.process = None
+
+    def forget(self):
+        """Server was stopped on purpose"""
+        with self.lock:
+            self.process = None
+            self.launcher = None
+
+    def _from_launcher(self) -> Optional[psutil.Process]:
+        if not self._alive(self.launcher):
+            self.launcher = None
+            return None
+        self.counters['child_lookups'] += 1
+        try:
+            children = self.launcher.children(recursive=True)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+        return self._pick([child for child in children if self._is_server(child)])
+
+    def _scan(self) -> Optional[psutil.Process]:
+        self.counters['scans'] += 1
+        candidates = []
+        try:
+            # Fetching only 'name' is significantly faster than 'exe' or other fields
+            for proc in psutil.process_iter(['name']):
+                name = (proc.info.get('name') or '').lower()
+                if name and any(bin_name in name for bin_name in SERVER_BINARIES):
+                    candidates.append(proc)
+        except Exception as e:
+            print(f"⚠️ Error checking processes: {e}")
+        return self._pick(candidates)
+
+    def find(self, force: bool = False) -> Optional[psutil.Process]:
+        """The server process: tracked PID, else the launcher's children, else a full scan"""
+        with self.lock:
+            self.counters['checks'] += 1
+            if self._alive(self.process):
+                self.counters['pid_hits'] += 1
+                return self.process
+
+            previous = self.process
+            self.process = self._from_launcher()
+            # Scan right away when the tracked process just vanished (it may have been restarted)
+            scan_due = time.monotonic() - self.last_scan >= float(config.get('process_scan_interval', 10))
+            if self.process is None and (force or previous is not None or scan_due):
+                self.last_scan = time.monotonic()
+                self.process = self._scan()
+            if self.process and (previous is None or previous.pid != self.process.pid):
+                print(f"🔎 Tracking Palworld server process PID {self.process.pid}")
+            return self.process
+
+    def is_running(self, force: bool = False) -> bool:
+        return self.find(force) is not None
+
+    def sample(self) -> Optional[Dict]:
+        """CPU and memory of the server process (None when it isn't running)"""
+        proc = self.find()
+        if proc is None:
+            return None
+        try:
+            with proc.oneshot():
+                # cpu_percent compares against the previous call on this same Process object
+                cpu = proc.cpu_percent(interval=None) / (psutil.cpu_count() or 1)
+                memory = proc.memory_info()
+                return {
+                    'pid': proc.pid,
+                    'name': proc.name(),
+                    'cpu_percent': round(cpu, 1),
+                    'rss_mb': round(memory.rss / (1024 ** 2), 1),
+                    'threads': proc.num_threads(),
+                    'uptime': round(time.time() - proc.create_time())
+                }
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+
+    def stats(self) -> Dict:
+        return {
+            'pid': self.process.pid if self.process else None,
+            'launcher_pid': self.launcher.pid if self.launcher else None,
+            **self.counters
+        }
+
+
+# Global instance
+server_process = ServerProcessTracker()
@@ -1,9 +1,421 @@
 import asyncio
+import itertools
 import struct
-from typing import Optional, Tuple
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
 from utils.config_manager import config
 
 
+class RconPacketReader:
+    """
+    Incremental RCON framer. Socket reads land in one reusable buffer and
+    every complete size-prefixed packet in it is parsed in place through a
+    memoryview, so packets that arrive together are split correctly and a
+    packet cut across reads simply waits for the rest.
+    """
+    
+    MAX_PACKET = 1 << 20  # Anything larger means we've lost sync with the stream
+    _SIZE = struct.Struct('<i')
+    _HEADER = struct.Struct('<ii')
+    
+    def __init__(self, reader: asyncio.StreamReader, chunk_size: int = 65536):
+        self.reader = reader
+        self.chunk_size = chunk_size
+        self.buffer = bytearray()
+        self.ready: deque = deque()
+    
+    def feed(self, data: bytes) -> int:
+        """Append raw bytes and parse every complete packet; returns how many were parsed"""
+        self.buffer += data
+        parsed = 0
+        pos = 0
+        with memoryview(self.buffer) as view:
+            end = len(view)
+            while end - pos >= 4:
+                size = self._SIZE.unpack_from(view, pos)[0]
+                if size < 10 or size > self.MAX_PACKET:
+                    raise ConnectionError(f"Malformed RCON packet (size {size})")
+                if end - pos - 4 < size:
+                    break
+                request_id, packet_type = self._HEADER.unpack_from(view, pos + 4)
+                # Body runs up to the two null terminators
+                body = str(view[pos + 12:pos + 4 + size - 2], 'utf-8', 'ignore')
+                self.ready.append((request_id, packet_type, body))
+                pos += 4 + size
+                parsed += 1
+        if pos:
+            del self.buffer[:pos]
+        return parsed
+    
+    async def read_packet(self) -> Tuple[int, int, str]:
+        """Next packet as (request_id, type, body)"""
+        while not self.ready:
+            data = await self.reader.read(self.chunk_size)
+            if not data:
+                raise ConnectionError("closed by server")
+            self.feed(data)
+        return self.ready.popleft()
+
+
+class _PendingResponse:
+    """Fragments collected so far for one command"""
+    
+    __slots__ = ('future', 'fragments', 'sentinel')
+    
+    def __init__(self, future: asyncio.Future, sentinel: Optional[int]):
+        self.future = future
+        self.fragments: List[str] = []
+        self.sentinel = sentinel
+    
+    def finish(self):
+        if not self.future.done():
+            self.future.set_result(''.join(self.fragments))
+
+
+class RconSession:
+    """
+    One long-lived, authenticated RCON connection. Commands are tagged with
+    request IDs and matched to responses by a background reader, so several
+    can be in flight at once; the connect+auth handshake is paid once.
+    Drops are detected by the reader and healed on the next command, with
+    exponential backoff between failed connection attempts.
+    
+    Large responses are split by the server into several packets. After each
+    command an empty RESPONSE_VALUE "sentinel" is sent; servers that mirror
+    it do so only after the command's last packet, so fragments are joined
+    until the sentinel comes back. Until the server is seen mirroring, a
+    packet shorter than a full fragment is taken as the last one. A packet
+    under an unknown ID only goes to a command when it is the only one in
+    flight; otherwise it is dropped and counted in `unmatched`.
+    """
+    
+    BACKOFF_MIN = 0.5
+    BACKOFF_MAX = 30.0
+    # A body this long may be followed by a continuation packet
+    FRAGMENT_BODY = 4000
+    
+    def __init__(self, utility: 'RconUtility', host: str, port: int, password: str):
+        self.utility = utility
+        self.host = host
+        self.port = port
+        self.password = password
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.packets: Optional[RconPacketReader] = None
+        self.reader_task: Optional[asyncio.Task] = None
+        self.pending: Dict[int, _PendingResponse] = {}
+        # sentinel request ID -> command request ID
+        self.sentinels: Dict[int, int] = {}
+        # Sentinels already resolved; their (possibly doubled) echoes are dropped
+        self.retired: deque = deque(maxlen=64)
+        self.sentinel_echo = False
+        self.connect_lock = asyncio.Lock()
+        self.send_lock = asyncio.Lock()
+        self.backoff = 0.0
+        self.next_attempt = 0.0
+        self.connects = 0
+        self.commands = 0
+        self.unmatched = 0  # Packets no command could be matched to (dropped)
+    
+    @property
+    def connected(self) -> bool:
+        return self.writer is not None and not self.writer.is_closing() and self.reader_task is not None and not self.reader_task.done()
+    
+    async def _read_packet(self) -> Tuple[int, int, str]:
+        """Read exactly one size-prefixed packet"""
+        return await self.packets.read_packet()
+    
+    async def connect(self, timeout: float = 5.0) -> bool:
+        """Open and authenticate the connection (no-op if already up)"""
+        async with self.connect_lock:
+            if self.connected:
+                return True
+            
+            # Respect the reconnect backoff, but never wait longer than the caller would
+            wait = self.next_attempt - time.monotonic()
+            if wait > timeout:
+                return False
+            if wait > 0:
+                await asyncio.sleep(wait)
+            
+            try:
+                self.reader, self.writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port),
+                    timeout=timeout
+                )
+                self.packets = RconPacketReader(self.reader)
+                self.sentinels.clear()
+                self.sentinel_echo = False
+                
+                # Authenticate
+                auth_packet = self.utility._pack_packet(self.utility.SERVERDATA_AUTH, self.password)
+                auth_request_id = struct.unpack('<i', auth_packet[4:8])[0]
+                self.writer.write(auth_packet)
+                await self.writer.drain()
+                
+                # Some servers send an empty RESPONSE_VALUE before the AUTH_RESPONSE
+                while True:
+                    auth_id, auth_type, _ = await asyncio.wait_for(self._read_packet(), timeout=timeout)
+                    if auth_type == self.utility.SERVERDATA_AUTH_RESPONSE or auth_id == -1:
+                        break
+                
+                if auth_id == -1 or auth_id != auth_request_id:
+                    print("❌ RCON authentication failed - incorrect password")
+                    await self._close()
+                    self._schedule_retry()
+                    return False
+            except asyncio.TimeoutError:
+                print(f"❌ RCON timeout connecting to {self.host}:{self.port}")
+                await self._close()
+                self._schedule_retry()
+                return False
+            except ConnectionRefusedError:
+                print(f"❌ RCON connection refused to {self.host}:{self.port} - Is RCON enabled?")
+                await self._close()
+                self._schedule_retry()
+                return False
+            except Exception as e:
+                print(f"❌ RCON error: {e}")
+                await self._close()
+                self._schedule_retry()
+                return False
+            
+            self.backoff = 0.0
+            self.next_attempt = 0.0
+            self.connects += 1
+            self.reader_task = asyncio.create_task(self._reader_loop())
+            return True
+    
+    def _schedule_retry(self):
+        self.backoff = min(self.BACKOFF_MAX, max(self.BACKOFF_MIN, self.backoff * 2))
+        self.next_attempt = time.monotonic() + self.backoff
+    
+    async def _reader_loop(self):
+        """Route every incoming packet to the command waiting for its request ID"""
+        writer, packets = self.writer, self.packets
+        try:
+            while True:
+                request_id, _, body = await packets.read_packet()
+                if request_id in self.sentinels:
+                    # Mirrored sentinel: every packet of that command has arrived
+                    self.sentinel_echo = True
+                    self._complete(self.sentinels[request_id])
+                    continue
+                if request_id in self.retired:
+                    # Late or duplicate sentinel echo (Source servers send two)
+                    self.sentinel_echo = True
+                    continue
+                
+                response = self.pending.get(request_id)
+                if response is None and body and len(self.pending) == 1 and not self.sentinel_echo:
+                    # Server didn't echo our ID: with one command in flight it can only be its output
+                    # (an empty packet looks exactly like a sentinel reply, so it isn't taken)
+                    request_id = next(iter(self.pending))
+                    response = self.pending[request_id]
+                if response is None:
+                    # With several in flight there's no telling whose it is (e.g. a sentinel
+                    # reply under another ID): guessing would corrupt another command's output
+                    self.unmatched += 1
+                    continue
+                response.fragments.append(body)
+                if response.sentinel is None or (not self.sentinel_echo and len(body) < self.FRAGMENT_BODY):
+                    self._complete(request_id)
+        except (asyncio.IncompleteReadError, ConnectionError, OSError) as e:
+            if self.pending:
+                print(f"⚠️ RCON connection to {self.host}:{self.port} lost: {e or 'closed by server'}")
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._fail_pending(ConnectionError("RCON connection closed"))
+            writer.close()
+    
+    def _complete(self, request_id: int):
+        """Resolve a command with the fragments collected so far"""
+        response = self.pending.pop(request_id, None)
+        if response is None:
+            return
+        if response.sentinel is not None:
+            self.sentinels.pop(response.sentinel, None)
+            self.retired.append(response.sentinel)
+        response.finish()
+    
+    def _fail_pending(self, error: Exception):
+        for response in self.pending.values():
+            if not response.future.done():
+                response.future.set_exception(error)
+        self.pending.clear()
+        self.sentinels.clear()
+    
+    async def execute(self, command: str, timeout: float = 5.0) -> Optional[str]:
+        """Send one command and wait for its response (None on failure). Pacing is RconScheduler's job."""
+        if not self.connected and not await self.connect(timeout):
+            return None
+        
+        loop = asyncio.get_running_loop()
+        async with self.send_lock:
+            packet = self.utility._pack_packet(self.utility.SERVERDATA_EXECCOMMAND, command)
+            request_id = struct.unpack('<i', packet[4:8])[0]
+            sentinel = None
+            if config.get('rcon_multipacket', True):
+                # Empty RESPONSE_VALUE right behind the command marks the end of its output
+                sentinel_packet = self.utility._pack_packet(self.utility.SERVERDATA_RESPONSE_VALUE, '')
+                sentinel = struct.unpack('<i', sentinel_packet[4:8])[0]
+                packet += sentinel_packet
+                self.sentinels[sentinel] = request_id
+            response = _PendingResponse(loop.create_future(), sentinel)
+            self.pending[request_id] = response
+            try:
+                self.writer.write(packet)
+                await self.writer.drain()
+            except Exception as e:
+                self.pending.pop(request_id, None)
+                self.sentinels.pop(sentinel, None)
+                print(f"❌ RCON error: {e}")
+                await self._close()
+                return None
+            self.commands += 1
+        
+        try:
+            body = await asyncio.wait_for(asyncio.shield(response.future), timeout=timeout)
+        except asyncio.TimeoutError:
+            self._complete(request_id)
+            if response.fragments:
+                # Sentinel never came back but we have output: better than nothing
+                return ''.join(response.fragments).strip()
+            print(f"❌ RCON timeout waiting for response from {self.host}:{self.port}")
+            return None
+        except ConnectionError:
+            return None
+        return body.strip()
+    
+    async def _close(self):
+        if self.reader_task and not self.reader_task.done():
+            self.reader_task.cancel()
+        self.reader_task = None
+        if self.writer:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+        self.reader = self.writer = None
+        self.packets = None
+    
+    async def close(self):
+        """Close the connection and fail anything still waiting"""
+        await self._close()
+        self._fail_pending(ConnectionError("RCON session closed"))
+
+
+class RconScheduler:
+    """
+    Priority queue + token bucket in front of the RCON session. Commands are
+    released highest class first (admin > purchase delivery > broadcast >
+    private tell), at most rcon_rate per second with bursts up to
+    rcon_burst, and at most rcon_max_in_flight awaiting a response. Each
+    class has a bounded backlog; beyond it new commands are refused
+    immediately instead of piling up.
+    """
+    
+    CLASSES = {0: 'admin', 1: 'delivery', 2: 'broadcast', 3: 'tell'}
+    
+    def __init__(self):
+        self.queue: Optional[asyncio.PriorityQueue] = None
+        self.dispatcher: Optional[asyncio.Task] = None
+        self.slots: Optional[asyncio.Semaphore] = None
+        self.seq = itertools.count()
+        self.tokens = None
+        self.updated = time.monotonic()
+        self.backlog = {p: 0 for p in self.CLASSES}
+        self.sent = {p: 0 for p in self.CLASSES}
+        self.rejected = {p: 0 for p in self.CLASSES}
+        self.wait_total = {p: 0.0 for p in self.CLASSES}
+        self.wait_max = {p: 0.0 for p in self.CLASSES}
+    
+    @property
+    def rate(self) -> float:
+        return max(0.1, float(config.get('rcon_rate', 5)))
+    
+    @property
+    def burst(self) -> float:
+        return max(1.0, float(config.get('rcon_burst', 10)))
+    
+    async def _take_token(self):
+        """Wait for the token bucket"""
+        while True:
+            now = time.monotonic()
+            if self.tokens is None:
+                self.tokens = self.burst
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+    
+    async def submit(self, session: RconSession, command: str, priority: int, timeout: float = 5.0) -> Optional[str]:
+        """Queue a command and wait for its response (None if refused or failed)"""
+        priority = priority if priority in self.CLASSES else max(self.CLASSES)
+        if self.backlog[priority] >= int(config.get('rcon_backlog', 200)):
+            self.rejected[priority] += 1
+            print(f"⚠️ RCON {self.CLASSES[priority]} backlog full, dropping: {command[:60]}")
+            return None
+        
+        loop = asyncio.get_running_loop()
+        if self.dispatcher is None or self.dispatcher.done():
+            self.queue = asyncio.PriorityQueue()
+            self.slots = asyncio.Semaphore(max(1, int(config.get('rcon_max_in_flight', 4))))
+            self.backlog = {p: 0 for p in self.CLASSES}
+            self.dispatcher = asyncio.create_task(self._dispatch())
+        
+        future = loop.create_future()
+        self.backlog[priority] += 1
+        self.queue.put_nowait((priority, next(self.seq), time.monotonic(), session, command, timeout, future))
+        return await future
+    
+    async def _dispatch(self):
+        while True:
+            # Take a response slot first, so the item chosen is the most urgent one at send time
+            await self.slots.acquire()
+            priority, _, queued_at, session, command, timeout, future = await self.queue.get()
+            self.backlog[priority] -= 1
+            if future.done():
+                self.slots.release()
+                continue
+            await self._take_token()
+            
+            waited = time.monotonic() - queued_at
+            self.wait_total[priority] += waited
+            self.wait_max[priority] = max(self.wait_max[priority], waited)
+            self.sent[priority] += 1
+            asyncio.create_task(self._run(session, command, timeout, future))
+    
+    async def _run(self, session: RconSession, command: str, timeout: float, future: asyncio.Future):
+        try:
+            response = await session.execute(command, timeout)
+            if not future.done():
+                future.set_result(response)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        finally:
+            self.slots.release()
+    
+    def stats(self) -> Dict:
+        """Backlog, throughput and queueing delay per priority class"""
+        return {
+            name: {
+                'queued': self.backlog[p],
+                'sent': self.sent[p],
+                'rejected': self.rejected[p],
+                'avg_wait': round(self.wait_total[p] / self.sent[p], 3) if self.sent[p] else 0.0,
+                'max_wait': round(self.wait_max[p], 3)
+            }
+            for p, name in self.CLASSES.items()
+        }
+
+
 class RconUtility:
     """RCON utility for sending commands to PalGuard/PalDefender"""
     
@@ -13,14 +425,22 @@ class RconUtility:
     SERVERDATA_EXECCOMMAND = 2
     SERVERDATA_RESPONSE_VALUE = 0
     
+    # Scheduling classes (lower goes first)
+    PRIORITY_ADMIN = 0
+    PRIORITY_DELIVERY = 1
+    PRIORITY_BROADCAST = 2
+    PRIORITY_TELL = 3
+    
     def __init__(self):
         self.request_id = 0
-        self.lock = asyncio.Lock()
+        self.session: Optional[RconSession] = None
+        self.scheduler = RconScheduler()
         self.tell_works = True # Track if 'tell' command is supported
     
     def _pack_packet(self, packet_type: int, body: str) -> bytes:
         """Pack an RCON packet"""
-        self.request_id += 1
+        # IDs must stay positive int32 (-1 means auth failure)
+        self.request_id = self.request_id % 0x7FFFFFFF + 1
         body_bytes = body.encode('utf-8')
         
         # Packet structure: size (4 bytes) + id (4 bytes) + type (4 bytes) + body + null terminators (2 bytes)
@@ -48,13 +468,14 @@ class RconUtility:
         
         return request_id, packet_type, body
     
-    async def rcon_command(self, server_info: dict, command: str) -> Optional[str]:
+    async def rcon_command(self, server_info: dict, command: str, priority: int = PRIORITY_ADMIN) -> Optional[str]:
         """
-        Send an RCON command to the server
+        Send an RCON command to the server over the shared persistent session
         
         Args:
             server_info: Dict with 'host', 'port', 'password'
             command: The RCON command to execute
+            priority: Scheduling class (PRIORITY_ADMIN ... PRIORITY_TELL)
             
         Returns:
             Response string or None if failed
@@ -67,58 +488,24 @@ class RconUtility:
             print("⚠️ RCON password not configured")
             return None
         
-        async with self.lock:
-            try:
-                # Connect to RCON server
-                reader, writer = await asyncio.wait_for(
-                    asyncio.open_connection(host, port),
-                    timeout=5.0
-                )
-                
-                # Authenticate
-                auth_packet = self._pack_packet(self.SERVERDATA_AUTH, password)
-                writer.write(auth_packet)
-                await writer.drain()
-                
-                # Read auth response
-                auth_response = await asyncio.wait_for(reader.read(4096), timeout=5.0)
-                auth_id, auth_type, _ = self._unpack_packet(auth_response)
-                
-                if auth_id == -1:
-                    print("❌ RCON authentication failed - incorrect password")
-                    writer.close()
-                    await writer.wait_closed()
-                    return None
-                
-                # Send command
-                cmd_packet = self._pack_packet(self.SERVERDATA_EXECCOMMAND, command)
-                writer.write(cmd_packet)
-                await writer.drain()
-                
-                # Read response
-                response_data = await asyncio.wait_for(reader.read(4096), timeout=5.0)
-                _, _, response = self._unpack_packet(response_data)
-                
-                # Close connection
-                writer.close()
-                await writer.wait_closed()
-                
-                # Mandatory delay to prevent server flooding (Palworld RCON is unstable)
-                await asyncio.sleep(0.5)
-                
-                return response.strip()
-                
-            except asyncio.TimeoutError:
-                print(f"❌ RCON timeout connecting to {host}:{port}")
-                return None
-            except ConnectionRefusedError:
-                print(f"❌ RCON connection refused to {host}:{port} - Is RCON enabled?")
-                return None
-            except Exception as e:
-                print(f"❌ RCON error: {e}")
-                return None
+        return await self.scheduler.submit(self.get_session(host, port, password), command, priority)
+    
+    def get_session(self, host: str, port: int, password: str) -> RconSession:
+        """The persistent session for these settings (replaced when the config changes)"""
+        session = self.session
+        if session is None or (session.host, session.port, session.password) != (host, port, password):
+            if session is not None:
+                asyncio.create_task(session.close())
+            session = self.session = RconSession(self, host, port, password)
+        return session
+    
+    async def close(self):
+        """Close the persistent RCON connection (shutdown)"""
+        if self.session:
+            await self.session.close()
+            self.session = None
     
-    async def broadcast(self, message: str) -> bool:
+    async def broadcast(self, message: str, priority: int = PRIORITY_BROADCAST) -> bool:
         """
         Send a broadcast message to all players on the server.
         Tries REST API first (most reliable), then falls back to RCON.
@@ -140,18 +527,18 @@ class RconUtility:
             
         # Many RCON implementations prefer NO quotes, or handle them weirdly.
         command = f"Broadcast {message}"
-        response = await self.rcon_command(server_info, command)
+        response = await self.rcon_command(server_info, command, priority)
         
         return response is not None
 
-    async def send_private_message(self, steam_id: str, message: str) -> bool:
+    async def send_private_message(self, steam_id: str, message: str, priority: int = PRIORITY_TELL) -> bool:
         """
         Send a private message to a specific player via PalGuard/PalDefender 'tell' command.
         """
         if not self.tell_works:
             # Fallback to broadcast if private messaging isn't possible
             # We prefix with [PRIVATE-MSG] so players know it was meant for them
-            await self.broadcast(f"[MSG] @{steam_id}: {message}")
+            await self.broadcast(f"[MSG] @{steam_id}: {message}", priority)
             return False
 
         server_info = self._get_server_info()
@@ -163,12 +550,12 @@ class RconUtility:
 
         # Try with raw ID first as it's most common for tell
         cmd = f'tell {id_no_prefix} "{message}"'
-        resp = await self.rcon_command(server_info, cmd)
+        resp = await self.rcon_command(server_info, cmd, priority)
         
         # Fallback for PalGuard: some versions use 'pg tell'
         if resp == "Unknown command":
             cmd = f'pg tell {id_no_prefix} "{message}"'
-            resp = await self.rcon_command(server_info, cmd)
+            resp = await self.rcon_command(server_info, cmd, priority)
             if resp != "Unknown command":
                 # It worked with pg! We can continue.
                 return resp is not None
@@ -182,14 +569,14 @@ class RconUtility:
         # Legacy prefix fallbacks
         if resp is None or "not found" in resp.lower() or "error" in resp.lower():
             cmd = f'tell {id_with_prefix} "{message}"'
-            resp = await self.rcon_command(server_info, cmd)
+            resp = await self.rcon_command(server_info, cmd, priority)
 
         if resp is not None:
             print(f"📡 [TELL] Sent to {id_no_prefix}: {message} (Resp: {resp})")
             return True
         return False
 
-    async def give_item(self, steam_id: str, item_id: str, amount: int) -> Tuple[bool, str]:
+    async def give_item(self, steam_id: str, item_id: str, amount: int, priority: int = PRIORITY_DELIVERY) -> Tuple[bool, str]:
         """
         Give an item to a player
         """
@@ -198,7 +585,7 @@ class RconUtility:
             return False, "RCON not configured"
         
         command = f"give {steam_id} {item_id} {amount}"
-        response = await self.rcon_command(server_info, command)
+        response = await self.rcon_command(server_info, command, priority)
         
         if response is not None:
             lower_resp = response.lower()
@@ -207,7 +594,7 @@ class RconUtility:
             return True, response
         return False, "RCON Timeout/No Response"
     
-    async def give_exp(self, steam_id: str, amount: int) -> Tuple[bool, str]:
+    async def give_exp(self, steam_id: str, amount: int, priority: int = PRIORITY_DELIVERY) -> Tuple[bool, str]:
         """
         Give experience to a player
         """
@@ -216,7 +603,7 @@ class RconUtility:
             return False, "RCON not configured"
             
         command = f"give_exp {steam_id} {amount}"
-        response = await self.rcon_command(server_info, command)
+        response = await self.rcon_command(server_info, command, priority)
         
         if response is not None:
             lower_resp = response.lower()
@@ -225,7 +612,7 @@ class RconUtility:
             return True, response
         return False, "RCON Timeout/No Response"
 
-    async def give_pal_standard(self, steam_id: str, pal_id: str, level: int = 1) -> Tuple[bool, str]:
+    async def give_pal_standard(self, steam_id: str, pal_id: str, level: int = 1, priority: int = PRIORITY_DELIVERY) -> Tuple[bool, str]:
         """
         Give a base game Pal using PalGuard/PalDefender 'givepal' command.
         Includes a fallback to givepal_j if file-not-found error occurs.
@@ -235,17 +622,17 @@ class RconUtility:
 
         # Try givepal first
         cmd = f"givepal {steam_id} {pal_id} {level}"
-        resp = await self.rcon_command(server_info, cmd)
+        resp = await self.rcon_command(server_info, cmd, priority)
         
         success = resp is not None and (resp == "" or any(x in resp.lower() for x in ["success", "spawned", "sent", "ok", "added", "given", "granted", "active"]))
         
         if not success and resp and ("could not import" in resp.lower() or "not found" in resp.lower()):
             # Fallback: maybe it's a template?
-            return await self.give_pal_template(steam_id, pal_id)
+            return await self.give_pal_template(steam_id, pal_id, priority)
             
         return success, resp
 
-    async def give_pal_template(self, steam_id: str, template_name: str) -> Tuple[bool, str]:
+    async def give_pal_template(self, steam_id: str, template_name: str, priority: int = PRIORITY_DELIVERY) -> Tuple[bool, str]:
         """
         Give a custom Pal using 'givepal_j' command.
         Includes a lowercase fallback for case-sensitive filenames.
@@ -254,7 +641,7 @@ class RconUtility:
         if not server_info: return False, "RCON not configured"
 
         cmd = f"givepal_j {steam_id} {template_name}"
-        resp = await self.rcon_command(server_info, cmd)
+        resp = await self.rcon_command(server_info, cmd, priority)
         
         success = resp is not None and (resp == "" or any(x in resp.lower() for x in ["success", "spawned", "sent", "ok", "added", "given", "granted", "active"]))
         
@@ -262,7 +649,7 @@ class RconUtility:
         if not success and resp and "could not import" in resp.lower() and template_name != template_name.lower():
             # Try lowercase
             cmd = f"givepal_j {steam_id} {template_name.lower()}"
-            resp = await self.rcon_command(server_info, cmd)
+            resp = await self.rcon_command(server_info, cmd, priority)
             success = resp is not None and (resp == "" or any(x in resp.lower() for x in ["success", "spawned", "sent", "ok", "added", "given", "granted", "active"]))
             
         return success, resp
@@ -1,7 +1,96 @@
 import aiohttp
 import asyncio
+import time
 from typing import Optional, Dict, Any
 from utils.config_manager import config
+from utils.http_client import http_client
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker.
+    
+    closed    - requests go through; `failure_threshold` consecutive failures open it
+    open      - requests fail immediately until `retry_after` seconds have passed
+    half_open - a single probe goes through: success closes the circuit,
+                failure re-opens it with the wait doubled (up to `max_reset_timeout`)
+    
+    Only "server unreachable" outcomes count as failures (timeouts, refused
+    connections, 5xx); a 401/404 means the server answered.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 5.0, max_reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.retry_after = reset_timeout
+        self.probe_in_flight = False
+        self.probe_started = 0.0
+        self.last_error = None
+        self.rejected = 0
+    
+    def allow(self) -> bool:
+        """Whether a request may be sent now"""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.retry_after:
+            self.state = self.HALF_OPEN
+            self.probe_in_flight = False
+        # A probe that never reported back (caller cancelled) doesn't block the circuit forever
+        if self.state == self.HALF_OPEN and (not self.probe_in_flight or time.monotonic() - self.probe_started > 10):
+            self.probe_in_flight = True
+            self.probe_started = time.monotonic()
+            return True
+        self.rejected += 1
+        return False
+    
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed (0 when closed)"""
+        if self.state == self.CLOSED:
+            return 0.0
+        return max(0.0, self.opened_at + self.retry_after - time.monotonic())
+    
+    def record_success(self):
+        if self.state != self.CLOSED:
+            print(f"✅ REST API {self.name} reachable again, circuit closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self.retry_after = self.reset_timeout
+        self.probe_in_flight = False
+    
+    def record_failure(self, error: str):
+        self.failures += 1
+        self.last_error = error
+        if self.state == self.HALF_OPEN:
+            # Probe failed: wait longer before the next one
+            self.retry_after = min(self.max_reset_timeout, self.retry_after * 2)
+            self._open()
+        elif self.state == self.CLOSED and self.failures >= self.failure_threshold:
+            self.retry_after = self.reset_timeout
+            self._open()
+            print(f"⚡ REST API {self.name} unreachable ({error}), failing fast for {self.retry_after:g}s")
+    
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.probe_in_flight = False
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'retry_in': round(self.retry_in(), 1),
+            'rejected': self.rejected,
+            'last_error': self.last_error
+        }
 
 
 class RestApiHandler:
@@ -12,17 +101,19 @@ class RestApiHandler:
         self.base_url = config.get('rest_api_endpoint', '')
         self.api_key = config.get('rest_api_key', '')
         self.last_error = None
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.probes: Dict[str, asyncio.Task] = {}
         
     async def initialize(self):
-        """Initialize the HTTP session"""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
+        """Attach to the bot's shared HTTP session (kept-alive connections to the server)"""
+        self.session = await http_client.get_session()
     
     async def close(self):
-        """Close the HTTP session"""
-        if self.session:
-            await self.session.close()
-            self.session = None
+        """Stop background probes; the shared session is closed by http_client"""
+        for task in self.probes.values():
+            task.cancel()
+        self.probes.clear()
+        self.session = None
     
     def is_configured(self) -> bool:
         """Check if REST API is configured"""
@@ -51,8 +142,19 @@ class RestApiHandler:
         
         url = f"{base_url.rstrip('/')}/{endpoint.lstrip('/')}"
         
+        # 3. Fail fast while the server is known to be unreachable
+        breaker = self.get_breaker(endpoint)
+        if not breaker.allow():
+            self.last_error = f"Server unreachable (retrying in {breaker.retry_in():.0f}s): {breaker.last_error}"
+            return None
+        
         try:
             async with self.session.request(method, url, auth=auth, json=data, timeout=5) as response:
+                if response.status >= 500:
+                    breaker.record_failure(f"HTTP {response.status}")
+                    self._start_probe(endpoint, method)
+                else:
+                    breaker.record_success()
                 if response.status == 200:
                     self.last_error = None
                     # Safely handle JSON vs Text response
@@ -80,18 +182,71 @@ class RestApiHandler:
                 return None
         except asyncio.TimeoutError:
             self.last_error = "Timeout: The server did not respond in time. Check if the port is open."
+            breaker.record_failure("timeout")
+            self._start_probe(endpoint, method)
             # Only print if not a standard timeout during known startup/shutdown periods
             # For now, let's keep it quiet in the console if it's just a timeout/connection fail
             # as the calling tasks usually handle the frequency.
             return None
         except aiohttp.ClientConnectorError:
             self.last_error = "Connection Failed: Could not connect to the server. Is the IP/Port correct? Is the server running?"
+            breaker.record_failure("connection refused")
+            self._start_probe(endpoint, method)
             return None
         except Exception as e:
             self.last_error = f"Unexpected Error: {str(e)}"
+            breaker.record_failure(type(e).__name__)
+            self._start_probe(endpoint, method)
             print(f"❌ REST API Error connecting to {url}: {e}")
             return None
     
+    # --- Circuit breakers ---
+    def get_breaker(self, endpoint: str) -> CircuitBreaker:
+        """The breaker guarding an endpoint (created on first use)"""
+        endpoint = '/' + endpoint.lstrip('/')
+        breaker = self.breakers.get(endpoint)
+        if breaker is None:
+            breaker = self.breakers[endpoint] = CircuitBreaker(
+                endpoint,
+                failure_threshold=int(config.get('rest_breaker_failures', 3)),
+                reset_timeout=float(config.get('rest_breaker_reset', 5)),
+                max_reset_timeout=float(config.get('rest_breaker_max_reset', 30))
+            )
+        return breaker
+    
+    def _start_probe(self, endpoint: str, method: str):
+        """While a GET endpoint's circuit is open, keep probing it in the background so it closes as soon as the server is back"""
+        breaker = self.get_breaker(endpoint)
+        if method != "GET" or breaker.state != CircuitBreaker.OPEN:
+            return
+        task = self.probes.get(breaker.name)
+        if task is None or task.done():
+            self.probes[breaker.name] = asyncio.create_task(self._probe_loop(endpoint))
+    
+    async def _probe_loop(self, endpoint: str):
+        breaker = self.get_breaker(endpoint)
+        while breaker.state != CircuitBreaker.CLOSED:
+            await asyncio.sleep(max(0.1, breaker.retry_in()))
+            if breaker.state == CircuitBreaker.CLOSED or not self.is_configured():
+                return
+            # Goes through the half-open gate like any request; its outcome updates the breaker
+            await self._make_request(endpoint)
+    
+    def poll_interval(self, endpoint: str, base: float) -> float:
+        """Adaptive poll delay: `base` while healthy, stretched to the breaker's backoff while it's open"""
+        breaker = self.breakers.get('/' + endpoint.lstrip('/'))
+        if breaker is None or breaker.state == CircuitBreaker.CLOSED:
+            return base
+        return max(base, breaker.retry_after)
+    
+    def circuit_status(self) -> Dict[str, Dict[str, Any]]:
+        """Breaker state per endpoint (for /serverstatus)"""
+        return {name: breaker.snapshot() for name, breaker in self.breakers.items()}
+    
+    def is_reachable(self) -> bool:
+        """False while any endpoint's circuit is open"""
+        return all(b.state == CircuitBreaker.CLOSED for b in self.breakers.values())
+    
     def get_last_error(self) -> str:
         """Get the last error message"""
         return self.last_error or "Unknown Error"
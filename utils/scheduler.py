@@ -0,0 +1,296 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from utils.database import db
+
+
+class CronSchedule:
+    """
+    Standard 5-field cron expression: minute hour day-of-month month day-of-week.
+    Fields take *, numbers, lists (1,15), ranges (1-5) and steps (*/10, 8-18/2);
+    day-of-week is 0-6 with Sunday = 0 (7 is accepted for Sunday too). As in
+    cron, when both day fields are restricted a day matching either one fires.
+    """
+
+    RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse(field, low, high) for field, (low, high) in zip(fields, self.RANGES)
+        )
+        self.weekdays = {d % 7 for d in weekdays}
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    @staticmethod
+    def _parse(field: str, low: int, high: int) -> List[int]:
+        values: Set[int] = set()
+        for part in field.split(','):
+            step = 1
+            if '/' in part:
+                part, step_text = part.split('/', 1)
+                step = int(step_text)
+            if part == '*':
+                start, end = low, high
+            elif '-' in part:
+                start, end = map(int, part.split('-', 1))
+            else:
+                start = end = int(part)
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"Cron field {field!r} out of range {low}-{high}")
+            values.update(range(start, end + 1, step))
+        return sorted(values)
+
+    def _day_matches(self, day: datetime) -> bool:
+        dom = day.day in self.days
+        dow = (day.weekday() + 1) % 7 in self.weekdays
+        if self.any_day:
+            return dow
+        if self.any_weekday:
+            return dom
+        return dom or dow
+
+    def next_after(self, after: datetime) -> datetime:
+        """First matching minute strictly after `after` (local time)"""
+        start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.replace(hour=0, minute=0)
+        for _ in range(366 * 5):
+            if day.month in self.months and self._day_matches(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if candidate >= start:
+                            return candidate
+            day += timedelta(days=1)
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
+
+
+def daily(hh_mm: str) -> Optional[str]:
+    """'05:30' -> cron for every day at 05:30 (None if the time can't be parsed)"""
+    try:
+        hour, minute = map(int, hh_mm.strip().split(':'))
+        if 0 <= hour <= 23 and 0 <= minute <= 59:
+            return f"{minute} {hour} * * *"
+    except (ValueError, AttributeError):
+        pass
+    return None
+
+
+def next_run(schedule: str, after: float) -> float:
+    """Next fire time (epoch) of a schedule: 'every <seconds>' or a cron expression"""
+    if schedule.startswith('every '):
+        return after + float(schedule.split()[1])
+    return CronSchedule(schedule).next_after(datetime.fromtimestamp(after)).timestamp()
+
+
+class Scheduler:
+    """
+    Persistent timer service for everything that has to happen at a given time.
+
+    Jobs are rows in SQLite (scheduled_jobs) and entries in an in-memory heap;
+    a single task sleeps until exactly the earliest deadline (and not at all
+    while there are no jobs), so nothing polls the clock. A job has a kind
+    (which registered handler runs it), a payload, an optional recurring
+    schedule ('every N' seconds or a cron expression) and a grace period:
+    when the bot was down or busy past a deadline, the job still runs if it
+    is at most `grace` seconds late (always, when grace is None); recurring
+    jobs then continue from the next future occurrence instead of replaying
+    every missed one.
+    """
+
+    MAX_SLEEP = 3600  # Re-check the wall clock at least hourly (suspend, clock changes)
+
+    def __init__(self):
+        self.handlers: Dict[str, Callable[[Dict], Awaitable[None]]] = {}
+        self.jobs: Dict[str, Dict] = {}
+        self.heap: List = []
+        self.parked: List = []  # Heap entries whose kind has no handler yet
+        self.seq = itertools.count()
+        self.task: Optional[asyncio.Task] = None
+        self.loaded = False
+        self._wake: Optional[asyncio.Event] = None
+        self._load_lock: Optional[asyncio.Lock] = None
+        self.counters = {'wakeups': 0, 'runs': 0, 'missed': 0, 'errors': 0}
+
+    def register(self, kind: str, handler: Callable[[Dict], Awaitable[None]]):
+        """handler(job) is awaited when a job of this kind is due"""
+        self.handlers[kind] = handler
+        # Parked jobs go back on the heap; ones still without a handler are parked again
+        for entry in self.parked:
+            heapq.heappush(self.heap, entry)
+        self.parked = []
+        self._wakeup()
+
+    # --- Lifecycle ---
+    async def start(self):
+        """Load persisted jobs and start the timer task (idempotent)"""
+        await self._load()
+        if self.task is None or self.task.done():
+            self._wake = asyncio.Event()
+            self.task = asyncio.create_task(self._run())
+
+    async def _load(self):
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+        async with self._load_lock:
+            if self.loaded:
+                return
+            for job in await db.get_scheduled_jobs():
+                # Jobs scheduled before loading finished win over their stale rows
+                if job['id'] not in self.jobs:
+                    self._push(job)
+            self.loaded = True
+            if self.jobs:
+                print(f"⏰ Scheduler loaded {len(self.jobs)} job(s)")
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self.task = None
+
+    # --- Jobs ---
+    async def schedule(self, job_id: str, kind: str, run_at=None, schedule: str = None,
+                       payload: Dict = None, grace: float = None) -> Dict:
+        """
+        Create or replace job `job_id`. run_at is an epoch or datetime; when
+        omitted, the first occurrence of `schedule` is used.
+        """
+        if isinstance(run_at, datetime):
+            run_at = run_at.timestamp()
+        if run_at is None:
+            if not schedule:
+                raise ValueError("A job needs run_at or a schedule")
+            run_at = next_run(schedule, time.time())
+        await self._load()
+        job = {'id': job_id, 'kind': kind, 'run_at': float(run_at), 'schedule': schedule,
+               'payload': payload or {}, 'grace': grace}
+        await db.save_scheduled_job(job)
+        self._push(job)
+        return job
+
+    async def cancel(self, job_id: str) -> bool:
+        await self._load()
+        if self.jobs.pop(job_id, None) is None:
+            return False
+        await db.delete_scheduled_jobs([job_id])
+        return True
+
+    async def cancel_prefix(self, prefix: str) -> int:
+        """Cancel every job whose id starts with prefix (e.g. all countdown steps of one event)"""
+        await self._load()
+        ids = [job_id for job_id in self.jobs if job_id.startswith(prefix)]
+        for job_id in ids:
+            del self.jobs[job_id]
+        if ids:
+            await db.delete_scheduled_jobs(ids)
+        return len(ids)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        return self.jobs.get(job_id)
+
+    def list_jobs(self, prefix: str = '') -> List[Dict]:
+        return sorted((j for j in self.jobs.values() if j['id'].startswith(prefix)), key=lambda j: j['run_at'])
+
+    def _push(self, job: Dict):
+        job['seq'] = next(self.seq)
+        self.jobs[job['id']] = job
+        # Replaced/cancelled jobs leave stale heap entries that are skipped when popped
+        heapq.heappush(self.heap, (job['run_at'], job['seq'], job['id']))
+        if self.heap[0][2] == job['id']:
+            self._wakeup()
+
+    def _wakeup(self):
+        if self._wake:
+            self._wake.set()
+
+    def _peek(self) -> Optional[Dict]:
+        """Earliest live job whose handler is registered; its entry is left on top of the heap"""
+        while self.heap:
+            _, seq, job_id = self.heap[0]
+            candidate = self.jobs.get(job_id)
+            if candidate is None or candidate['seq'] != seq:
+                heapq.heappop(self.heap)  # Stale entry
+                continue
+            if candidate['kind'] not in self.handlers:
+                self.parked.append(heapq.heappop(self.heap))  # Cog not loaded (yet): wait for register()
+                continue
+            return candidate
+        return None
+
+    # --- Timer loop ---
+    async def _run(self):
+        while True:
+            self._wake.clear()
+            job = self._peek()
+            if job is None:
+                await self._wake.wait()
+                continue
+            delay = job['run_at'] - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=min(delay, self.MAX_SLEEP))
+                except asyncio.TimeoutError:
+                    pass
+                self.counters['wakeups'] += 1
+                continue
+            heapq.heappop(self.heap)
+            await self._dispatch(job)
+
+    async def _dispatch(self, job: Dict):
+        now = time.time()
+        late = now - job['run_at']
+        missed = job['grace'] is not None and late > job['grace']
+
+        # Advance the stored job before running it, so a crash mid-run doesn't repeat it
+        try:
+            if job['schedule']:
+                following = dict(job, run_at=next_run(job['schedule'], max(now, job['run_at'])))
+                await db.save_scheduled_job(following)
+                self._push(following)
+            else:
+                del self.jobs[job['id']]
+                await db.delete_scheduled_jobs([job['id']])
+        except Exception as e:
+            logging.error(f"❌ Scheduler could not advance job {job['id']}: {e}")
+
+        if missed:
+            self.counters['missed'] += 1
+            print(f"⏭️ Skipped job {job['id']}: {late:.1f}s late (grace {job['grace']:g}s)")
+        else:
+            asyncio.create_task(self._execute(job, late))
+
+    async def _execute(self, job: Dict, late: float):
+        self.counters['runs'] += 1
+        if late > 5:
+            print(f"⏰ Running job {job['id']} {late:.0f}s late (catch-up)")
+        try:
+            await self.handlers[job['kind']](job)
+        except Exception as e:
+            self.counters['errors'] += 1
+            logging.error(f"❌ Scheduled job {job['id']} failed: {e}")
+
+    def stats(self) -> Dict:
+        upcoming = self._peek() if self.jobs else None
+        return {
+            'jobs': len(self.jobs),
+            'next': upcoming['id'] if upcoming else None,
+            'next_in': round(upcoming['run_at'] - time.time(), 1) if upcoming else None,
+            **self.counters
+        }
+
+
+# Global instance
+scheduler = Scheduler()
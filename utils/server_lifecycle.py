@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from utils.config_manager import config
+from utils.event_bus import event_bus, ServerStateChanged, ServerResponsivenessChanged, ServerProbed
+from utils.rest_api import rest_api
+from utils.server_utils import (
+    ServerState, get_server_state, set_server_state, is_server_running, server_lock
+)
+
+FAST_STATES = (ServerState.STARTING, ServerState.STOPPING)
+
+
+class ServerLifecycle:
+    """
+    The one place that probes the server (process + REST API).
+
+    A single loop drives the OFFLINE / STARTING / ONLINE / STOPPING state
+    machine. The process check (a tracked-PID lookup) runs every
+    lifecycle_fast_interval seconds; the REST API is asked every tick while
+    the server is starting or stopping but only every lifecycle_idle_interval
+    seconds while it is steady. Any state change (including ones made by
+    start_server / stop_server) wakes the loop immediately. Transitions go
+    out on the event bus, so cogs subscribe instead of running their own
+    status loops.
+    """
+
+    def __init__(self):
+        self.bot = None
+        self.task: Optional[asyncio.Task] = None
+        self.process_running = False
+        self.responsive: Optional[bool] = None
+        self.last_probe = 0.0
+        self.last_rest_check = 0.0
+        self._wake: Optional[asyncio.Event] = None
+        self._changed: Optional[asyncio.Event] = None
+        self._probing: Optional[asyncio.Task] = None
+        self.counters = {'probes': 0, 'rest_checks': 0, 'transitions': 0}
+        event_bus.subscribe(ServerStateChanged, self._on_state_changed)
+
+    @property
+    def fast_interval(self) -> float:
+        return float(config.get('lifecycle_fast_interval', 1))
+
+    def interval(self, state: ServerState = None) -> float:
+        """REST probe cadence for a state"""
+        state = state or get_server_state()
+        if state in FAST_STATES:
+            return self.fast_interval
+        return float(config.get('lifecycle_idle_interval', 15))
+
+    # --- Loop ---
+    def start(self, bot=None):
+        """Start the probe loop (idempotent)"""
+        self.bot = bot or self.bot
+        if self.task is None or self.task.done():
+            self._wake = asyncio.Event()
+            self._changed = asyncio.Event()
+            self.task = asyncio.create_task(self._run())
+            logging.info("🔍 Server lifecycle monitoring started")
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            try:
+                await self.task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self.task = None
+
+    async def _run(self):
+        await self._detect_initial_state()
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.fast_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.probe()
+            except Exception as e:
+                logging.error(f"❌ Error in server lifecycle probe: {e}")
+
+    def wake(self):
+        """Probe now instead of at the next tick"""
+        if self._wake:
+            self._wake.set()
+
+    async def _on_state_changed(self, event: ServerStateChanged):
+        self.counters['transitions'] += 1
+        if event.new_state == ServerState.OFFLINE:
+            self.responsive = None
+        if self._changed:
+            # Release everyone waiting in wait_for_change()
+            self._changed.set()
+            self._changed = asyncio.Event()
+        self.wake()
+
+    async def wait_for_change(self, timeout: float = None) -> bool:
+        """Wait for the next state transition; False on timeout"""
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    # --- Probing ---
+    async def probe(self):
+        """Run one probe now; concurrent callers share it"""
+        if self._probing is None or self._probing.done():
+            self._probing = asyncio.create_task(self._probe())
+        await asyncio.shield(self._probing)
+
+    async def is_running(self, max_age: float = None) -> bool:
+        """Process state from the latest probe, probing first if it is older than max_age seconds"""
+        max_age = self.fast_interval * 2 if max_age is None else max_age
+        if time.monotonic() - self.last_probe > max_age:
+            await self.probe()
+        return self.process_running
+
+    async def _check_responsive(self) -> bool:
+        self.counters['rest_checks'] += 1
+        self.last_rest_check = time.monotonic()
+        responsive = await rest_api.get_server_info() is not None
+        if responsive != self.responsive:
+            if self.responsive is not None or not responsive:
+                print(f"{'✅' if responsive else '⚠️'} Server REST API {'responsive' if responsive else 'not responding'}")
+            self.responsive = responsive
+            event_bus.publish(ServerResponsivenessChanged(responsive))
+        return responsive
+
+    async def _probe(self):
+        self.counters['probes'] += 1
+        state = get_server_state()
+        # Fast states skip the 2s status cache; the tracked-PID check is cheap either way
+        self.process_running = running = await is_server_running(force=state in FAST_STATES)
+        self.last_probe = time.monotonic()
+
+        rest_due = time.monotonic() - self.last_rest_check >= self.interval(state)
+
+        # start_server / stop_server own the state while a command holds the lock
+        if not server_lock.locked():
+            await self._advance(state, running, rest_due)
+        elif running and rest_due and rest_api.is_configured() and state == ServerState.ONLINE:
+            await self._check_responsive()
+        event_bus.publish(ServerProbed(get_server_state(), running, self.responsive))
+
+    async def _advance(self, state: ServerState, running: bool, rest_due: bool = True):
+        if state == ServerState.OFFLINE:
+            if running:
+                logging.info("🟡 Server process detected while state was OFFLINE, transitioning to STARTING")
+                await set_server_state(ServerState.STARTING, self.bot, source='probe')
+
+        elif state == ServerState.STARTING:
+            if not running:
+                logging.warning("🔴 Server process died during STARTING phase")
+                await set_server_state(ServerState.OFFLINE, self.bot, source='probe')
+            elif not rest_api.is_configured():
+                logging.info("🟢 Server process running (REST API not configured)")
+                await set_server_state(ServerState.ONLINE, self.bot, source='probe')
+            elif rest_due and await self._check_responsive():
+                logging.info("🟢 Server is now fully ONLINE (REST API responsive)")
+                await set_server_state(ServerState.ONLINE, self.bot, source='probe')
+
+        elif state == ServerState.ONLINE:
+            if not running:
+                logging.warning("🔴 Server process disappeared, transitioning to OFFLINE")
+                await set_server_state(ServerState.OFFLINE, self.bot, source='probe')
+            elif rest_due and rest_api.is_configured():
+                # A temporarily unresponsive API doesn't change the state
+                await self._check_responsive()
+
+        elif state == ServerState.STOPPING:
+            if not running:
+                logging.info("🔴 Server has fully stopped")
+                await set_server_state(ServerState.OFFLINE, self.bot, source='probe')
+
+    async def _detect_initial_state(self):
+        logging.info("🔍 Performing initial server state detection...")
+        try:
+            running = self.process_running = await is_server_running(force=True)
+            self.last_probe = time.monotonic()
+            if not running:
+                logging.info("🔴 Initial state: OFFLINE")
+                new_state = ServerState.OFFLINE
+            elif not rest_api.is_configured():
+                logging.info("🟢 Initial state: ONLINE (process running, no REST API)")
+                new_state = ServerState.ONLINE
+            elif await self._check_responsive():
+                logging.info("🟢 Initial state: ONLINE (process + REST API responsive)")
+                new_state = ServerState.ONLINE
+            else:
+                logging.info("🟡 Initial state: STARTING (process running, REST API not ready)")
+                new_state = ServerState.STARTING
+            await set_server_state(new_state, self.bot, source='initial')
+        except Exception as e:
+            logging.error(f"❌ Error detecting initial server state: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            'state': get_server_state().value,
+            'process_running': self.process_running,
+            'responsive': self.responsive,
+            'interval': self.interval(),
+            **self.counters
+        }
+
+
+# Global instance
+server_lifecycle = ServerLifecycle()
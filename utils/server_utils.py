@@ -6,6 +6,8 @@ import asyncio
 from enum import Enum
 from utils.config_manager import config
 from utils.rest_api import rest_api
+from utils.process_tracker import server_process
+from utils.event_bus import event_bus, ServerStateChanged
 
 # Server State Enum
 class ServerState(Enum):
@@ -25,36 +27,22 @@ _state_change_callbacks = []
 _status_cache = {"running": False, "timestamp": 0}
 STATUS_CACHE_TTL = 2.0 # 2 seconds
 
-def _sync_is_server_running():
-    """Synchronous implementation of process check."""
-    target_binaries = ["palserver.exe", "palserver-win64-shipping.exe", "palserver-win64-shipping-cmd.exe"]
-    try:
-        # Fetching only 'name' is significantly faster than 'exe' or other fields
-        for proc in psutil.process_iter(['name']):
-            try:
-                name = proc.info.get('name')
-                if name:
-                    proc_name = name.lower()
-                    if any(bin_name in proc_name for bin_name in target_binaries):
-                        return True
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
-    except Exception as e:
-        print(f"⚠️ Error checking processes: {e}")
-    return False
+def _sync_is_server_running(force=False):
+    """Synchronous implementation of process check (tracked PID, scan only when needed)."""
+    return server_process.is_running(force)
 
-async def is_server_running():
-    """Check if the Palworld server is running (non-blocking with cache)."""
+async def is_server_running(force=False):
+    """Check if the Palworld server is running (non-blocking with cache). force skips the cache."""
     import time
     now = time.time()
     
     # Return cached result if fresh
-    if now - _status_cache["timestamp"] < STATUS_CACHE_TTL:
+    if not force and now - _status_cache["timestamp"] < STATUS_CACHE_TTL:
         return _status_cache["running"]
     
     # Run the synchronous check in a thread to avoid blocking the event loop
     loop = asyncio.get_event_loop()
-    is_running = await loop.run_in_executor(None, _sync_is_server_running)
+    is_running = await loop.run_in_executor(None, _sync_is_server_running, force)
     
     # Update cache
     _status_cache["running"] = is_running
@@ -62,6 +50,10 @@ async def is_server_running():
     
     return is_running
 
+async def get_server_process_stats():
+    """CPU / RSS sample of the server process, or None if it isn't running."""
+    return await asyncio.to_thread(server_process.sample)
+
 async def verify_server_responsive() -> bool:
     """Verify that the server is actually responsive via REST API."""
     if not rest_api.is_configured():
@@ -85,8 +77,8 @@ def get_server_state() -> ServerState:
     """Get the current server state."""
     return _current_server_state
 
-async def set_server_state(new_state: ServerState, bot=None):
-    """Set the server state and trigger callbacks."""
+async def set_server_state(new_state: ServerState, bot=None, source='command'):
+    """Set the server state, publish ServerStateChanged and trigger callbacks."""
     global _current_server_state
     
     if _current_server_state == new_state:
@@ -96,6 +88,7 @@ async def set_server_state(new_state: ServerState, bot=None):
     _current_server_state = new_state
     
     print(f"🔄 Server state changed: {old_state.value.upper()} → {new_state.value.upper()}")
+    event_bus.publish(ServerStateChanged(old_state, new_state, source))
     
     # Trigger callbacks (like updating channel name)
     for callback in _state_change_callbacks:
@@ -185,7 +178,7 @@ async def stop_server(bot=None, graceful=True):
     await set_server_state(ServerState.STOPPING, bot)
     
     # 1. Immediate check: If server is already offline, return success early
-    if not await is_server_running():
+    if not await is_server_running(force=True):
         print("ℹ️ [SHUTDOWN] Server is already offline.")
         await set_server_state(ServerState.OFFLINE, bot)
         return True
@@ -248,10 +241,11 @@ async def stop_server(bot=None, graceful=True):
             await asyncio.sleep(3)
             
         # 4. Final verification and notification
-        offline_success = not await is_server_running()
+        offline_success = not await is_server_running(force=True)
         
         if offline_success:
             print("✅ [SHUTDOWN] Server is now confirmed OFFLINE.")
+            server_process.forget()
             await set_server_state(ServerState.OFFLINE, bot)
             
             if bot:
@@ -298,14 +292,16 @@ async def start_server(bot=None):
             # Running directly via cmd /c ensures the wrapper script is trackable.
             # Removed '/b' as it often causes the process to attach to the bot's console.
             print(f"📂 [STARTUP] Running {startup_script} in {server_directory}")
-            subprocess.Popen(
+            launcher = subprocess.Popen(
                 f'cmd.exe /c {startup_script}', 
                 cwd=server_directory, 
                 shell=True,
                 creationflags=subprocess.CREATE_NEW_CONSOLE if hasattr(subprocess, 'CREATE_NEW_CONSOLE') else 0
             )
         else:
-            await asyncio.create_subprocess_exec("bash", startup_script, cwd=server_directory)
+            launcher = await asyncio.create_subprocess_exec("bash", startup_script, cwd=server_directory)
+        # The server binary is looked up among the launcher's children instead of scanning every process
+        server_process.launched(launcher.pid)
         
         # Send STARTING embed immediately
         status_channel_id = config.get('status_channel_id', 0)
@@ -321,7 +317,7 @@ async def start_server(bot=None):
         process_detected = False
         for i in range(10):  # Check for 20 seconds (10 * 2s)
             await asyncio.sleep(2)
-            if await is_server_running():
+            if await is_server_running(force=True):
                 print(f"✅ [STARTUP] Server process detected after {i*2+2}s.")
                 process_detected = True
                 break